@@ -1,13 +1,18 @@
 import streamlit as st
 import streamlit.components.v1 as components
-from nutrient_calculator import NutrientCalculatorUI
+from nutrient_calculator import get_session_calculator
 import base64
 from pathlib import Path
 from strain_api import StrainAPI
-from recipe_instructions import RecipeInstructions
+from recipe_instructions import get_recipe_instructions
+from hydrocalc.facility import FacilityPlanner
+from hydrocalc.lazy import lazy_import
 from datetime import datetime
 import os
 
+# Only the facility planner builds DataFrames
+pd = lazy_import('pandas')
+
 # Move page config to top, before any other st commands
 st.set_page_config(
     page_title="Professional Hydroponic Calculator",
@@ -82,6 +87,44 @@ def create_layout():
         # Version info
         st.markdown("v1.0.0 | © 2024 Professional Hydro")
 
+def render_facility_planner():
+    """Plan every reservoir in the facility from one editable table"""
+    with st.expander("🏭 Facility Planner"):
+        if "facility_reservoirs" not in st.session_state:
+            st.session_state.facility_reservoirs = pd.DataFrame([
+                {"id": "R1", "line": "General Hydroponics", "stage": "Early Veg",
+                 "volume": 50.0, "strength": 100, "strain": "Medium Feeders"}
+            ])
+
+        table = st.data_editor(
+            st.session_state.facility_reservoirs,
+            num_rows="dynamic",
+            column_config={
+                "line": st.column_config.SelectboxColumn(
+                    "line", options=["Generic", "General Hydroponics", "Advanced Nutrients", "Athena"]
+                ),
+                "stage": st.column_config.SelectboxColumn("stage", options=list(growth_stages))
+            },
+            key="facility_editor"
+        )
+
+        if st.button("Plan All Reservoirs"):
+            try:
+                plan = FacilityPlanner().plan(table.dropna(subset=["line", "stage", "volume"]))
+                totals = plan.product_totals()
+                st.markdown("#### Product Totals")
+                st.dataframe(pd.DataFrame([
+                    {"Line": line, "Product": product, "Amount": total["amount"], "Unit": total["unit"]}
+                    for (line, product), total in totals.items()
+                ]), hide_index=True)
+
+                st.markdown("#### Mixing Manifest")
+                for (line, product), entry in plan.manifest().items():
+                    doses = ", ".join(f"{dose['id']}: {dose['amount']} {entry['unit']}" for dose in entry["reservoirs"])
+                    st.markdown(f"**{product}** ({line}) — {entry['total']} {entry['unit']} total: {doses}")
+            except ValueError as e:
+                st.error(str(e))
+
 def main():
     # Remove duplicate page_config call
     # st.set_page_config() - REMOVE THIS LINE
@@ -142,7 +185,7 @@ def main():
         if st.button("Calculate Recipe", type="primary"):
             with st.spinner("Calculating..."):
                 try:
-                    calculator = NutrientCalculatorUI()
+                    calculator = get_session_calculator()
                     recipe = calculator.calculate_recipe(
                         nutrient_line=nutrient_line,
                         volume=volume,
@@ -159,6 +202,8 @@ def main():
                         
                 except Exception as e:
                     st.error(f"Calculation error: {str(e)}")
+        
+        render_facility_planner()
     
     with tab2:
         col1, col2 = st.columns([1, 1])
@@ -172,7 +217,7 @@ def main():
             
             if search_query:
                 with st.spinner("Searching strains..."):
-                    results = strain_api.search_strains(search_query)
+                    results = strain_api.search_strains(search_query, limit=50)
                     
                 if results:
                     selected_strain = st.selectbox(
@@ -243,7 +288,7 @@ def main():
                         st.rerun()
     
     with tab3:
-        recipe_instructions = RecipeInstructions()
+        recipe_instructions = get_recipe_instructions()
         
         # Example recipe data
         recipe = {
@@ -1,506 +1,139 @@
 import sys
 import os
 import streamlit as st
-import pandas as pd
 from datetime import datetime
-import plotly.graph_objects as go
 from pathlib import Path
-import json
 import logging
 from utils.debugger import create_debugger, debugger
+from hydrocalc.catalog import get_catalog
+from hydrocalc.core import get_core
+from hydrocalc.data import FEEDING_SCHEDULES
+from hydrocalc.engine import FEEDING_MULTIPLIERS, round_like_python
+from hydrocalc.instructions import determine_nutrient_type
+from hydrocalc.journal import get_recipe_journal
+from hydrocalc.lazy import lazy_import
+from hydrocalc.parsing import parse_npk
+from hydrocalc.planning import plan_season
+from hydrocalc.recipes import RecipeBook
+from hydrocalc.scheduler import mixing_sequence
+from hydrocalc.solver import solve_for_ec
+from hydrocalc.store import get_recipe_store
+from hydrocalc.strain_loader import get_strain_directory
 
 # Set up logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-class RecipeManager:
-    def __init__(self):
-        # Simplified initialization
-        self.recipes = {}
-        self.load_default_nutrient_lines()
-
-    def load_default_nutrient_lines(self):
-        """Load the top 5 nutrient lines plus generic options"""
-        self.nutrient_lines = {
-            'General Hydroponics': {
-                'description': 'Industry standard 3-part system with comprehensive supplements',
-                'base_nutrients': {
-                    'Flora Micro': {
-                        'type': 'micro',
-                        'max_strength': 4.0,
-                        'description': 'Concentrated micronutrients and calcium',
-                        'npk': '5-0-1'
-                    },
-                    'Flora Grow': {
-                        'type': 'grow',
-                        'max_strength': 4.0,  # ml per gallon
-                        'npk': '2-1-6',
-                        'description': 'Promotes structural and vegetative growth',
-                        'when_to_use': 'Heavy in veg, reduced in flower',
-                        'benefits': ['Promotes leaf growth', 'Enhances node spacing', 'Builds structure'],
-                        'cautions': ['Add after Flora Micro', 'Reduce during flowering'],
-                        'ec_impact': 'Medium',
-                        'ph_impact': 'Slight decrease'
-                    },
-                    'Flora Bloom': {
-                        'type': 'bloom',
-                        'max_strength': 4.0,  # ml per gallon
-                        'npk': '0-5-4',
-                        'description': 'Promotes flower development and fruiting',
-                        'when_to_use': 'During flowering phase',
-                        'benefits': ['Enhances flower development', 'Improves yield', 'Boosts essential oils'],
-                        'cautions': ['Add last of base nutrients', 'Monitor EC levels']
-                    }
-                },
-                'supplements': {
-                    'CaliMagic': {
-                        'type': 'calmag',
-                        'max_strength': 5.0,  # ml per gallon
-                        'description': 'GH\'s calcium and magnesium supplement',
-                        'when_to_use': 'Throughout grow cycle, essential with RO water',
-                        'benefits': [
-                            'Prevents calcium deficiency',
-                            'Strengthens cell walls',
-                            'Improves nutrient uptake',
-                            'Prevents magnesium deficiency'
-                        ],
-                        'npk': '1-0-0',
-                        'contains': {'Ca': '5%', 'Mg': '1.5%'},
-                        'cautions': ['Check water hardness first', 'Can raise pH']
-                    },
-                    'Rapid Start': {
-                        'type': 'root',
-                        'max_strength': 2.0,  # ml per gallon
-                        'description': 'GH\'s root development enhancer',
-                        'when_to_use': 'Early growth and transplanting',
-                        'benefits': [
-                            'Accelerates root development',
-                            'Improves nutrient uptake',
-                            'Reduces transplant shock',
-                            'Enhances stress tolerance'
-                        ],
-                        'contains': {'Vitamins': 'B1, B2', 'Hormones': 'IBA, NAA'},
-                        'cautions': ['Reduce after established roots', 'Monitor pH']
-                    },
-                    'Diamond Nectar': {
-                        'type': 'humic',
-                        'max_strength': 2.0,  # ml per gallon
-                        'description': 'GH\'s premium humic acid supplement',
-                        'when_to_use': 'Throughout grow cycle',
-                        'benefits': [
-                            'Improves nutrient uptake',
-                            'Enhances root development',
-                            'Increases chelation',
-                            'Improves soil structure'
-                        ],
-                        'contains': {'Humic acid': '6%', 'Fulvic acid': '3%'},
-                        'cautions': ['Can darken solution', 'Monitor pH']
-                    },
-                    'Armor Si': {
-                        'type': 'silica',
-                        'max_strength': 2.0,  # ml per gallon
-                        'description': 'GH\'s silica supplement',
-                        'when_to_use': 'Throughout grow cycle',
-                        'benefits': [
-                            'Strengthens cell walls',
-                            'Improves heat tolerance',
-                            'Enhances pest resistance',
-                            'Supports heavy flowers'
-                        ],
-                        'contains': {'Si': '0.5%'},
-                        'cautions': [
-                            'Must be added FIRST to nutrient solution',
-                            'Raises pH significantly',
-                            'Don\'t mix directly with concentrated nutrients'
-                        ]
-                    },
-                    'Liquid KoolBloom': {
-                        'type': 'pk_boost',
-                        'max_strength': 2.5,  # ml per gallon
-                        'description': 'GH\'s liquid P-K booster',
-                        'when_to_use': 'Early to mid flowering',
-                        'benefits': [
-                            'Enhances flower formation',
-                            'Improves flower size',
-                            'Boosts essential oil production'
-                        ],
-                        'npk': '0-10-10',
-                        'cautions': ['Monitor EC', 'Can build up salts']
-                    },
-                    'Dry KoolBloom': {
-                        'type': 'ripening',
-                        'max_strength': 1.5,  # grams per gallon
-                        'description': 'GH\'s flowering finisher powder',
-                        'when_to_use': 'Last 2-3 weeks of flower',
-                        'benefits': [
-                            'Triggers ripening',
-                            'Increases resin production',
-                            'Enhances flower density',
-                            'Improves essential oil content'
-                        ],
-                        'npk': '0-27-27',
-                        'cautions': [
-                            'Use only in late flower',
-                            'Monitor EC carefully',
-                            'Can cause lockout if overused',
-                            'Dissolve completely before adding other nutrients'
-                        ]
-                    },
-                    'Floralicious Plus': {
-                        'type': 'enzyme',
-                        'max_strength': 1.0,  # ml per gallon
-                        'description': 'GH\'s organic bioactivator',
-                        'when_to_use': 'Throughout grow cycle',
-                        'benefits': [
-                            'Enhances nutrient uptake',
-                            'Improves flavor profiles',
-                            'Boosts terpene production',
-                            'Supports beneficial microbes'
-                        ],
-                        'contains': {
-                            'Enzymes': 'Multiple',
-                            'Amino acids': 'Complete profile',
-                            'Vitamins': 'B1, B2, B6, B12'
-                        },
-                        'cautions': [
-                            'Shake well before use',
-                            'Can cloud reservoir',
-                            'Add last to nutrient solution'
-                        ]
-                    },
-                    'Florablend': {
-                        'type': 'biostimulant',
-                        'max_strength': 2.0,  # ml per gallon
-                        'description': 'GH\'s organic vegan supplement',
-                        'when_to_use': 'Throughout grow cycle',
-                        'benefits': [
-                            'Enhances nutrient uptake',
-                            'Improves plant vigor',
-                            'Supports beneficial microbes',
-                            'Adds trace elements'
-                        ],
-                        'contains': {
-                            'Seaweed': 'Multiple species',
-                            'Minerals': 'Trace elements',
-                            'Vitamins': 'Natural blend'
-                        },
-                        'cautions': [
-                            'Shake well before use',
-                            'Can settle in reservoir',
-                            'Add after base nutrients'
-                        ]
-                    }
-                }
-            },
-            'Advanced Nutrients': {
-                'description': 'pH Perfect technology with premium supplements',
-                'base_nutrients': {
-                    'pH Perfect Micro': {
-                        'type': 'micro',
-                        'max_strength': 4.0,
-                        'description': 'Self-adjusting pH micronutrient formula',
-                        'npk': '5-0-1'
-                    },
-                    'pH Perfect Grow': {
-                        'type': 'grow',
-                        'max_strength': 4.0,
-                        'description': 'Vegetative growth formula',
-                        'npk': '4-0-1'
-                    },
-                    'pH Perfect Bloom': {
-                        'type': 'bloom',
-                        'max_strength': 4.0,
-                        'description': 'Flowering phase formula',
-                        'npk': '0-5-4'
-                    }
-                }
-            },
-            'Athena': {
-                'description': 'Professional grade blended nutrient system',
-                'base_nutrients': {
-                    'Core': {
-                        'type': 'base',
-                        'max_strength': 3.0,
-                        'description': 'Complete nutrient solution',
-                        'npk': '4-0-1'
-                    },
-                    'Bloom': {
-                        'type': 'bloom',
-                        'max_strength': 3.0,
-                        'description': 'Flower enhancer',
-                        'npk': '0-5-4'
-                    }
-                }
-            },
-            'House & Garden': {
-                'description': 'Premium Dutch nutrients with specialized additives',
-                'base_nutrients': {
-                    'Aqua Flakes A': {
-                        'type': 'base_a',
-                        'max_strength': 3.0,
-                        'description': 'Part A base nutrient',
-                        'npk': '5-0-3'
-                    },
-                    'Aqua Flakes B': {
-                        'type': 'base_b',
-                        'max_strength': 3.0,
-                        'description': 'Part B base nutrient',
-                        'npk': '1-4-5'
-                    }
-                }
-            },
-            'Canna': {
-                'description': 'Research-based nutrients optimized for various media',
-                'base_nutrients': {
-                    'Canna A': {
-                        'type': 'base_a',
-                        'max_strength': 3.0,
-                        'description': 'Part A complete nutrient',
-                        'npk': '5-0-1'
-                    },
-                    'Canna B': {
-                        'type': 'base_b',
-                        'max_strength': 3.0,
-                        'description': 'Part B complete nutrient',
-                        'npk': '0-4-2'
-                    }
-                }
-            },
-            'Generic': {
-                'description': 'Custom nutrient formulations using raw salts',
-                'base_nutrients': {
-                    'Calcium Nitrate': {
-                        'type': 'macro',
-                        'max_strength': 1.0,
-                        'description': 'Ca(NO3)2 - Primary calcium source',
-                        'unit': 'g/L'
-                    },
-                    'Potassium Nitrate': {
-                        'type': 'macro',
-                        'max_strength': 0.6,
-                        'description': 'KNO3 - Nitrogen and potassium source',
-                        'unit': 'g/L'
-                    },
-                    # ... add more generic compounds ...
-                }
-            }
+# Charting and table libraries load on first use (Analysis tab, result tables)
+pd = lazy_import('pandas')
+go = lazy_import('plotly.graph_objects')
+px = lazy_import('plotly.express')
+
+# Generic salts used by calculate_combined_nutrients (N-P-K parsed once at import)
+GENERIC_COMPOUNDS = {
+    'Calcium Nitrate': {'ec_impact': 0.12, 'npk': parse_npk('15.5-0-0')},
+    'Potassium Nitrate': {'ec_impact': 0.13, 'npk': parse_npk('13-0-46')},
+    'Magnesium Sulfate': {'ec_impact': 0.06, 'npk': parse_npk('0-0-0')},
+    'Monopotassium Phosphate': {'ec_impact': 0.08, 'npk': parse_npk('0-52-34')},
+    'Iron DTPA': {'ec_impact': 0.02, 'npk': parse_npk('0-0-0')},
+    'Manganese EDTA': {'ec_impact': 0.01, 'npk': parse_npk('0-0-0')},
+    'Zinc EDTA': {'ec_impact': 0.01, 'npk': parse_npk('0-0-0')},
+    'Boric Acid': {'ec_impact': 0.01, 'npk': parse_npk('0-0-0')},
+    'Copper EDTA': {'ec_impact': 0.01, 'npk': parse_npk('0-0-0')},
+    'Sodium Molybdate': {'ec_impact': 0.01, 'npk': parse_npk('0-0-0')}
+}
+
+# Generic compound dosing used by calculate_generic_nutrients
+GENERIC_DOSING = {
+    'Calcium Nitrate': {
+        'ec_impact': 0.12,
+        'npk': parse_npk('15.5-0-0'),
+        'base_rate': 0.8,  # g/L
+        'stages': {
+            'Seedling': 0.5,
+            'Early Veg': 0.7,
+            'Late Veg': 0.9,
+            'Early Flower': 1.0,
+            'Mid Flower': 0.8,
+            'Late Flower': 0.6
         }
+    },
+    'Potassium Nitrate': {
+        'ec_impact': 0.13,
+        'npk': parse_npk('13-0-46'),
+        'base_rate': 0.6,
+        'stages': {
+            'Seedling': 0.3,
+            'Early Veg': 0.5,
+            'Late Veg': 0.7,
+            'Early Flower': 1.0,
+            'Mid Flower': 1.2,
+            'Late Flower': 0.8
+        }
+    },
+    'Magnesium Sulfate': {
+        'ec_impact': 0.06,
+        'npk': parse_npk('0-0-0'),
+        'base_rate': 0.5,
+        'stages': {
+            'Seedling': 0.5,
+            'Early Veg': 0.7,
+            'Late Veg': 0.8,
+            'Early Flower': 1.0,
+            'Mid Flower': 1.0,
+            'Late Flower': 0.8
+        }
+    },
+    'Monopotassium Phosphate': {
+        'ec_impact': 0.08,
+        'npk': parse_npk('0-52-34'),
+        'base_rate': 0.4,
+        'stages': {
+            'Seedling': 0.3,
+            'Early Veg': 0.5,
+            'Late Veg': 0.7,
+            'Early Flower': 1.0,
+            'Mid Flower': 1.2,
+            'Late Flower': 0.8
+        }
+    }
+}
+
+# Target EC (mS/cm) per growth stage
+TARGET_EC_RANGES = {
+    'Seedling': (0.4, 0.8),
+    'Early Veg': (0.8, 1.2),
+    'Late Veg': (1.2, 1.6),
+    'Pre-Flower': (1.4, 1.8),
+    'Early Flower': (1.6, 2.0),
+    'Mid Flower': (1.8, 2.2),
+    'Late Flower': (1.4, 1.8),
+    'Flush': (0.0, 0.2)
+}
+DEFAULT_TARGET_EC_RANGE = (1.0, 1.4)
+
+# Recipe library: summary columns (recipe key -> column label) and page sizes
+LIBRARY_FIELDS = {
+    'growth_phase': 'Growth Phase',
+    'strain': 'Strain',
+    'size': 'Size (gal)',
+    'strength': 'Strength (%)',
+    'ec_target': 'Target EC',
+    'ph_target': 'Target pH',
+    'created_at': 'Created'
+}
+LIBRARY_PAGE_SIZES = (10, 25, 50, 100)
+
+class RecipeManager(RecipeBook):
+    """Recipe book for the Streamlit UI, kept in the shared SQLite store"""
 
-    def load_recipes(self):
-        """Load saved recipes from session state"""
-        if 'saved_recipes' not in st.session_state:
-            st.session_state.saved_recipes = {}
-        return st.session_state.saved_recipes
-
-    def save_recipe(self, name, recipe_data):
-        """Save a new recipe with validation and mixing instructions"""
-        try:
-            if not name or not recipe_data:
-                raise ValueError("Recipe name and data are required")
-                
-            # Add mixing instructions and metadata
-            recipe_data.update({
-                'created_at': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
-                'mixing_instructions': self.generate_mixing_instructions(recipe_data),
-                'recipe_id': st.session_state.recipe_count + 1
-            })
-            
-            self.recipes[name] = recipe_data
-            st.session_state.saved_recipes = self.recipes
-            st.session_state.recipe_count += 1
-            
-            logger.info(f"Recipe saved successfully: {name}")
-            return True
-        except Exception as e:
-            logger.error(f"Failed to save recipe: {str(e)}")
-            return False
+    def __init__(self):
+        # Every session and worker sees the same recipes
+        super().__init__(store=get_recipe_store(), core=get_core('deploy'))
 
-    def generate_mixing_instructions(self, recipe_data):
-        """Generate comprehensive mixing instructions"""
-        try:
-            instructions = []
-            nutrients = recipe_data.get('nutrients', {})
-            
-            # Step 1: Environment and Equipment Preparation
-            instructions.append({
-                'step': 1,
-                'title': 'Preparation',
-                'description': "Prepare your mixing environment and equipment",
-                'tips': [
-                    'Clean all mixing equipment thoroughly',
-                    'Calibrate pH and EC meters',
-                    'Prepare measuring syringes/cups',
-                    'Have paper towels ready for spills',
-                    'Wear protective gloves if needed'
-                ],
-                'equipment_needed': [
-                    'Clean mixing container',
-                    'Measuring syringes/cups',
-                    'Stirring tool',
-                    'pH meter',
-                    'EC/PPM meter',
-                    'Thermometer'
-                ]
-            })
-            
-            # Step 2: Water Preparation
-            instructions.append({
-                'step': 2,
-                'title': 'Water Preparation',
-                'description': f"Fill container with {recipe_data.get('size', 0)} gallons of water at room temperature",
-                'tips': [
-                    'Use RO or filtered water if possible',
-                    'Check water temperature (65-75°F ideal)',
-                    'Measure initial EC/PPM of water',
-                    'Record initial pH reading',
-                    'Let chlorinated water sit for 24h or use dechlorinator'
-                ],
-                'measurements': {
-                    'Target Temperature': '68-72°F',
-                    'Starting EC': '<0.1 for RO, <0.5 for tap',
-                    'Starting pH': 'Record initial reading'
-                }
-            })
-            
-            # Step 3: Initial pH Adjustment
-            instructions.append({
-                'step': 3,
-                'title': 'Initial pH Adjustment',
-                'description': "Adjust water pH if needed before adding nutrients",
-                'tips': [
-                    'Target pH: 5.5-6.0 for initial mix',
-                    'Add pH adjusters slowly (1ml at a time)',
-                    'Mix thoroughly between additions',
-                    'Wait 30 seconds before retesting',
-                    'Consider water source (RO vs Tap)'
-                ],
-                'measurements': {
-                    'Target pH': '5.5-6.0',
-                    'Wait Time': '30 seconds between adjustments'
-                }
-            })
-            
-            # Step 4: Add Silica (if present)
-            if any(n.get('type') == 'silica' for n in nutrients.values()):
-                silica_nutrients = [n for n in nutrients.items() if n[1].get('type') == 'silica']
-                instructions.append({
-                    'step': 4,
-                    'title': 'Add Silica',
-                    'description': "Add silica supplement first and mix thoroughly",
-                    'tips': [
-                        'Add silica FIRST before other nutrients',
-                        'Mix thoroughly for 2 minutes',
-                        'Wait 15 minutes before next addition',
-                        'Check pH after mixing (silica raises pH)',
-                        'Do not mix directly with concentrated nutrients'
-                    ],
-                    'amounts': {n[0]: f"{n[1]['amount']} {n[1].get('unit', 'ml')}" 
-                              for n in silica_nutrients},
-                    'wait_time': '15 minutes',
-                    'ph_impact': 'Increases pH significantly'
-                })
-            
-            # Step 5: Add CalMag (if present)
-            if any(n.get('type') == 'calmag' for n in nutrients.values()):
-                calmag_nutrients = [n for n in nutrients.items() if n[1].get('type') == 'calmag']
-                instructions.append({
-                    'step': 5,
-                    'title': 'Add CalMag',
-                    'description': "Add calcium/magnesium supplements",
-                    'tips': [
-                        'Add CalMag before base nutrients',
-                        'Mix thoroughly for 1 minute',
-                        'Wait 5 minutes before next addition',
-                        'Check for any precipitation',
-                        'Monitor solution clarity'
-                    ],
-                    'amounts': {n[0]: f"{n[1]['amount']} {n[1].get('unit', 'ml')}" 
-                              for n in calmag_nutrients},
-                    'wait_time': '5 minutes',
-                    'ph_impact': 'May slightly affect pH'
-                })
-            
-            # Step 6: Add Base Nutrients
-            base_nutrients = [n for n in nutrients.items() if n[1].get('type') in ['micro', 'grow', 'bloom']]
-            if base_nutrients:
-                instructions.append({
-                    'step': 6,
-                    'title': 'Add Base Nutrients',
-                    'description': "Add base nutrients in specific order",
-                    'tips': [
-                        'Always add in order: Micro → Grow → Bloom',
-                        'Mix thoroughly between each addition',
-                        'Wait 60 seconds between each nutrient',
-                        'Check EC after each addition',
-                        'Watch for any reactions or precipitation'
-                    ],
-                    'sequence': [
-                        {'nutrient': 'Micro', 'wait': '60 seconds', 'mix_time': '30 seconds'},
-                        {'nutrient': 'Grow', 'wait': '60 seconds', 'mix_time': '30 seconds'},
-                        {'nutrient': 'Bloom', 'wait': '60 seconds', 'mix_time': '30 seconds'}
-                    ],
-                    'amounts': {n[0]: f"{n[1]['amount']} {n[1].get('unit', 'ml')}" 
-                              for n in base_nutrients},
-                    'target_ec': recipe_data.get('target_ec', 'See feeding chart')
-                })
-            
-            # Step 7: Add Supplements
-            supplements = [n for n in nutrients.items() 
-                         if n[1].get('type') not in ['micro', 'grow', 'bloom', 'silica', 'calmag']]
-            if supplements:
-                instructions.append({
-                    'step': 7,
-                    'title': 'Add Supplements',
-                    'description': "Add remaining supplements in optimal order",
-                    'tips': [
-                        'Add one supplement at a time',
-                        'Mix thoroughly between additions',
-                        'Monitor EC changes closely',
-                        'Watch for any reactions',
-                        'Check pH after each addition'
-                    ],
-                    'recommended_order': [
-                        'Root enhancers',
-                        'Humic/Fulvic acids',
-                        'PK boosters',
-                        'Enzymes',
-                        'Beneficial bacteria'
-                    ],
-                    'amounts': {n[0]: f"{n[1]['amount']} {n[1].get('unit', 'ml')}" 
-                              for n in supplements},
-                    'wait_time': '60 seconds between each'
-                })
-            
-            # Step 8: Final Adjustments
-            instructions.append({
-                'step': 8,
-                'title': 'Final Adjustments',
-                'description': "Make final pH and EC adjustments",
-                'tips': [
-                    'Adjust pH to target range',
-                    'Verify final EC/PPM',
-                    'Let solution sit for 15 minutes',
-                    'Take final readings',
-                    'Document all measurements'
-                ],
-                'target_measurements': {
-                    'Final pH': recipe_data.get('target_ph', '5.8-6.2'),
-                    'Final EC': recipe_data.get('target_ec', 'See feeding chart'),
-                    'Solution Temp': '65-75°F'
-                },
-                'verification_steps': [
-                    'Check solution clarity',
-                    'Verify no precipitation',
-                    'Confirm all nutrients dissolved',
-                    'Record final measurements'
-                ]
-            })
-            
-            return instructions
-            
-        except Exception as e:
-            logger.error(f"Failed to generate mixing instructions: {str(e)}")
-            return []
+    def load_recipes(self):
+        """Load saved recipes from the store"""
+        return self.recipes
 
     def display_recipe(self, name):
         """Display recipe with detailed mixing instructions"""
@@ -550,169 +183,8 @@ class RecipeManager:
             logger.error(f"Failed to display recipe: {str(e)}")
             return False
 
-    def get_recipe(self, name):
-        """Get a specific recipe"""
-        return self.recipes.get(name)
-
-    def list_recipes(self):
-        """List all saved recipes"""
-        return list(self.recipes.keys())
-
-    def delete_recipe(self, name):
-        """Delete a recipe"""
-        if name in self.recipes:
-            del self.recipes[name]
-            st.session_state.saved_recipes = self.recipes
-            return True
-        return False
-
-    def get_all_strains(self):
-        """Get list of all strains used in recipes"""
-        try:
-            strains = set()
-            for recipe in self.recipes.values():
-                if 'strain' in recipe:
-                    strains.add(recipe['strain'])
-            return sorted(list(strains))
-        except Exception as e:
-            logger.error(f"Failed to get strains: {str(e)}")
-            return []
-
-    def get_all_tags(self):
-        """Get list of all tags used in recipes"""
-        try:
-            tags = set()
-            for recipe in self.recipes.values():
-                if 'tags' in recipe:
-                    tags.update(recipe.get('tags', []))
-            return sorted(list(tags))
-        except Exception as e:
-            logger.error(f"Failed to get tags: {str(e)}")
-            return []
-
-    def get_recipe_history(self, strain=None, growth_phase=None, tags=None):
-        """Get filtered recipe history"""
-        try:
-            filtered_recipes = []
-            for name, recipe in self.recipes.items():
-                # Apply filters
-                if strain and recipe.get('strain') != strain:
-                    continue
-                if growth_phase and recipe.get('growth_phase') != growth_phase:
-                    continue
-                if tags and not all(tag in recipe.get('tags', []) for tag in tags):
-                    continue
-                
-                # Add recipe to filtered list with name
-                recipe_copy = recipe.copy()
-                recipe_copy['name'] = name
-                filtered_recipes.append(recipe_copy)
-            
-            # Sort by creation date
-            return sorted(filtered_recipes, 
-                        key=lambda x: x.get('created_at', ''), 
-                        reverse=True)
-        except Exception as e:
-            logger.error(f"Failed to get recipe history: {str(e)}")
-            return []
-
-    def save_recipe_with_metadata(self, name, recipe_data, strain=None, tags=None):
-        """Save recipe with additional metadata"""
-        try:
-            if not name or not recipe_data:
-                raise ValueError("Recipe name and data are required")
-            
-            # Add metadata
-            recipe_data.update({
-                'created_at': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
-                'recipe_id': st.session_state.recipe_count + 1,
-                'strain': strain,
-                'tags': tags or [],
-                'mixing_instructions': self.generate_mixing_instructions(recipe_data),
-                'last_modified': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
-                'version': 1,
-                'results': []
-            })
-            
-            self.recipes[name] = recipe_data
-            st.session_state.saved_recipes = self.recipes
-            st.session_state.recipe_count += 1
-            
-            logger.info(f"Recipe saved successfully: {name}")
-            return True
-        except Exception as e:
-            logger.error(f"Failed to save recipe: {str(e)}")
-            return False
-
-    def add_recipe_result(self, name, result_data):
-        """Add result data to existing recipe"""
-        try:
-            if name not in self.recipes:
-                raise ValueError(f"Recipe '{name}' not found")
-            
-            if 'results' not in self.recipes[name]:
-                self.recipes[name]['results'] = []
-            
-            result_data['date'] = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-            self.recipes[name]['results'].append(result_data)
-            st.session_state.saved_recipes = self.recipes
-            
-            logger.info(f"Result added to recipe: {name}")
-            return True
-        except Exception as e:
-            logger.error(f"Failed to add recipe result: {str(e)}")
-            return False
-
-    def export_recipe(self, name):
-        """Export recipe as JSON"""
-        try:
-            if name not in self.recipes:
-                raise ValueError(f"Recipe '{name}' not found")
-            
-            recipe_data = self.recipes[name].copy()
-            recipe_data['exported_at'] = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-            
-            return json.dumps(recipe_data, indent=2)
-        except Exception as e:
-            logger.error(f"Failed to export recipe: {str(e)}")
-            return None
-
-    def import_recipe(self, name, recipe_json):
-        """Import recipe from JSON"""
-        try:
-            recipe_data = json.loads(recipe_json)
-            recipe_data['imported_at'] = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-            recipe_data['version'] = recipe_data.get('version', 1)
-            
-            return self.save_recipe(name, recipe_data)
-        except Exception as e:
-            logger.error(f"Failed to import recipe: {str(e)}")
-            return False
-
-    def duplicate_recipe(self, name, new_name):
-        """Duplicate an existing recipe"""
-        try:
-            if name not in self.recipes:
-                raise ValueError(f"Recipe '{name}' not found")
-            
-            recipe_data = self.recipes[name].copy()
-            recipe_data['duplicated_from'] = name
-            recipe_data['created_at'] = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
-            recipe_data['version'] = 1
-            recipe_data['results'] = []  # Don't copy results
-            
-            return self.save_recipe(new_name, recipe_data)
-        except Exception as e:
-            logger.error(f"Failed to duplicate recipe: {str(e)}")
-            return False
-
 class NutrientCalculatorUI:
     def __init__(self):
-        # Initialize Streamlit session state first
-        if 'saved_recipes' not in st.session_state:
-            st.session_state.saved_recipes = {}
-            st.session_state.recipe_count = 0
-        
         self.debugger = create_debugger()
         
         # Initialize data first
@@ -730,184 +202,9 @@ class NutrientCalculatorUI:
     def load_data(self):
         """Load nutrient profiles and strain data"""
         try:
-            # Initialize nutrient lines with detailed information
-            self.nutrient_lines = {
-                'General Hydroponics': {
-                    'base_nutrients': {
-                        'Flora Micro': {
-                            'type': 'micro',
-                            'max_strength': 4.0,  # ml per gallon
-                            'npk': '5-0-1',
-                            'description': 'Concentrated micronutrients and calcium',
-                            'when_to_use': 'Throughout entire grow cycle',
-                            'benefits': ['Essential micronutrients', 'Calcium source', 'Iron source'],
-                            'cautions': ['Add before Flora Grow and Flora Bloom', 'Can stain', 'Required for all stages'],
-                            'ec_impact': 'Medium',
-                            'ph_impact': 'Slight decrease'
-                        },
-                        'Flora Grow': {
-                            'type': 'grow',
-                            'max_strength': 4.0,  # ml per gallon
-                            'npk': '2-1-6',
-                            'description': 'Promotes structural and vegetative growth',
-                            'when_to_use': 'Heavy in veg, reduced in flower',
-                            'benefits': ['Promotes leaf growth', 'Enhances node spacing', 'Builds structure'],
-                            'cautions': ['Add after Flora Micro', 'Reduce during flowering'],
-                            'ec_impact': 'Medium',
-                            'ph_impact': 'Slight decrease'
-                        },
-                        'Flora Bloom': {
-                            'type': 'bloom',
-                            'max_strength': 4.0,  # ml per gallon
-                            'npk': '0-5-4',
-                            'description': 'Promotes flower development and fruiting',
-                            'when_to_use': 'During flowering phase',
-                            'benefits': ['Enhances flower development', 'Improves yield', 'Boosts essential oils'],
-                            'cautions': ['Add last of base nutrients', 'Monitor EC levels']
-                        }
-                    },
-                    'supplements': {
-                        'CaliMagic': {
-                            'type': 'calmag',
-                            'max_strength': 5.0,  # ml per gallon
-                            'description': 'GH\'s calcium and magnesium supplement',
-                            'when_to_use': 'Throughout grow cycle, essential with RO water',
-                            'benefits': [
-                                'Prevents calcium deficiency',
-                                'Strengthens cell walls',
-                                'Improves nutrient uptake',
-                                'Prevents magnesium deficiency'
-                            ],
-                            'npk': '1-0-0',
-                            'contains': {'Ca': '5%', 'Mg': '1.5%'},
-                            'cautions': ['Check water hardness first', 'Can raise pH']
-                        },
-                        'Rapid Start': {
-                            'type': 'root',
-                            'max_strength': 2.0,  # ml per gallon
-                            'description': 'GH\'s root development enhancer',
-                            'when_to_use': 'Early growth and transplanting',
-                            'benefits': [
-                                'Accelerates root development',
-                                'Improves nutrient uptake',
-                                'Reduces transplant shock',
-                                'Enhances stress tolerance'
-                            ],
-                            'contains': {'Vitamins': 'B1, B2', 'Hormones': 'IBA, NAA'},
-                            'cautions': ['Reduce after established roots', 'Monitor pH']
-                        },
-                        'Diamond Nectar': {
-                            'type': 'humic',
-                            'max_strength': 2.0,  # ml per gallon
-                            'description': 'GH\'s premium humic acid supplement',
-                            'when_to_use': 'Throughout grow cycle',
-                            'benefits': [
-                                'Improves nutrient uptake',
-                                'Enhances root development',
-                                'Increases chelation',
-                                'Improves soil structure'
-                            ],
-                            'contains': {'Humic acid': '6%', 'Fulvic acid': '3%'},
-                            'cautions': ['Can darken solution', 'Monitor pH']
-                        },
-                        'Armor Si': {
-                            'type': 'silica',
-                            'max_strength': 2.0,  # ml per gallon
-                            'description': 'GH\'s silica supplement',
-                            'when_to_use': 'Throughout grow cycle',
-                            'benefits': [
-                                'Strengthens cell walls',
-                                'Improves heat tolerance',
-                                'Enhances pest resistance',
-                                'Supports heavy flowers'
-                            ],
-                            'contains': {'Si': '0.5%'},
-                            'cautions': [
-                                'Must be added FIRST to nutrient solution',
-                                'Raises pH significantly',
-                                'Don\'t mix directly with concentrated nutrients'
-                            ]
-                        },
-                        'Liquid KoolBloom': {
-                            'type': 'pk_boost',
-                            'max_strength': 2.5,  # ml per gallon
-                            'description': 'GH\'s liquid P-K booster',
-                            'when_to_use': 'Early to mid flowering',
-                            'benefits': [
-                                'Enhances flower formation',
-                                'Improves flower size',
-                                'Boosts essential oil production'
-                            ],
-                            'npk': '0-10-10',
-                            'cautions': ['Monitor EC', 'Can build up salts']
-                        },
-                        'Dry KoolBloom': {
-                            'type': 'ripening',
-                            'max_strength': 1.5,  # grams per gallon
-                            'description': 'GH\'s flowering finisher powder',
-                            'when_to_use': 'Last 2-3 weeks of flower',
-                            'benefits': [
-                                'Triggers ripening',
-                                'Increases resin production',
-                                'Enhances flower density',
-                                'Improves essential oil content'
-                            ],
-                            'npk': '0-27-27',
-                            'cautions': [
-                                'Use only in late flower',
-                                'Monitor EC carefully',
-                                'Can cause lockout if overused',
-                                'Dissolve completely before adding other nutrients'
-                            ]
-                        },
-                        'Floralicious Plus': {
-                            'type': 'enzyme',
-                            'max_strength': 1.0,  # ml per gallon
-                            'description': 'GH\'s organic bioactivator',
-                            'when_to_use': 'Throughout grow cycle',
-                            'benefits': [
-                                'Enhances nutrient uptake',
-                                'Improves flavor profiles',
-                                'Boosts terpene production',
-                                'Supports beneficial microbes'
-                            ],
-                            'contains': {
-                                'Enzymes': 'Multiple',
-                                'Amino acids': 'Complete profile',
-                                'Vitamins': 'B1, B2, B6, B12'
-                            },
-                            'cautions': [
-                                'Shake well before use',
-                                'Can cloud reservoir',
-                                'Add last to nutrient solution'
-                            ]
-                        },
-                        'Florablend': {
-                            'type': 'biostimulant',
-                            'max_strength': 2.0,  # ml per gallon
-                            'description': 'GH\'s organic vegan supplement',
-                            'when_to_use': 'Throughout grow cycle',
-                            'benefits': [
-                                'Enhances nutrient uptake',
-                                'Improves plant vigor',
-                                'Supports beneficial microbes',
-                                'Adds trace elements'
-                            ],
-                            'contains': {
-                                'Seaweed': 'Multiple species',
-                                'Minerals': 'Trace elements',
-                                'Vitamins': 'Natural blend'
-                            },
-                            'cautions': [
-                                'Shake well before use',
-                                'Can settle in reservoir',
-                                'Add after base nutrients'
-                            ]
-                        }
-                    }
-                }
-                # Can add other nutrient lines here (Advanced Nutrients, Fox Farm, etc.)
-            }
+            # Share the process-wide compiled catalog instead of rebuilding it
+            self.catalog = get_catalog('deploy_ui')
+            self.nutrient_lines = self.catalog.nutrient_lines
             logger.info("Nutrient data loaded successfully")
         except Exception as e:
             logger.error(f"Failed to load data: {str(e)}")
@@ -973,19 +270,55 @@ class NutrientCalculatorUI:
         """Render the recipe library section"""
         try:
             st.subheader("Recipe Library")
-            recipes = self.recipe_manager.list_recipes()
-            
-            if recipes:
-                for recipe_name in recipes:
-                    with st.expander(recipe_name):
-                        recipe = self.recipe_manager.get_recipe(recipe_name)
-                        if recipe:
-                            st.json(recipe)
-                            if st.button(f"Load {recipe_name}"):
-                                # Load recipe into calculator
-                                pass
-            else:
-                st.info("No saved recipes yet")
+            manager = self.recipe_manager
+
+            # Filters and page size; only the current page is ever loaded
+            col1, col2, col3, col4 = st.columns([2, 2, 3, 1])
+            with col1:
+                growth_phase = st.selectbox("Growth Phase", ["All"] + list(TARGET_EC_RANGES), key="library_phase")
+            with col2:
+                strain = st.selectbox("Strain", ["All"] + manager.get_all_strains(), key="library_strain")
+            with col3:
+                tags = st.multiselect("Tags", manager.get_all_tags(), key="library_tags")
+            with col4:
+                page_size = st.selectbox("Per page", LIBRARY_PAGE_SIZES, index=1, key="library_page_size")
+
+            filters = {
+                'strain': None if strain == "All" else strain,
+                'growth_phase': None if growth_phase == "All" else growth_phase,
+                'tags': tags
+            }
+            total = manager.find_recipes(**filters, limit=0).total
+            if not total:
+                st.info("No recipes match these filters" if any(filters.values()) else "No saved recipes yet")
+                return
+
+            pages = (total + page_size - 1) // page_size
+            page_number = st.number_input(f"Page (of {pages})", min_value=1, max_value=pages, value=1)
+            page = manager.find_recipes(
+                **filters, offset=(page_number - 1) * page_size, limit=page_size, fields=LIBRARY_FIELDS
+            )
+            st.caption(f"Recipes {page.offset + 1}-{page.offset + len(page)} of {total}")
+
+            # Summary table from the projection; the full recipe is read only for the selected row
+            table = pd.DataFrame(
+                [{'Name': name, **{label: summary.get(field) for field, label in LIBRARY_FIELDS.items()}}
+                 for name, summary in page]
+            )
+            event = st.dataframe(
+                table, hide_index=True, use_container_width=True,
+                on_select="rerun", selection_mode="single-row", key="library_table"
+            )
+            selected_rows = event.selection.rows if event else []
+            if selected_rows:
+                recipe_name = page.names()[selected_rows[0]]
+                recipe = manager.get_recipe(recipe_name)
+                if recipe:
+                    with st.expander(recipe_name, expanded=True):
+                        st.json(recipe)
+                        if st.button(f"Load {recipe_name}"):
+                            # Load recipe into calculator
+                            pass
                 
         except Exception as e:
             logger.error(f"Failed to render recipe library: {str(e)}")
@@ -1116,10 +449,6 @@ class NutrientCalculatorUI:
         # Get base multiplier from strain profile
         base_multiplier = self.strain_profiles[strain_type]['nutrient_multiplier']
         
-        # Get nutrients from selected line
-        base_nutrients = self.nutrient_lines[nutrient_line]['base_nutrients']
-        supplements = self.nutrient_lines[nutrient_line]['supplements']
-        
         # Stage-based multipliers
         stage_multipliers = {
             "Seedling": 0.25,
@@ -1129,22 +458,21 @@ class NutrientCalculatorUI:
             "Late Flower": 1.0
         }
         
-        # Calculate amounts
+        # Calculate every product in the line with one array operation
+        catalog = self.catalog
+        product_ids = catalog.ids_for_line(nutrient_line)
+        amounts = round_like_python(
+            catalog.max_strength[product_ids] * stage_multipliers[stage] * base_multiplier * volume_liters,
+            1
+        ).tolist()
+        
         base_amounts = {}
-        for nutrient, info in base_nutrients.items():
-            amount = (info['max_strength'] * 
-                     stage_multipliers[stage] * 
-                     base_multiplier * 
-                     volume_liters)
-            base_amounts[nutrient] = round(amount, 1)
-            
         supplement_amounts = {}
-        for supp, info in supplements.items():
-            amount = (info['max_strength'] * 
-                     stage_multipliers[stage] * 
-                     base_multiplier * 
-                     volume_liters)
-            supplement_amounts[supp] = round(amount, 1)
+        for product_id, amount in zip(product_ids, amounts):
+            if catalog.is_supplement[product_id]:
+                supplement_amounts[catalog.names[product_id]] = amount
+            else:
+                base_amounts[catalog.names[product_id]] = amount
             
         return base_amounts, supplement_amounts
 
@@ -1304,24 +632,17 @@ class NutrientCalculatorUI:
         }
 
     def save_recipe(self, recipe_data):
-        """Save nutrient recipe to JSON file"""
+        """Save nutrient recipe to the recipe journal"""
         try:
-            recipes_file = Path("saved_recipes.json")
-            existing_recipes = []
-            
-            if recipes_file.exists():
-                with open(recipes_file, 'r') as f:
-                    existing_recipes = json.load(f)
+            # Appends one line; saved_recipes.json from earlier versions is imported once
+            journal = get_recipe_journal()
             
             # Add timestamp and name to recipe
             recipe_data['timestamp'] = datetime.now().isoformat()
             recipe_data['name'] = st.text_input("Recipe Name", 
-                                              value=f"Recipe {len(existing_recipes) + 1}")
-            
-            existing_recipes.append(recipe_data)
+                                              value=f"Recipe {len(journal) + 1}")
             
-            with open(recipes_file, 'w') as f:
-                json.dump(existing_recipes, f, indent=4)
+            journal.append(recipe_data)
                 
             st.success("Recipe saved successfully!")
             
@@ -1331,17 +652,14 @@ class NutrientCalculatorUI:
     def load_recipe(self):
         """Load saved nutrient recipe"""
         try:
-            recipes_file = Path("saved_recipes.json")
-            if recipes_file.exists():
-                with open(recipes_file, 'r') as f:
-                    recipes = json.load(f)
-                
-                recipe_names = [r['name'] for r in recipes]
+            journal = get_recipe_journal()
+            recipe_names = journal.names()
+            if recipe_names:
                 selected_recipe = st.selectbox("Load Saved Recipe", recipe_names)
                 
                 if selected_recipe:
-                    recipe = next(r for r in recipes if r['name'] == selected_recipe)
-                    return recipe
+                    # Reads only the selected recipe's line
+                    return journal.get(selected_recipe)
                     
         except Exception as e:
             st.error(f"Error loading recipe: {str(e)}")
@@ -1590,70 +908,57 @@ class NutrientCalculatorUI:
                 brand.get('nutrient_line', 'General Hydroponics')
             )
             
-            # Add base nutrients to results
+            # Add base nutrients to results (EC coefficients and N-P-K come pre-parsed from the catalog)
             for nutrient, amount in base_amounts.items():
-                details = self.nutrient_lines[brand['nutrient_line']]['base_nutrients'][nutrient]
+                product_id = self.catalog.product_id(nutrient, brand['nutrient_line'], 'base_nutrients')
+                ec_impact = float(self.catalog.ec_coefficient[product_id])
                 results.append({
                     'Nutrient': f"{brand['nutrient_line']} {nutrient}",
                     'Amount (ml)': f"{amount:.1f}",
                     'ml/L': f"{amount/size:.2f}",
                     'Type': 'Brand Base',
-                    'EC Impact': details.get('ec_impact', 0.2)
+                    'EC Impact': ec_impact
                 })
-                total_ec += details.get('ec_impact', 0.2) * (amount/size)
+                total_ec += ec_impact * (amount/size)
                 
                 # Track NPK
-                if 'npk' in details:
-                    n, p, k = map(float, details['npk'].split('-'))
-                    total_n += n * (amount/size)
-                    total_p += p * (amount/size)
-                    total_k += k * (amount/size)
+                n, p, k = self.catalog.npk[product_id]
+                total_n += n * (amount/size)
+                total_p += p * (amount/size)
+                total_k += k * (amount/size)
             
             # Add supplements to results
             for supp, amount in supplement_amounts.items():
-                details = self.nutrient_lines[brand['nutrient_line']]['supplements'][supp]
+                product_id = self.catalog.product_id(supp, brand['nutrient_line'], 'supplements')
+                ec_impact = float(self.catalog.ec_coefficient[product_id])
                 results.append({
                     'Nutrient': f"{brand['nutrient_line']} {supp}",
                     'Amount (ml)': f"{amount:.1f}",
                     'ml/L': f"{amount/size:.2f}",
                     'Type': 'Brand Supplement',
-                    'EC Impact': details.get('ec_impact', 0.1)
+                    'EC Impact': ec_impact
                 })
-                total_ec += details.get('ec_impact', 0.1) * (amount/size)
-        
-        # Calculate generic compounds
-        generic_compounds = {
-            'Calcium Nitrate': {'ec_impact': 0.12, 'npk': '15.5-0-0'},
-            'Potassium Nitrate': {'ec_impact': 0.13, 'npk': '13-0-46'},
-            'Magnesium Sulfate': {'ec_impact': 0.06, 'npk': '0-0-0'},
-            'Monopotassium Phosphate': {'ec_impact': 0.08, 'npk': '0-52-34'},
-            'Iron DTPA': {'ec_impact': 0.02, 'npk': '0-0-0'},
-            'Manganese EDTA': {'ec_impact': 0.01, 'npk': '0-0-0'},
-            'Zinc EDTA': {'ec_impact': 0.01, 'npk': '0-0-0'},
-            'Boric Acid': {'ec_impact': 0.01, 'npk': '0-0-0'},
-            'Copper EDTA': {'ec_impact': 0.01, 'npk': '0-0-0'},
-            'Sodium Molybdate': {'ec_impact': 0.01, 'npk': '0-0-0'}
-        }
+                total_ec += ec_impact * (amount/size)
         
         for compound, is_selected in selected_nutrients.get('generic_compounds', {}).items():
-            if is_selected and compound in generic_compounds:
+            if is_selected and compound in GENERIC_COMPOUNDS:
+                details = GENERIC_COMPOUNDS[compound]
                 # Calculate amount based on standard rates
-                amount = size * (strength/100) * generic_compounds[compound]['ec_impact'] * 10
+                amount = size * (strength/100) * details['ec_impact'] * 10
                 results.append({
                     'Nutrient': compound,
                     'Amount (g)': f"{amount:.1f}",
                     'g/L': f"{amount/size:.3f}",
                     'Type': 'Generic',
-                    'EC Impact': generic_compounds[compound]['ec_impact']
+                    'EC Impact': details['ec_impact']
                 })
-                total_ec += generic_compounds[compound]['ec_impact'] * (amount/size)
+                total_ec += details['ec_impact'] * (amount/size)
                 
                 # Track NPK for generic compounds
-                if 'npk' in generic_compounds[compound]:
-                    n, p, k = map(float, generic_compounds[compound]['npk'].split('-'))
-                    total_n += n * (amount/size)
-                    total_p += p * (amount/size)
-                    total_k += k * (amount/size)
+                n, p, k = details['npk']
+                total_n += n * (amount/size)
+                total_p += p * (amount/size)
+                total_k += k * (amount/size)
         
         # Add totals and analysis
         analysis = {
@@ -1662,24 +967,19 @@ class NutrientCalculatorUI:
             'Total P': f"{total_p:.1f}",
             'Total K': f"{total_k:.1f}",
             'Target EC Range': self.get_target_ec_range(growth_stage),
-            'NPK Ratio': f"{total_n:.1f}-{total_p:.1f}-{total_k:.1f}"
+            'NPK Ratio': f"{total_n:.1f}-{total_p:.1f}-{total_k:.1f}",
+            'values': self._analysis_values(total_ec, total_n, total_p, total_k, growth_stage)
         }
         
         return results, analysis
 
-    def get_target_ec_range(self, growth_stage):
-        """Get target EC range based on growth stage"""
-        ranges = {
-            'Seedling': '0.4-0.8',
-            'Early Veg': '0.8-1.2',
-            'Late Veg': '1.2-1.6',
-            'Pre-Flower': '1.4-1.8',
-            'Early Flower': '1.6-2.0',
-            'Mid Flower': '1.8-2.2',
-            'Late Flower': '1.4-1.8',
-            'Flush': '0.0-0.2'
+    def _analysis_values(self, total_ec, total_n, total_p, total_k, growth_stage):
+        """Numeric analysis values so displays never re-parse formatted strings"""
+        return {
+            'ec': total_ec,
+            'npk': (total_n, total_p, total_k),
+            'target_ec': TARGET_EC_RANGES.get(growth_stage, DEFAULT_TARGET_EC_RANGE)
         }
-        return ranges.get(growth_stage, '1.0-1.4')
 
     def display_nutrient_analysis(self, analysis):
         """Display detailed nutrient analysis"""
@@ -1691,9 +991,8 @@ class NutrientCalculatorUI:
             st.metric("NPK Ratio", analysis['NPK Ratio'])
             
             # Create EC gauge
-            target_range = analysis['Target EC Range'].split('-')
-            target_min, target_max = map(float, target_range)
-            current_ec = float(analysis['Total EC'])
+            target_min, target_max = analysis['values']['target_ec']
+            current_ec = analysis['values']['ec']
             
             fig = go.Figure(go.Indicator(
                 mode = "gauge+number",
@@ -1722,11 +1021,7 @@ class NutrientCalculatorUI:
             # Create NPK bar chart
             npk_data = {
                 'Nutrient': ['N', 'P', 'K'],
-                'Value': [
-                    float(analysis['Total N']),
-                    float(analysis['Total P']),
-                    float(analysis['Total K'])
-                ]
+                'Value': list(analysis['values']['npk'])
             }
             fig = px.bar(npk_data, x='Nutrient', y='Value', title='NPK Distribution')
             st.plotly_chart(fig)
@@ -1739,74 +1034,17 @@ class NutrientCalculatorUI:
         total_p = 0
         total_k = 0
         
-        # Generic compound properties
-        compounds = {
-            'Calcium Nitrate': {
-                'ec_impact': 0.12,
-                'npk': '15.5-0-0',
-                'base_rate': 0.8,  # g/L
-                'stages': {
-                    'Seedling': 0.5,
-                    'Early Veg': 0.7,
-                    'Late Veg': 0.9,
-                    'Early Flower': 1.0,
-                    'Mid Flower': 0.8,
-                    'Late Flower': 0.6
-                }
-            },
-            'Potassium Nitrate': {
-                'ec_impact': 0.13,
-                'npk': '13-0-46',
-                'base_rate': 0.6,
-                'stages': {
-                    'Seedling': 0.3,
-                    'Early Veg': 0.5,
-                    'Late Veg': 0.7,
-                    'Early Flower': 1.0,
-                    'Mid Flower': 1.2,
-                    'Late Flower': 0.8
-                }
-            },
-            'Magnesium Sulfate': {
-                'ec_impact': 0.06,
-                'npk': '0-0-0',
-                'base_rate': 0.5,
-                'stages': {
-                    'Seedling': 0.5,
-                    'Early Veg': 0.7,
-                    'Late Veg': 0.8,
-                    'Early Flower': 1.0,
-                    'Mid Flower': 1.0,
-                    'Late Flower': 0.8
-                }
-            },
-            'Monopotassium Phosphate': {
-                'ec_impact': 0.08,
-                'npk': '0-52-34',
-                'base_rate': 0.4,
-                'stages': {
-                    'Seedling': 0.3,
-                    'Early Veg': 0.5,
-                    'Late Veg': 0.7,
-                    'Early Flower': 1.0,
-                    'Mid Flower': 1.2,
-                    'Late Flower': 0.8
-                }
-            }
-        }
-        
         for compound, selected in selected_compounds.items():
-            if selected and compound in compounds:
-                details = compounds[compound]
+            if selected and compound in GENERIC_DOSING:
+                details = GENERIC_DOSING[compound]
                 stage_multiplier = details['stages'].get(growth_stage, 1.0)
                 amount = details['base_rate'] * stage_multiplier * (strength / 100) * size
                 
                 # Calculate NPK contribution
-                if 'npk' in details:
-                    n, p, k = map(float, details['npk'].split('-'))
-                    total_n += n * (amount/size)
-                    total_p += p * (amount/size)
-                    total_k += k * (amount/size)
+                n, p, k = details['npk']
+                total_n += n * (amount/size)
+                total_p += p * (amount/size)
+                total_k += k * (amount/size)
                 
                 # Add to results
                 results.append({
@@ -1824,16 +1062,23 @@ class NutrientCalculatorUI:
             'Total P': f"{total_p:.1f}",
             'Total K': f"{total_k:.1f}",
             'NPK Ratio': f"{total_n:.1f}-{total_p:.1f}-{total_k:.1f}",
-            'Target EC Range': self.get_target_ec_range(growth_stage)
+            'Target EC Range': self.get_target_ec_range(growth_stage),
+            'values': self._analysis_values(total_ec, total_n, total_p, total_k, growth_stage)
         }
 
+    def _in_mixing_order(self, rows):
+        """Order result rows with the shared mixing-order scheduler"""
+        by_name = {row['Nutrient']: row for row in rows}
+        order = mixing_sequence([(name, determine_nutrient_type(name)) for name in by_name])
+        return [by_name[name] for name in order]
+
     def get_mixing_instructions(self, results):
         """Generate mixing instructions based on calculations"""
         instructions = []
         
         # Sort nutrients by type and mixing order
-        base_nutrients = [r for r in results if r['Type'] == 'Brand Base']
-        supplements = [r for r in results if r['Type'] == 'Brand Supplement']
+        base_nutrients = self._in_mixing_order([r for r in results if r['Type'] == 'Brand Base'])
+        supplements = self._in_mixing_order([r for r in results if r['Type'] == 'Brand Supplement'])
         generic_compounds = [r for r in results if r['Type'] == 'Generic']
         
         instructions.append("Mixing Instructions:")
@@ -1966,12 +1211,9 @@ class NutrientCalculatorUI:
                 }
             }
             
-            # Try to load strain data from files
+            # Read once per process, reusing the strain pack for files that have not changed
             if strain_data_path.exists():
-                for strain_file in strain_data_path.glob("*.json"):
-                    with open(strain_file, 'r') as f:
-                        strain_info = json.load(f)
-                        self.strain_database[strain_info['name']] = strain_info
+                self.strain_database = dict(get_strain_directory(str(strain_data_path)))
             else:
                 self.strain_database = default_strains
                 logger.warning("Using default strain profiles - could not load strain database")
@@ -1991,17 +1233,8 @@ class NutrientCalculatorUI:
 
     def get_target_ec_range(self, growth_stage):
         """Get target EC range based on growth stage"""
-        ec_ranges = {
-            'Seedling': '0.4-0.8',
-            'Early Veg': '0.8-1.2',
-            'Late Veg': '1.2-1.6',
-            'Pre-Flower': '1.4-1.8',
-            'Early Flower': '1.6-2.0',
-            'Mid Flower': '1.8-2.2',
-            'Late Flower': '1.4-1.8',
-            'Flush': '0.0-0.2'
-        }
-        return ec_ranges.get(growth_stage, '1.0-1.4')
+        low, high = TARGET_EC_RANGES.get(growth_stage, DEFAULT_TARGET_EC_RANGE)
+        return f"{low}-{high}"
 
     def get_temp_range(self, growth_stage):
         """Get target temperature range based on growth stage"""
@@ -2110,51 +1343,11 @@ class NutrientCalculatorUI:
     def get_feeding_schedule(self, nutrient_line, growth_stage, strain_type='Medium Feeders'):
         """Get detailed feeding schedule with adjustments"""
         try:
-            base_schedules = {
-                'General Hydroponics': {
-                    'Seedling': {
-                        'Flora Micro': 0.25, 'Flora Grow': 0.25, 'Flora Bloom': 0.25, 
-                        'CaliMagic': 0.5, 'Rapid Start': 0.5
-                    },
-                    'Early Veg': {
-                        'Flora Micro': 1.0, 'Flora Grow': 1.5, 'Flora Bloom': 0.5, 
-                        'CaliMagic': 1.0, 'Rapid Start': 1.0, 'Armor Si': 0.5
-                    },
-                    'Late Veg': {
-                        'Flora Micro': 2.0, 'Flora Grow': 2.0, 'Flora Bloom': 1.0, 
-                        'CaliMagic': 1.5, 'Armor Si': 1.0, 'Diamond Nectar': 1.0
-                    },
-                    'Pre-Flower': {
-                        'Flora Micro': 2.0, 'Flora Grow': 1.5, 'Flora Bloom': 2.0, 
-                        'CaliMagic': 2.0, 'Armor Si': 1.0, 'Liquid KoolBloom': 0.5
-                    },
-                    'Early Flower': {
-                        'Flora Micro': 2.0, 'Flora Grow': 1.0, 'Flora Bloom': 2.5, 
-                        'CaliMagic': 2.0, 'Liquid KoolBloom': 1.0
-                    },
-                    'Mid Flower': {
-                        'Flora Micro': 2.0, 'Flora Grow': 0.5, 'Flora Bloom': 3.0, 
-                        'CaliMagic': 2.0, 'Liquid KoolBloom': 2.0, 'Dry KoolBloom': 0.5
-                    },
-                    'Late Flower': {
-                        'Flora Micro': 1.5, 'Flora Grow': 0, 'Flora Bloom': 2.5, 
-                        'CaliMagic': 1.5, 'Dry KoolBloom': 1.0
-                    },
-                    'Flush': {'Flora Micro': 0, 'Flora Grow': 0, 'Flora Bloom': 0}
-                }
-                # Add other nutrient lines here...
-            }
-            
             # Get base schedule
-            schedule = base_schedules.get(nutrient_line, {}).get(growth_stage, {})
+            schedule = FEEDING_SCHEDULES.get(nutrient_line, {}).get(growth_stage, {})
             
             # Apply strain type multiplier
-            strain_multipliers = {
-                'Heavy Feeders': 1.2,
-                'Medium Feeders': 1.0,
-                'Light Feeders': 0.8
-            }
-            multiplier = strain_multipliers.get(strain_type, 1.0)
+            multiplier = FEEDING_MULTIPLIERS.get(strain_type, 1.0)
             
             # Adjust amounts based on strain type
             adjusted_schedule = {
@@ -2173,6 +1366,19 @@ class NutrientCalculatorUI:
             })
             return {}
 
+    def get_season_plan(self, nutrient_line, reservoir_size, stage_weeks, strain_type='Medium Feeders', unit_system='US'):
+        """Get the week-by-week feeding plan and bottle totals for a whole season"""
+        try:
+            return plan_season(nutrient_line, strain_type, reservoir_size, stage_weeks, unit_system)
+        except Exception as e:
+            self.debugger.track_error(e, {
+                'method': 'get_season_plan',
+                'nutrient_line': nutrient_line,
+                'stage_weeks': stage_weeks,
+                'strain_type': strain_type
+            })
+            return None
+
     def display_feeding_schedule(self, nutrient_line, growth_stage, strain_type='Medium Feeders'):
         """Display enhanced feeding schedule with additional information"""
         try:
@@ -2214,12 +1420,10 @@ class NutrientCalculatorUI:
     def get_nutrient_type(self, nutrient_line, nutrient_name):
         """Get the type of nutrient"""
         try:
-            line_data = self.nutrient_lines.get(nutrient_line, {})
-            if nutrient_name in line_data.get('base_nutrients', {}):
-                return line_data['base_nutrients'][nutrient_name].get('type', 'base')
-            elif nutrient_name in line_data.get('supplements', {}):
-                return line_data['supplements'][nutrient_name].get('type', 'supplement')
-            return 'unknown'
+            product_id = self.catalog.product_id(nutrient_name, nutrient_line)
+            if product_id is None:
+                return 'unknown'
+            return self.catalog.type_name(product_id)
         except Exception:
             return 'unknown'
 
@@ -2268,27 +1472,20 @@ class NutrientCalculatorUI:
             final_multiplier = base_multiplier * stage_multiplier * strain_multiplier
             
             # Calculate amounts for each selected nutrient
+            catalog = self.catalog
             for nutrient_name in selected_nutrients:
-                for line, products in self.nutrient_lines.items():
-                    if nutrient_name in products['base_nutrients']:
-                        nutrient = products['base_nutrients'][nutrient_name]
-                        max_strength = nutrient.get('max_strength', 4.0)  # Default to 4.0 if not specified
-                        amount = round(max_strength * final_multiplier * float(size), 2)
-                        results[nutrient_name] = {
-                            'amount': amount,
-                            'unit': 'ml',
-                            'npk': nutrient.get('npk', 'N/A'),
-                            'type': nutrient.get('type', 'base')
-                        }
-                    elif nutrient_name in products['supplements']:
-                        supplement = products['supplements'][nutrient_name]
-                        max_strength = supplement.get('max_strength', 2.0)  # Default to 2.0 for supplements
-                        amount = round(max_strength * final_multiplier * float(size), 2)
-                        results[nutrient_name] = {
-                            'amount': amount,
-                            'unit': 'ml',
-                            'type': supplement.get('type', 'supplement')
-                        }
+                product_id = catalog.product_id(nutrient_name)
+                if product_id is None:
+                    continue
+                max_strength = float(catalog.max_strength[product_id])
+                amount = round(max_strength * final_multiplier * float(size), 2)
+                results[nutrient_name] = {
+                    'amount': amount,
+                    'unit': catalog.units[product_id]
+                }
+                if not catalog.is_supplement[product_id]:
+                    results[nutrient_name]['npk'] = catalog.details(product_id).get('npk', 'N/A')
+                results[nutrient_name]['type'] = catalog.type_name(product_id)
             
             return results
             
@@ -2340,12 +1537,39 @@ class NutrientCalculatorUI:
             ec_target = st.slider("Target EC (mS/cm)", 0.5, 3.0, 1.8, 0.1)
             size = st.number_input("Reservoir Size (gallons)", min_value=1, value=5)
 
+        solve_from_ec = st.checkbox(
+            "Solve strength from target EC",
+            help="Compute the strength that reaches the target EC instead of using the slider"
+        )
+
         if st.button("Calculate Recipe"):
+            if solve_from_ec:
+                strength = self.solve_strength_for_ec(ec_target, growth_phase, size)
             if selected_recipe == "New Recipe":
                 self.create_new_recipe(growth_phase, strength, ph_target, ec_target, size)
             else:
                 self.modify_existing_recipe(selected_recipe, growth_phase, strength, ph_target, ec_target, size)
 
+    def solve_strength_for_ec(self, ec_target, growth_phase, size, nutrient_line='General Hydroponics'):
+        """Solve and display the strength that reaches ec_target"""
+        solution = solve_for_ec(self.catalog, nutrient_line, ec_target, growth_phase, size)
+        strength = round(float(solution.strengths[0]), 1)
+
+        if solution.reachable[0]:
+            st.info(f"Solved strength: {strength}% (predicted EC {solution.achieved_ec[0]:.2f} mS/cm)")
+        else:
+            st.warning(
+                f"Target EC {ec_target} is out of reach for {growth_phase}; "
+                f"using {strength}% (predicted EC {solution.achieved_ec[0]:.2f} mS/cm)"
+            )
+
+        st.dataframe(pd.DataFrame({
+            'Nutrient': solution.doses.products,
+            'ml/gal': solution.doses.per_unit[0],
+            'Amount (ml)': solution.doses.amounts[0]
+        }))
+        return strength
+
     def create_new_recipe(self, growth_phase, strength, ph_target, ec_target, size):
         """Create a new recipe with the given parameters"""
         recipe_data = {
@@ -1,5 +1,7 @@
-import requests
 from typing import Dict, List, Optional
+from hydrocalc.lazy import lazy_import
+
+requests = lazy_import('requests')
 
 class StrainAPI:
     def __init__(self):
@@ -0,0 +1,30 @@
+"""Headless calculation core for the Professional Hydroponic Calculator
+
+The package-level names come from hydrocalc.engine, which needs numpy; they
+are resolved on first access so importing a submodule that does not use
+numpy (parsing, instructions, ...) does not pay for it.
+"""
+import importlib
+
+# Package-level name -> submodule it is defined in
+_EXPORTS = {
+    'GALLONS_PER_LITER': 'hydrocalc.engine',
+    'STAGE_MULTIPLIERS': 'hydrocalc.engine',
+    'DoseTable': 'hydrocalc.engine',
+    'calculate_doses': 'hydrocalc.engine',
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name):
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
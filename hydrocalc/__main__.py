@@ -0,0 +1,5 @@
+import sys
+
+from hydrocalc.cli import main
+
+sys.exit(main())
@@ -0,0 +1,217 @@
+"""Compiled, array-backed nutrient catalog shared by every calculator path"""
+import functools
+import hashlib
+import json
+from types import MappingProxyType
+from typing import Dict, List, Mapping, Optional, Tuple
+
+import numpy as np
+
+from hydrocalc.data import DEPLOY_NUTRIENT_LINES, DEPLOY_UI_NUTRIENT_LINES, NUTRIENT_LINES
+from hydrocalc.parsing import parse_npk
+
+SECTIONS = ('base_nutrients', 'supplements')
+
+# Built-in line sets by name: each app compiles the lines it was written against
+LINE_SETS = {
+    'default': NUTRIENT_LINES,
+    'deploy': DEPLOY_NUTRIENT_LINES,
+    'deploy_ui': DEPLOY_UI_NUTRIENT_LINES
+}
+
+# Supplements every calculated recipe doses alongside the base nutrients
+CORE_SUPPLEMENT_TYPES = ('calmag', 'silica', 'pk_boost')
+
+# Qualitative EC impact labels mapped to mS/cm per ml/gal
+EC_IMPACT_LEVELS = {
+    'Low': 0.1,
+    'Medium': 0.2,
+    'High': 0.3
+}
+
+# EC impact assumed when a product does not list one
+DEFAULT_EC_IMPACT = {
+    'base_nutrients': 0.2,
+    'supplements': 0.1
+}
+
+
+class CatalogError(ValueError):
+    """Raised at load time when nutrient line definitions are malformed"""
+
+
+def _freeze(value):
+    """Recursively convert dicts and lists into read-only equivalents"""
+    if isinstance(value, dict):
+        return MappingProxyType({key: _freeze(item) for key, item in value.items()})
+    if isinstance(value, list):
+        return tuple(_freeze(item) for item in value)
+    return value
+
+
+def _thaw(value):
+    """Inverse of _freeze, producing plain dicts and lists"""
+    if isinstance(value, Mapping):
+        return {key: _thaw(item) for key, item in value.items()}
+    if isinstance(value, tuple):
+        return [_thaw(item) for item in value]
+    return value
+
+
+def _parse_ec_impact(value, section: str) -> float:
+    """Convert a numeric or qualitative ec_impact into a coefficient"""
+    if value is None:
+        return DEFAULT_EC_IMPACT[section]
+    if isinstance(value, str):
+        return EC_IMPACT_LEVELS[value]
+    return float(value)
+
+
+class NutrientCatalog:
+    """Columnar view of the nutrient lines with integer product ids
+
+    Products are laid out line by line (base nutrients first, then
+    supplements), so every line and section occupies a contiguous id range.
+    String fields (npk, ec_impact) are parsed here; every malformed entry is
+    reported together in a CatalogError rather than failing mid-request.
+    """
+
+    def __init__(self, nutrient_lines: Dict):
+        self.nutrient_lines = _freeze(nutrient_lines)
+        self.version = hashlib.sha1(
+            json.dumps(nutrient_lines, sort_keys=True).encode('utf-8')
+        ).hexdigest()[:12]
+
+        names: List[str] = []
+        lines: List[str] = []
+        line_ids: List[int] = []
+        supplement: List[bool] = []
+        types: List[str] = []
+        max_strength: List[float] = []
+        npk: List[Tuple[float, float, float]] = []
+        has_npk: List[bool] = []
+        ec_coefficient: List[float] = []
+        units: List[str] = []
+        problems: List[str] = []
+        self.line_ranges: Dict[str, Tuple[int, int]] = {}
+        self.section_ranges: Dict[Tuple[str, str], Tuple[int, int]] = {}
+
+        for line_id, (line, line_data) in enumerate(self.nutrient_lines.items()):
+            lines.append(line)
+            line_start = len(names)
+            for section in SECTIONS:
+                section_start = len(names)
+                for name, details in line_data.get(section, {}).items():
+                    try:
+                        parsed = (
+                            details['type'],
+                            float(details['max_strength']),
+                            parse_npk(details['npk']) if 'npk' in details else None,
+                            _parse_ec_impact(details.get('ec_impact'), section)
+                        )
+                    except (KeyError, TypeError, ValueError) as e:
+                        problems.append(f"{line} / {name}: {type(e).__name__}: {e}")
+                        continue
+                    names.append(name)
+                    line_ids.append(line_id)
+                    supplement.append(section == 'supplements')
+                    types.append(parsed[0])
+                    max_strength.append(parsed[1])
+                    has_npk.append(parsed[2] is not None)
+                    npk.append(parsed[2] or (0.0, 0.0, 0.0))
+                    ec_coefficient.append(parsed[3])
+                    units.append(details.get('unit', 'ml'))
+                self.section_ranges[(line, section)] = (section_start, len(names))
+            self.line_ranges[line] = (line_start, len(names))
+
+        if problems:
+            raise CatalogError("Malformed nutrient definitions:\n  " + "\n  ".join(problems))
+
+        self.names = tuple(names)
+        self.lines = tuple(lines)
+        self.types = tuple(dict.fromkeys(types))
+        type_index = {type_name: code for code, type_name in enumerate(self.types)}
+
+        self.line_id = np.array(line_ids, dtype=np.int32)
+        self.is_supplement = np.array(supplement, dtype=bool)
+        self.type_code = np.array([type_index[t] for t in types], dtype=np.int16)
+        self.max_strength = np.array(max_strength, dtype=float)
+        self.npk = np.array(npk, dtype=float).reshape(-1, 3)
+        self.has_npk = np.array(has_npk, dtype=bool)
+        self.ec_coefficient = np.array(ec_coefficient, dtype=float)
+        self.units = tuple(units)
+
+        # name -> ids in catalog order; the first id wins for unqualified lookups
+        self._ids_by_name: Dict[str, Tuple[int, ...]] = {}
+        for product_id, name in enumerate(self.names):
+            self._ids_by_name[name] = self._ids_by_name.get(name, ()) + (product_id,)
+
+        self._lock_arrays()
+
+    def _lock_arrays(self):
+        """Make every column read-only"""
+        for array in (self.line_id, self.is_supplement, self.type_code, self.max_strength,
+                      self.npk, self.has_npk, self.ec_coefficient):
+            array.setflags(write=False)
+
+    def __getstate__(self):
+        # mappingproxy cannot be pickled; ship plain dicts and re-freeze on arrival
+        state = self.__dict__.copy()
+        state['nutrient_lines'] = _thaw(self.nutrient_lines)
+        return state
+
+    def __setstate__(self, state):
+        state['nutrient_lines'] = _freeze(state['nutrient_lines'])
+        self.__dict__.update(state)
+        self._lock_arrays()
+
+    def __len__(self):
+        return len(self.names)
+
+    def product_id(self, name: str, line: Optional[str] = None,
+                   section: Optional[str] = None) -> Optional[int]:
+        """Return the id of a product, optionally restricted to a line/section"""
+        for product_id in self._ids_by_name.get(name, ()):
+            if line is not None and self.lines[self.line_id[product_id]] != line:
+                continue
+            if section is not None and self.is_supplement[product_id] != (section == 'supplements'):
+                continue
+            return product_id
+        return None
+
+    def ids_for_line(self, line: str, section: Optional[str] = None) -> np.ndarray:
+        """Return the contiguous id range for a line, or one of its sections"""
+        if section is None:
+            start, stop = self.line_ranges[line]
+        else:
+            start, stop = self.section_ranges[(line, section)]
+        return np.arange(start, stop)
+
+    def type_codes(self, type_names) -> np.ndarray:
+        """Map type names to codes, skipping types the catalog does not contain"""
+        return np.array([self.types.index(t) for t in type_names if t in self.types], dtype=np.int16)
+
+    def core_supplement_ids(self, line: str) -> np.ndarray:
+        """Ids of the calmag/silica/pk_boost supplements in a line"""
+        ids = self.ids_for_line(line, 'supplements')
+        return ids[np.isin(self.type_code[ids], self.type_codes(CORE_SUPPLEMENT_TYPES))]
+
+    def recipe_ids(self, line: str) -> np.ndarray:
+        """Ids a line's recipe doses: its base nutrients plus core supplements"""
+        return np.concatenate([self.ids_for_line(line, 'base_nutrients'), self.core_supplement_ids(line)])
+
+    def type_name(self, product_id: int) -> str:
+        """Return the nutrient type of a product"""
+        return self.types[self.type_code[product_id]]
+
+    def details(self, product_id: int) -> Mapping:
+        """Return the read-only source definition of a product"""
+        line = self.lines[self.line_id[product_id]]
+        section = 'supplements' if self.is_supplement[product_id] else 'base_nutrients'
+        return self.nutrient_lines[line][section][self.names[product_id]]
+
+
+@functools.lru_cache(maxsize=None)
+def get_catalog(line_set: str = 'default') -> NutrientCatalog:
+    """Return the process-wide catalog built from one of the built-in LINE_SETS"""
+    return NutrientCatalog(LINE_SETS[line_set])
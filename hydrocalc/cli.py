@@ -0,0 +1,69 @@
+"""Command-line entry point: python -m hydrocalc batch in.csv out.parquet"""
+import argparse
+import logging
+import time
+from typing import List, Optional
+
+from hydrocalc.strain_db import DEFAULT_STRAIN_DB_PATH, write_strain_db
+from hydrocalc.strain_loader import DEFAULT_PACK_PATH, DEFAULT_STRAIN_DIR, load_strain_directory
+from hydrocalc.streaming import DEFAULT_CHUNK_SIZE, run_batch
+
+logger = logging.getLogger(__name__)
+
+
+def build_parser() -> argparse.ArgumentParser:
+    """Build the argument parser for every subcommand"""
+    parser = argparse.ArgumentParser(prog='python -m hydrocalc', description='Headless hydroponic nutrient calculations')
+    commands = parser.add_subparsers(dest='command', required=True)
+
+    batch = commands.add_parser('batch', help='Calculate nutrient doses for every reservoir in a CSV or Parquet file')
+    batch.add_argument('input', help='Input .csv or .parquet with volume, strength and stage columns')
+    batch.add_argument('output', help='Output .csv or .parquet, written chunk by chunk')
+    batch.add_argument('--nutrients', help='Comma-separated base nutrients to dose (default: all)')
+    batch.add_argument('--unit-system', choices=['US', 'Liters'], default='US',
+                       help='Volume unit for rows without a unit_system column')
+    batch.add_argument('--chunk-size', type=int, default=DEFAULT_CHUNK_SIZE, help='Rows held in memory at once')
+    batch.add_argument('--workers', type=int, default=1, help='Worker processes per chunk (default: 1)')
+
+    pack = commands.add_parser('pack-strains', help='Build or refresh the strain pack for a directory of strain files')
+    pack.add_argument('directory', nargs='?', default=DEFAULT_STRAIN_DIR, help='Directory of per-strain .json files')
+    pack.add_argument('pack', nargs='?', default=DEFAULT_PACK_PATH, help='Pack file to write')
+    pack.add_argument('--workers', type=int, help='Reader threads (default: chosen by the thread pool)')
+
+    build_db = commands.add_parser('build-strain-db', help='Write a directory of strain files to a memory-mapped strain database')
+    build_db.add_argument('directory', nargs='?', default=DEFAULT_STRAIN_DIR, help='Directory of per-strain .json files')
+    build_db.add_argument('output', nargs='?', default=DEFAULT_STRAIN_DB_PATH, help='Database file to write')
+    build_db.add_argument('--pack', default=DEFAULT_PACK_PATH, help='Strain pack reused for unchanged files')
+    return parser
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    args = build_parser().parse_args(argv)
+    logging.basicConfig(level=logging.INFO, format='%(levelname)s: %(message)s')
+
+    if args.command == 'batch':
+        selected = [name.strip() for name in args.nutrients.split(',')] if args.nutrients else None
+        started = time.perf_counter()
+        try:
+            rows = run_batch(args.input, args.output, selected, args.unit_system, args.chunk_size, args.workers)
+        except (OSError, ValueError) as e:
+            logger.error(str(e))
+            return 1
+        logger.info(f"Wrote {rows} rows to {args.output} in {time.perf_counter() - started:.2f}s")
+    elif args.command == 'pack-strains':
+        started = time.perf_counter()
+        try:
+            strains = load_strain_directory(args.directory, args.pack, args.workers)
+        except OSError as e:
+            logger.error(str(e))
+            return 1
+        logger.info(f"Packed {len(strains)} strains into {args.pack} in {time.perf_counter() - started:.2f}s")
+    elif args.command == 'build-strain-db':
+        started = time.perf_counter()
+        try:
+            count = write_strain_db(load_strain_directory(args.directory, args.pack), args.output)
+        except OSError as e:
+            logger.error(str(e))
+            return 1
+        logger.info(f"Wrote {count} strains to {args.output} in {time.perf_counter() - started:.2f}s")
+    return 0
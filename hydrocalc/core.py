@@ -0,0 +1,178 @@
+"""Immutable calculation core shared by every session in the process"""
+import functools
+import logging
+from typing import Dict, List, Optional
+
+from hydrocalc.cache import LRUCache, canonical_key
+from hydrocalc.catalog import NutrientCatalog, get_catalog
+from hydrocalc.engine import FEEDING_MULTIPLIERS, GALLONS_PER_LITER, STAGE_MULTIPLIERS, DoseTable, calculate_doses
+
+logger = logging.getLogger(__name__)
+
+# Nutrient line calculate_nutrients doses unless told otherwise
+RECIPE_LINE = 'General Hydroponics'
+
+# Distinct recipes kept by the shared calculate_recipe memo
+RECIPE_CACHE_SIZE = 512
+
+
+def _copy_recipe(recipe: Dict) -> Dict:
+    """Copy a recipe deep enough that callers cannot modify a cached one"""
+    return {nutrient: dict(details) for nutrient, details in recipe.items()}
+
+
+class CalculationCore:
+    """Stateless recipe calculations over a compiled catalog
+
+    Holds no per-session data, so one instance is safely shared by every
+    Streamlit session and rerun. Session state (saved recipes, selections)
+    belongs in the UI wrappers. calculate_recipe results are memoized in
+    recipe_cache, keyed on the catalog version and the normalized inputs.
+    """
+
+    __slots__ = ('catalog', 'recipe_cache')
+
+    def __init__(self, catalog: NutrientCatalog, recipe_cache_size: int = RECIPE_CACHE_SIZE):
+        object.__setattr__(self, 'catalog', catalog)
+        object.__setattr__(self, 'recipe_cache', LRUCache(recipe_cache_size))
+
+    def __setattr__(self, name, value):
+        raise AttributeError("CalculationCore is immutable")
+
+    def calculate_nutrients(self, size: float, strength: float, selected_nutrients: list, growth_stage: str, unit_system: str = 'US',
+                            nutrient_line: str = RECIPE_LINE) -> Dict:
+        """Calculate nutrient amounts of a line's selected base nutrients and core supplements"""
+        try:
+            recipe = {}
+
+            # Convert size to gallons if needed
+            gallons = size if unit_system == 'US' else size * GALLONS_PER_LITER
+
+            # Get base strength multiplier based on growth stage
+            stage_multiplier = STAGE_MULTIPLIERS.get(growth_stage, 1.0)
+            final_strength = (strength / 100) * stage_multiplier
+
+            for product_id in self.recipe_products(selected_nutrients, nutrient_line):
+                max_strength = float(self.catalog.max_strength[product_id])
+                amount = max_strength * final_strength * gallons
+                per_unit = round(max_strength * final_strength, 2)
+                recipe[self.catalog.names[product_id]] = self.recipe_entry(product_id, round(amount, 1), per_unit)
+
+            return recipe
+
+        except Exception as e:
+            logger.error(f"Failed to calculate nutrients: {str(e)}")
+            raise ValueError(f"Nutrient calculation failed: {str(e)}")
+
+    def calculate_nutrients_batch(self, sizes, strengths, growth_stages, selected_nutrients: list, unit_systems='US',
+                                  workers: Optional[int] = None) -> DoseTable:
+        """Calculate nutrient amounts for many reservoirs at once
+
+        Takes arrays (or scalars to broadcast) of sizes, strengths (percent),
+        growth stages and unit systems and returns a DoseTable whose rows match
+        calculate_nutrients for the same inputs. Use recipes_from_batch() when
+        the per-reservoir dict shape is needed. workers > 1 shards the rows
+        across a process pool (see hydrocalc.parallel) with identical results.
+        """
+        if workers and workers > 1:
+            from hydrocalc.parallel import calculate_nutrients_parallel
+            return calculate_nutrients_parallel(
+                self, sizes, strengths, growth_stages, selected_nutrients, unit_systems, workers
+            )
+        try:
+            product_ids = self.recipe_products(selected_nutrients)
+            return calculate_doses(
+                max_strength=self.catalog.max_strength[product_ids],
+                products=[self.catalog.names[product_id] for product_id in product_ids],
+                volumes=sizes,
+                strengths=strengths,
+                stages=growth_stages,
+                unit_systems=unit_systems
+            )
+        except Exception as e:
+            logger.error(f"Failed to calculate nutrient batch: {str(e)}")
+            raise ValueError(f"Nutrient batch calculation failed: {str(e)}")
+
+    def recipes_from_batch(self, doses: DoseTable, selected_nutrients: list) -> List[Dict]:
+        """Expand a DoseTable into calculate_nutrients-style recipe dicts"""
+        product_ids = self.recipe_products(selected_nutrients)
+        recipes = []
+        for index in range(len(doses)):
+            recipes.append({
+                name: self.recipe_entry(product_id, amount, per_unit)
+                for product_id, (name, amount, per_unit) in zip(product_ids, doses.row(index))
+            })
+        return recipes
+
+    def recipe_products(self, selected_nutrients, nutrient_line: str = RECIPE_LINE) -> List[int]:
+        """Catalog ids for every product a recipe will dose: the selected base nutrients of the line, then its core supplements"""
+        product_ids = [
+            self.catalog.product_id(nutrient, nutrient_line, 'base_nutrients')
+            for nutrient in selected_nutrients
+        ]
+        product_ids = [product_id for product_id in product_ids if product_id is not None]
+        product_ids.extend(self.catalog.core_supplement_ids(nutrient_line).tolist())
+        return product_ids
+
+    def recipe_entry(self, product_id: int, amount: float, per_unit: float) -> Dict:
+        """Build the recipe dict entry for a single product"""
+        data = self.catalog.details(product_id)
+        entry = {
+            'amount': amount,
+            'unit': 'ml',
+            'type': data['type'],
+            'per_unit': f"{per_unit} ml/gal",
+            'notes': data.get('description', '')
+        }
+        if not self.catalog.is_supplement[product_id]:
+            entry['npk'] = data.get('npk', 'N/A')
+        else:
+            entry['when_to_use'] = data.get('when_to_use', '')
+        return entry
+
+    def calculate_recipe(self, nutrient_line: str, volume: float, growth_stage: str, strength: float = 1.0,
+                         unit_system: str = 'US', feeding_type: str = 'Medium Feeders') -> Dict:
+        """Calculate a recipe for a nutrient line, served from the memo when possible
+
+        Returns a fresh copy on every call so callers may modify it freely.
+        """
+        key = canonical_key(
+            self.catalog.version,
+            nutrient_line,
+            growth_stage,
+            float(volume),
+            'US' if unit_system == 'US' else 'Liters',
+            float(strength),
+            feeding_type
+        )
+        recipe = self.recipe_cache.get(key, version=self.catalog.version)
+        if recipe is None:
+            recipe = self._calculate_recipe(nutrient_line, volume, growth_stage, strength, unit_system, feeding_type)
+            self.recipe_cache.put(key, recipe, version=self.catalog.version)
+        return _copy_recipe(recipe)
+
+    def _calculate_recipe(self, nutrient_line, volume, growth_stage, strength, unit_system, feeding_type) -> Dict:
+        """Calculate a recipe from the selected line's products, as FacilityPlanner doses them"""
+        catalog = self.catalog
+        recipe = self.calculate_nutrients(
+            size=volume,
+            strength=strength * 100 * FEEDING_MULTIPLIERS.get(feeding_type, 1.0),  # Percentage for this feeder
+            selected_nutrients=[catalog.names[i] for i in catalog.ids_for_line(nutrient_line, 'base_nutrients')],
+            growth_stage=growth_stage,
+            unit_system=unit_system,
+            nutrient_line=nutrient_line
+        )
+
+        # Add type information for recipe instructions
+        for nutrient, details in recipe.items():
+            product_id = catalog.product_id(nutrient, nutrient_line)
+            if product_id is not None:
+                details['type'] = catalog.type_name(product_id)
+
+        return recipe
+
+
+@functools.lru_cache(maxsize=None)
+def get_core(line_set: str = 'default') -> CalculationCore:
+    """Return the process-wide calculation core over a built-in line set"""
+    return CalculationCore(get_catalog(line_set))
@@ -0,0 +1,371 @@
+"""Built-in nutrient line definitions compiled into the nutrient catalog"""
+
+NUTRIENT_LINES = {
+    'Generic': {
+        'description': 'Standard nutrient components for any brand',
+        'base_nutrients': {
+            'Micro': {
+                'type': 'micro',
+                'max_strength': 3.0,
+                'description': 'Micronutrient blend',
+                'npk': '5-0-1'
+            },
+            'Grow': {
+                'type': 'grow',
+                'max_strength': 3.0,
+                'description': 'Vegetative growth nutrient',
+                'npk': '3-1-3'
+            },
+            'Bloom': {
+                'type': 'bloom',
+                'max_strength': 3.0,
+                'description': 'Flowering nutrient',
+                'npk': '0-5-4'
+            }
+        },
+        'supplements': {
+            'CalMag': {
+                'type': 'calmag',
+                'max_strength': 5.0,
+                'description': 'Calcium-Magnesium supplement',
+                'when_to_use': 'Throughout grow cycle'
+            },
+            'Silica': {
+                'type': 'silica',
+                'max_strength': 2.0,
+                'description': 'Silica supplement for strength',
+                'when_to_use': 'Add first, throughout cycle'
+            },
+            'PK Booster': {
+                'type': 'pk_boost',
+                'max_strength': 2.0,
+                'description': 'Phosphorus-Potassium boost',
+                'when_to_use': 'Mid to late flower'
+            }
+        }
+    },
+    'General Hydroponics': {
+        'description': 'Industry standard 3-part system with comprehensive supplements',
+        'base_nutrients': {
+            'Flora Micro': {
+                'type': 'micro',
+                'max_strength': 4.0,
+                'description': 'Concentrated micronutrients and calcium',
+                'npk': '5-0-1'
+            },
+            'Flora Grow': {
+                'type': 'grow',
+                'max_strength': 4.0,  # ml per gallon
+                'npk': '2-1-6',
+                'description': 'Promotes structural and vegetative growth',
+                'when_to_use': 'Heavy in veg, reduced in flower',
+                'benefits': ['Promotes leaf growth', 'Enhances node spacing', 'Builds structure'],
+                'cautions': ['Add after Flora Micro', 'Reduce during flowering'],
+                'ec_impact': 'Medium',
+                'ph_impact': 'Slight decrease'
+            },
+            'Flora Bloom': {
+                'type': 'bloom',
+                'max_strength': 4.0,  # ml per gallon
+                'npk': '0-5-4',
+                'description': 'Promotes flower development and fruiting',
+                'when_to_use': 'During flowering phase',
+                'benefits': ['Enhances flower development', 'Improves yield', 'Boosts essential oils'],
+                'cautions': ['Add last of base nutrients', 'Monitor EC levels']
+            }
+        },
+        'supplements': {
+            'CaliMagic': {
+                'type': 'calmag',
+                'max_strength': 5.0,  # ml per gallon
+                'description': 'GH\'s calcium and magnesium supplement',
+                'when_to_use': 'Throughout grow cycle, essential with RO water',
+                'benefits': [
+                    'Prevents calcium deficiency',
+                    'Strengthens cell walls',
+                    'Improves nutrient uptake',
+                    'Prevents magnesium deficiency'
+                ],
+                'npk': '1-0-0',
+                'contains': {'Ca': '5%', 'Mg': '1.5%'},
+                'cautions': ['Check water hardness first', 'Can raise pH']
+            },
+            'Rapid Start': {
+                'type': 'root',
+                'max_strength': 2.0,  # ml per gallon
+                'description': 'GH\'s root development enhancer',
+                'when_to_use': 'Early growth and transplanting',
+                'benefits': [
+                    'Accelerates root development',
+                    'Improves nutrient uptake',
+                    'Reduces transplant shock',
+                    'Enhances stress tolerance'
+                ],
+                'contains': {'Vitamins': 'B1, B2', 'Hormones': 'IBA, NAA'},
+                'cautions': ['Reduce after established roots', 'Monitor pH']
+            },
+            'Diamond Nectar': {
+                'type': 'humic',
+                'max_strength': 2.0,  # ml per gallon
+                'description': 'GH\'s premium humic acid supplement',
+                'when_to_use': 'Throughout grow cycle',
+                'benefits': [
+                    'Improves nutrient uptake',
+                    'Enhances root development',
+                    'Increases chelation',
+                    'Improves soil structure'
+                ],
+                'contains': {'Humic acid': '6%', 'Fulvic acid': '3%'},
+                'cautions': ['Can darken solution', 'Monitor pH']
+            },
+            'Armor Si': {
+                'type': 'silica',
+                'max_strength': 2.0,  # ml per gallon
+                'description': 'GH\'s silica supplement',
+                'when_to_use': 'Throughout grow cycle',
+                'benefits': [
+                    'Strengthens cell walls',
+                    'Improves heat tolerance',
+                    'Enhances pest resistance',
+                    'Supports heavy flowers'
+                ],
+                'contains': {'Si': '0.5%'},
+                'cautions': [
+                    'Must be added FIRST to nutrient solution',
+                    'Raises pH significantly',
+                    'Don\'t mix directly with concentrated nutrients'
+                ]
+            },
+            'Liquid KoolBloom': {
+                'type': 'pk_boost',
+                'max_strength': 2.5,  # ml per gallon
+                'description': 'GH\'s liquid P-K booster',
+                'when_to_use': 'Early to mid flowering',
+                'benefits': [
+                    'Enhances flower formation',
+                    'Improves flower size',
+                    'Boosts essential oil production'
+                ],
+                'npk': '0-10-10',
+                'cautions': ['Monitor EC', 'Can build up salts']
+            },
+            'Dry KoolBloom': {
+                'type': 'ripening',
+                'max_strength': 1.5,  # grams per gallon
+                'unit': 'g',
+                'description': 'GH\'s flowering finisher powder',
+                'when_to_use': 'Last 2-3 weeks of flower',
+                'benefits': [
+                    'Triggers ripening',
+                    'Increases resin production',
+                    'Enhances flower density',
+                    'Improves essential oil content'
+                ],
+                'npk': '0-27-27',
+                'cautions': [
+                    'Use only in late flower',
+                    'Monitor EC carefully',
+                    'Can cause lockout if overused',
+                    'Dissolve completely before adding other nutrients'
+                ]
+            },
+            'Floralicious Plus': {
+                'type': 'enzyme',
+                'max_strength': 1.0,  # ml per gallon
+                'description': 'GH\'s organic bioactivator',
+                'when_to_use': 'Throughout grow cycle',
+                'benefits': [
+                    'Enhances nutrient uptake',
+                    'Improves flavor profiles',
+                    'Boosts terpene production',
+                    'Supports beneficial microbes'
+                ],
+                'contains': {
+                    'Enzymes': 'Multiple',
+                    'Amino acids': 'Complete profile',
+                    'Vitamins': 'B1, B2, B6, B12'
+                },
+                'cautions': [
+                    'Shake well before use',
+                    'Can cloud reservoir',
+                    'Add last to nutrient solution'
+                ]
+            },
+            'Florablend': {
+                'type': 'biostimulant',
+                'max_strength': 2.0,  # ml per gallon
+                'description': 'GH\'s organic vegan supplement',
+                'when_to_use': 'Throughout grow cycle',
+                'benefits': [
+                    'Enhances nutrient uptake',
+                    'Improves plant vigor',
+                    'Supports beneficial microbes',
+                    'Adds trace elements'
+                ],
+                'contains': {
+                    'Seaweed': 'Multiple species',
+                    'Minerals': 'Trace elements',
+                    'Vitamins': 'Natural blend'
+                },
+                'cautions': [
+                    'Shake well before use',
+                    'Can settle in reservoir',
+                    'Add after base nutrients'
+                ]
+            }
+        }
+    },
+    'Advanced Nutrients': {
+        'description': 'pH Perfect technology with premium supplements',
+        'base_nutrients': {
+            'pH Perfect Micro': {
+                'type': 'micro',
+                'max_strength': 4.0,
+                'description': 'Self-adjusting pH micronutrient formula',
+                'npk': '5-0-1'
+            },
+            'pH Perfect Grow': {
+                'type': 'grow',
+                'max_strength': 4.0,
+                'description': 'Vegetative growth formula',
+                'npk': '4-0-1'
+            },
+            'pH Perfect Bloom': {
+                'type': 'bloom',
+                'max_strength': 4.0,
+                'description': 'Flowering phase formula',
+                'npk': '0-5-4'
+            }
+        }
+    },
+    'Athena': {
+        'description': 'Professional grade blended nutrient system',
+        'base_nutrients': {
+            'Core': {
+                'type': 'base',
+                'max_strength': 3.0,
+                'description': 'Complete nutrient solution',
+                'npk': '4-0-1'
+            },
+            'Bloom': {
+                'type': 'bloom',
+                'max_strength': 3.0,
+                'description': 'Flower enhancer',
+                'npk': '0-5-4'
+            }
+        }
+    },
+    'House & Garden': {
+        'description': 'Premium Dutch nutrients with specialized additives',
+        'base_nutrients': {
+            'Aqua Flakes A': {
+                'type': 'base_a',
+                'max_strength': 3.0,
+                'description': 'Part A base nutrient',
+                'npk': '5-0-3'
+            },
+            'Aqua Flakes B': {
+                'type': 'base_b',
+                'max_strength': 3.0,
+                'description': 'Part B base nutrient',
+                'npk': '1-4-5'
+            }
+        }
+    },
+    'Canna': {
+        'description': 'Research-based nutrients optimized for various media',
+        'base_nutrients': {
+            'Canna A': {
+                'type': 'base_a',
+                'max_strength': 3.0,
+                'description': 'Part A complete nutrient',
+                'npk': '5-0-1'
+            },
+            'Canna B': {
+                'type': 'base_b',
+                'max_strength': 3.0,
+                'description': 'Part B complete nutrient',
+                'npk': '0-4-2'
+            }
+        }
+    }
+}
+
+# The deploy recipe manager's lines: the same brands, with a raw-salt Generic line
+DEPLOY_NUTRIENT_LINES = {
+    **{line: NUTRIENT_LINES[line] for line in NUTRIENT_LINES if line != 'Generic'},
+    'Generic': {
+        'description': 'Custom nutrient formulations using raw salts',
+        'base_nutrients': {
+            'Calcium Nitrate': {
+                'type': 'macro',
+                'max_strength': 1.0,
+                'description': 'Ca(NO3)2 - Primary calcium source',
+                'unit': 'g/L'
+            },
+            'Potassium Nitrate': {
+                'type': 'macro',
+                'max_strength': 0.6,
+                'description': 'KNO3 - Nitrogen and potassium source',
+                'unit': 'g/L'
+            }
+        }
+    }
+}
+
+# The deploy calculator UI's lines: General Hydroponics only, with a fuller Flora Micro entry
+DEPLOY_UI_NUTRIENT_LINES = {
+    'General Hydroponics': {
+        'base_nutrients': {
+            **NUTRIENT_LINES['General Hydroponics']['base_nutrients'],
+            'Flora Micro': {
+                'type': 'micro',
+                'max_strength': 4.0,  # ml per gallon
+                'npk': '5-0-1',
+                'description': 'Concentrated micronutrients and calcium',
+                'when_to_use': 'Throughout entire grow cycle',
+                'benefits': ['Essential micronutrients', 'Calcium source', 'Iron source'],
+                'cautions': ['Add before Flora Grow and Flora Bloom', 'Can stain', 'Required for all stages'],
+                'ec_impact': 'Medium',
+                'ph_impact': 'Slight decrease'
+            }
+        },
+        'supplements': NUTRIENT_LINES['General Hydroponics']['supplements']
+    }
+}
+
+# Base feeding schedules (ml or g per gallon) per nutrient line and growth stage
+FEEDING_SCHEDULES = {
+    'General Hydroponics': {
+        'Seedling': {
+            'Flora Micro': 0.25, 'Flora Grow': 0.25, 'Flora Bloom': 0.25,
+            'CaliMagic': 0.5, 'Rapid Start': 0.5
+        },
+        'Early Veg': {
+            'Flora Micro': 1.0, 'Flora Grow': 1.5, 'Flora Bloom': 0.5,
+            'CaliMagic': 1.0, 'Rapid Start': 1.0, 'Armor Si': 0.5
+        },
+        'Late Veg': {
+            'Flora Micro': 2.0, 'Flora Grow': 2.0, 'Flora Bloom': 1.0,
+            'CaliMagic': 1.5, 'Armor Si': 1.0, 'Diamond Nectar': 1.0
+        },
+        'Pre-Flower': {
+            'Flora Micro': 2.0, 'Flora Grow': 1.5, 'Flora Bloom': 2.0,
+            'CaliMagic': 2.0, 'Armor Si': 1.0, 'Liquid KoolBloom': 0.5
+        },
+        'Early Flower': {
+            'Flora Micro': 2.0, 'Flora Grow': 1.0, 'Flora Bloom': 2.5,
+            'CaliMagic': 2.0, 'Liquid KoolBloom': 1.0
+        },
+        'Mid Flower': {
+            'Flora Micro': 2.0, 'Flora Grow': 0.5, 'Flora Bloom': 3.0,
+            'CaliMagic': 2.0, 'Liquid KoolBloom': 2.0, 'Dry KoolBloom': 0.5
+        },
+        'Late Flower': {
+            'Flora Micro': 1.5, 'Flora Grow': 0, 'Flora Bloom': 2.5,
+            'CaliMagic': 1.5, 'Dry KoolBloom': 1.0
+        },
+        'Flush': {'Flora Micro': 0, 'Flora Grow': 0, 'Flora Bloom': 0}
+    }
+    # Add other nutrient lines here...
+}
@@ -0,0 +1,113 @@
+"""Vectorized dose calculations for one or many reservoirs"""
+from typing import List, Sequence
+
+import numpy as np
+
+GALLONS_PER_LITER = 0.264172
+
+# Base strength multiplier for each growth stage
+STAGE_MULTIPLIERS = {
+    "Seedling": 0.25,
+    "Early Veg": 0.5,
+    "Late Veg": 0.75,
+    "Pre-Flower": 0.8,
+    "Early Flower": 1.0,
+    "Mid Flower": 1.0,
+    "Late Flower": 0.75,
+    "Flush": 0.0
+}
+
+# Strength multiplier for each strain feeding type
+FEEDING_MULTIPLIERS = {
+    'Heavy Feeders': 1.2,
+    'Medium Feeders': 1.0,
+    'Light Feeders': 0.8
+}
+
+
+def as_column(values, n: int, dtype) -> np.ndarray:
+    """Broadcast a scalar or sequence to a 1-D array of length n"""
+    array = np.asarray(values, dtype=dtype)
+    if array.ndim == 0:
+        return np.full(n, array, dtype=array.dtype)
+    if array.shape != (n,):
+        raise ValueError(f"Expected {n} values, got shape {array.shape}")
+    return array
+
+
+def to_gallons(volumes, unit_systems) -> np.ndarray:
+    """Convert reservoir volumes to US gallons ('US' volumes pass through)"""
+    volumes = np.asarray(volumes, dtype=float)
+    units = as_column(unit_systems, volumes.shape[0], str)
+    return np.where(units == 'US', volumes, volumes * GALLONS_PER_LITER)
+
+
+def stage_multipliers(stages, n: int) -> np.ndarray:
+    """Look up the stage multiplier for every reservoir (unknown stages use 1.0)"""
+    stages = as_column(stages, n, str)
+    unique, inverse = np.unique(stages, return_inverse=True)
+    lookup = np.array([STAGE_MULTIPLIERS.get(stage, 1.0) for stage in unique], dtype=float)
+    return lookup[inverse.reshape(-1)]
+
+
+def round_like_python(values: np.ndarray, ndigits: int) -> np.ndarray:
+    """Round an array exactly like the builtin round() does for each float
+
+    np.round scales by 10**ndigits before rounding, which can land on the
+    other side of a tie than Python's correctly rounded round(). Only values
+    whose scaled fraction sits next to .5 can differ, so just those fall back
+    to the builtin.
+    """
+    values = np.asarray(values, dtype=float)
+    rounded = np.round(values, ndigits)
+    scaled = values * 10.0 ** ndigits
+    near_tie = np.abs(np.abs(scaled - np.trunc(scaled)) - 0.5) < 1e-6
+    if near_tie.any():
+        rounded[near_tie] = [round(float(v), ndigits) for v in values[near_tie]]
+    return rounded
+
+
+class DoseTable:
+    """Dose matrix for a batch of reservoirs (rows) and products (columns)"""
+
+    def __init__(self, products: List[str], per_unit: np.ndarray, amounts: np.ndarray):
+        self.products = products
+        self.per_unit = per_unit  # ml/gal, rounded to 2 decimals
+        self.amounts = amounts    # ml for the whole reservoir, rounded to 1 decimal
+
+    def __len__(self):
+        return self.amounts.shape[0]
+
+    def row(self, index: int):
+        """Yield (product, amount, per_unit) for a single reservoir"""
+        for col, product in enumerate(self.products):
+            yield product, float(self.amounts[index, col]), float(self.per_unit[index, col])
+
+
+def calculate_doses(max_strength: Sequence[float], products: List[str], volumes,
+                    strengths, stages, unit_systems='US') -> DoseTable:
+    """Calculate every product dose for every reservoir in one pass
+
+    Matches RecipeManager.calculate_nutrients: strengths are percentages,
+    per-unit doses are ml/gal rounded to 2 decimals and reservoir amounts are
+    rounded to 1 decimal. max_strength is either one value per product or a
+    (reservoirs, products) matrix when products are scaled per reservoir.
+    """
+    volumes = np.atleast_1d(np.asarray(volumes, dtype=float))
+    n = volumes.shape[0]
+    max_strength = np.asarray(max_strength, dtype=float)
+
+    gallons = to_gallons(volumes, unit_systems)
+    final_strength = (as_column(strengths, n, float) / 100) * stage_multipliers(stages, n)
+
+    # Same operation order as the scalar path so the floats match bit for bit
+    if max_strength.ndim == 1:
+        max_strength = max_strength[np.newaxis, :]
+    raw_per_unit = max_strength * final_strength[:, np.newaxis]
+    raw_amounts = raw_per_unit * gallons[:, np.newaxis]
+
+    return DoseTable(
+        products=list(products),
+        per_unit=round_like_python(raw_per_unit, 2),
+        amounts=round_like_python(raw_amounts, 1)
+    )
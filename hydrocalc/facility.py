@@ -0,0 +1,190 @@
+"""Facility-scale planning across many reservoirs in one batch calculation"""
+import logging
+from typing import Dict, List, Mapping, Optional, Tuple
+
+import numpy as np
+
+from hydrocalc.core import CalculationCore, get_core
+from hydrocalc.engine import FEEDING_MULTIPLIERS, DoseTable, calculate_doses
+from hydrocalc.scheduler import MixSchedule, schedule_mixing
+
+logger = logging.getLogger(__name__)
+
+# Columns of the reservoir table; strength is a percentage like the UI slider
+RESERVOIR_COLUMNS = ('id', 'line', 'stage', 'volume', 'strength', 'strain')
+
+DEFAULT_FEEDING_TYPE = 'Medium Feeders'
+
+# Strength percentage of a row with a blank strength cell
+DEFAULT_STRENGTH = 100.0
+
+
+def _records(table) -> List[Mapping]:
+    """Accept a DataFrame or any sequence of row mappings"""
+    if hasattr(table, 'to_dict'):
+        return table.to_dict('records')
+    return list(table)
+
+
+def _number(value) -> Optional[float]:
+    """A table cell as a float, or None when it is blank (missing, None or NaN)"""
+    if value is None:
+        return None
+    try:
+        number = float(value)
+    except TypeError:  # pandas.NA and other missing-value markers
+        return None
+    return None if np.isnan(number) else number
+
+
+class FacilityPlan:
+    """Doses for every reservoir in a facility, with totals and a mixing manifest
+
+    doses holds one row per reservoir and one column per (line, product) in
+    products; products outside a reservoir's line are zero and masked out.
+    """
+
+    def __init__(self, core: CalculationCore, reservoir_ids: List, lines: List[str],
+                 product_ids: np.ndarray, dosed: np.ndarray, doses: DoseTable):
+        self.core = core
+        self.reservoir_ids = reservoir_ids
+        self.lines = lines
+        self.product_ids = product_ids
+        self.dosed = dosed  # (reservoirs, products) True where the product is in the reservoir's recipe
+        self.doses = doses
+
+    @property
+    def products(self) -> List[Tuple[str, str]]:
+        """(line, product) for every dose column"""
+        catalog = self.core.catalog
+        return [(catalog.lines[catalog.line_id[i]], catalog.names[i]) for i in self.product_ids]
+
+    def recipes(self) -> Dict:
+        """Per-reservoir recipes keyed by reservoir id, shaped like calculate_recipe output"""
+        recipes = {}
+        for row, reservoir_id in enumerate(self.reservoir_ids):
+            recipes[reservoir_id] = {
+                name: self.core.recipe_entry(product_id, amount, per_unit)
+                for product_id, dosed, (name, amount, per_unit)
+                in zip(self.product_ids, self.dosed[row], self.doses.row(row))
+                if dosed
+            }
+        return recipes
+
+    def product_totals(self) -> Dict[Tuple[str, str], Dict]:
+        """Total amount of every product needed across the facility"""
+        catalog = self.core.catalog
+        totals = np.where(self.dosed, self.doses.amounts, 0.0).sum(axis=0)
+        return {
+            product: {'amount': round(float(total), 1), 'unit': catalog.units[product_id]}
+            for product, product_id, total, used in zip(self.products, self.product_ids, totals, self.dosed.any(axis=0))
+            if used
+        }
+
+    def manifest(self) -> Dict[Tuple[str, str], Dict]:
+        """Mixing manifest grouped by product: the reservoirs to dose and how much each"""
+        catalog = self.core.catalog
+        manifest = {}
+        for col, (product, product_id) in enumerate(zip(self.products, self.product_ids)):
+            rows = np.flatnonzero(self.dosed[:, col] & (self.doses.amounts[:, col] > 0))
+            if not len(rows):
+                continue
+            manifest[product] = {
+                'unit': catalog.units[product_id],
+                'total': round(float(self.doses.amounts[rows, col].sum()), 1),
+                'reservoirs': [
+                    {
+                        'id': self.reservoir_ids[row],
+                        'amount': float(self.doses.amounts[row, col]),
+                        'per_unit': float(self.doses.per_unit[row, col])
+                    }
+                    for row in rows
+                ]
+            }
+        return manifest
+
+    def mixing_schedule(self, stations: int = 1) -> MixSchedule:
+        """Schedule mixing every reservoir across the given number of stations"""
+        catalog = self.core.catalog
+        tanks = {
+            reservoir_id: [
+                (catalog.names[product_id], catalog.type_name(product_id))
+                for product_id, dosed, amount in zip(self.product_ids, self.dosed[row], self.doses.amounts[row])
+                if dosed and amount > 0
+            ]
+            for row, reservoir_id in enumerate(self.reservoir_ids)
+        }
+        return schedule_mixing(tanks, stations)
+
+
+class FacilityPlanner:
+    """Plan a whole table of reservoirs with a single vectorized dose calculation
+
+    Each reservoir doses its own line's base nutrients plus that line's core
+    supplements, the same products CalculationCore.calculate_recipe doses for
+    that line. A blank strength means 100%. The strain column may hold a
+    feeding type ('Heavy Feeders') or a strain name looked up in
+    strain_feeding; anything else feeds as Medium Feeders.
+    """
+
+    def __init__(self, core: Optional[CalculationCore] = None,
+                 strain_feeding: Optional[Mapping[str, str]] = None, unit_system: str = 'US'):
+        self.core = core or get_core()
+        self.strain_feeding = dict(strain_feeding or {})
+        self.unit_system = unit_system
+
+    def feeding_type(self, strain) -> str:
+        """Resolve a strain column value to a feeding type"""
+        if strain in FEEDING_MULTIPLIERS:
+            return strain
+        return self.strain_feeding.get(strain, DEFAULT_FEEDING_TYPE)
+
+    def plan(self, table) -> FacilityPlan:
+        """Calculate every reservoir in the table"""
+        try:
+            catalog = self.core.catalog
+            rows = _records(table)
+            if not rows:
+                raise ValueError("Reservoir table is empty")
+
+            problems = []
+            for index, row in enumerate(rows):
+                if row.get('line') not in catalog.line_ranges:
+                    problems.append(f"row {index}: unknown nutrient line {row.get('line')!r}")
+                if _number(row.get('volume')) is None:
+                    problems.append(f"row {index}: missing volume")
+            if problems:
+                raise ValueError("; ".join(problems))
+
+            lines = [row['line'] for row in rows]
+            unique_lines = list(dict.fromkeys(lines))
+            product_ids = np.concatenate([catalog.recipe_ids(line) for line in unique_lines])
+
+            # Products outside a reservoir's line get a zero max strength
+            line_ids = np.array([catalog.lines.index(line) for line in lines])
+            dosed = catalog.line_id[product_ids][np.newaxis, :] == line_ids[:, np.newaxis]
+            max_strength = np.where(dosed, catalog.max_strength[product_ids][np.newaxis, :], 0.0)
+
+            feeding = np.array([
+                FEEDING_MULTIPLIERS.get(self.feeding_type(row.get('strain')), 1.0) for row in rows
+            ])
+            # Same operation order as calculate_recipe (fraction * 100 * feeding) so doses match exactly
+            strengths = [_number(row.get('strength')) for row in rows]
+            strengths = np.array([
+                (DEFAULT_STRENGTH if strength is None else strength) / 100 for strength in strengths
+            ]) * 100 * feeding
+
+            doses = calculate_doses(
+                max_strength=max_strength,
+                products=[catalog.names[product_id] for product_id in product_ids],
+                volumes=[float(row['volume']) for row in rows],
+                strengths=strengths,
+                stages=[row['stage'] for row in rows],
+                unit_systems=[row.get('unit_system', self.unit_system) for row in rows]
+            )
+            reservoir_ids = [row.get('id', index) for index, row in enumerate(rows)]
+            return FacilityPlan(self.core, reservoir_ids, lines, product_ids, dosed, doses)
+
+        except Exception as e:
+            logger.error(f"Failed to plan facility: {str(e)}")
+            raise ValueError(f"Facility planning failed: {str(e)}")
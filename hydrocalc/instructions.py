@@ -0,0 +1,421 @@
+"""Mixing protocol and instruction generation, independent of any UI"""
+import logging
+from typing import Dict, List, Optional
+
+from hydrocalc.scheduler import mixing_sequence
+
+logger = logging.getLogger(__name__)
+
+# Static protocol phases shown around every recipe's mixing sequence
+MIXING_PHASES = {
+    "preparation": {
+        "title": "🔍 Preparation Phase",
+        "icon": "🧪",
+        "importance": "critical",
+        "steps": [
+            {
+                "action": "Clean all mixing equipment thoroughly",
+                "detail": "Use food-grade sanitizer, rinse 3x with RO water",
+                "warning": "Contamination can lead to root problems"
+            },
+            {
+                "action": "Calibrate pH and EC/PPM meters",
+                "detail": "Use fresh calibration solutions, verify accuracy",
+                "warning": "Inaccurate readings can lead to nutrient lockout"
+            },
+            {
+                "action": "Verify water temperature",
+                "detail": "Target: 65-75°F (18-24°C)",
+                "warning": "Temperature affects nutrient availability"
+            },
+            {
+                "action": "Record starting parameters",
+                "detail": "Log: pH, EC/PPM, temperature, date/time",
+                "warning": "Documentation required for compliance"
+            }
+        ]
+    },
+    "primary_mix": {
+        "title": "🌊 Primary Mixing Phase",
+        "icon": "⚗️",
+        "importance": "critical",
+        "steps": [
+            {
+                "action": "Fill reservoir to 75% volume",
+                "detail": "Use filtered/RO water at correct temperature",
+                "warning": "Leave room for additives and final adjustment"
+            },
+            {
+                "action": "Start circulation system",
+                "detail": "Ensure proper aeration and mixing patterns",
+                "warning": "Minimum 800 GPH pump rate recommended"
+            },
+            {
+                "action": "Add Cal-Mag (if using)",
+                "detail": "Mix thoroughly for 15 minutes",
+                "warning": "Critical for preventing calcium lockout"
+            },
+            {
+                "action": "Add Part A nutrients",
+                "detail": "Mix slowly, monitor for precipitation",
+                "warning": "Never mix concentrates directly"
+            },
+            {
+                "action": "Add Part B nutrients",
+                "detail": "Wait minimum 5 minutes after Part A",
+                "warning": "Calcium/phosphate precipitation risk"
+            }
+        ]
+    },
+    "supplements": {
+        "title": "🧬 Supplement Addition",
+        "icon": "🧪",
+        "importance": "moderate",
+        "steps": [
+            {
+                "action": "Add pH buffers if needed",
+                "detail": "Target pH range: 5.5-6.3",
+                "warning": "Add slowly, allow stabilization"
+            },
+            {
+                "action": "Add organic supplements",
+                "detail": "Follow manufacturer's order of addition",
+                "warning": "Some may affect pH/EC significantly"
+            },
+            {
+                "action": "Add beneficial microbes",
+                "detail": "Water temp must be below 75°F",
+                "warning": "Chlorine must be removed first"
+            }
+        ]
+    },
+    "final": {
+        "title": "✅ Final Verification",
+        "icon": "📊",
+        "importance": "critical",
+        "steps": [
+            {
+                "action": "Top off to final volume",
+                "detail": "Use RO/filtered water only",
+                "warning": "Record final volume added"
+            },
+            {
+                "action": "Verify EC/PPM levels",
+                "detail": "Compare to target range for growth stage",
+                "warning": "Document any adjustments made"
+            },
+            {
+                "action": "Final pH adjustment",
+                "detail": "Adjust slowly, verify stability",
+                "warning": "Allow 15-30 minutes between adjustments"
+            },
+            {
+                "action": "Final documentation",
+                "detail": "Record all parameters and calculations",
+                "warning": "Required for compliance tracking"
+            }
+        ]
+    }
+}
+
+# Handling warning shown with each nutrient type
+NUTRIENT_WARNINGS = {
+    'calmag': "Monitor pH, can increase significantly",
+    'base': "Check for precipitation, ensure proper mixing",
+    'micro': "Add first of base nutrients",
+    'grow': "Add second, after micro",
+    'bloom': "Add last of base nutrients",
+    'supplement': "Add slowly, watch for reactions",
+    'silica': "Must be added first, raises pH significantly",
+    'enzyme': "Temperature sensitive, verify water temp",
+    'pk_boost': "Monitor EC closely, can build up salts"
+}
+
+DEFAULT_EC_RANGE = "1.0-1.4"
+
+
+def determine_nutrient_type(nutrient: str) -> str:
+    """Determine nutrient type from name if not provided"""
+    nutrient = nutrient.lower()
+    if 'cal' in nutrient and 'mag' in nutrient:
+        return 'calmag'
+    elif 'micro' in nutrient:
+        return 'micro'
+    elif 'grow' in nutrient:
+        return 'grow'
+    elif 'bloom' in nutrient:
+        return 'bloom'
+    elif 'silica' in nutrient:
+        return 'silica'
+    elif any(x in nutrient for x in ['pk', 'p/k', 'phosphorus']):
+        return 'pk_boost'
+    else:
+        return 'supplement'
+
+
+def sort_by_mixing_order(recipe: Dict) -> Dict:
+    """Return the recipe with its nutrients in scheduled mixing order"""
+    products = [
+        (nutrient, details.get('type') or determine_nutrient_type(nutrient))
+        for nutrient, details in recipe.items()
+    ]
+    return {nutrient: recipe[nutrient] for nutrient in mixing_sequence(products)}
+
+
+def nutrient_warning(nutrient: str, nutrient_type: Optional[str] = None) -> str:
+    """Get the handling warning for a nutrient, inferring its type from the name if needed"""
+    if nutrient_type is None:
+        nutrient_type = determine_nutrient_type(nutrient)
+    return NUTRIENT_WARNINGS.get(nutrient_type, "Monitor solution for any reactions")
+
+
+def ec_range(recipe: Dict) -> str:
+    """Calculate target EC range based on recipe composition"""
+    try:
+        if not recipe:
+            return DEFAULT_EC_RANGE
+
+        base_count = sum(1 for details in recipe.values()
+                         if details.get('type') in ['micro', 'grow', 'bloom'])
+
+        if base_count <= 2:
+            return "1.0-1.4"
+        elif base_count <= 3:
+            return "1.2-1.8"
+        else:
+            return "1.4-2.0"
+    except Exception as e:
+        logger.error(f"Error calculating EC range: {str(e)}")
+        return DEFAULT_EC_RANGE
+
+
+def mixing_steps(recipe: Dict) -> List[Dict]:
+    """One {action, detail, warning} step per nutrient, in mixing order"""
+    return [
+        {
+            "action": f"Add {nutrient}",
+            "detail": f"Amount: {details.get('amount', 'N/A')} {details.get('unit', 'ml')} - {details.get('notes', '')}",
+            "warning": nutrient_warning(nutrient, details.get('type'))
+        }
+        for nutrient, details in sort_by_mixing_order(recipe).items()
+    ]
+
+
+# Nutrient type -> instruction section; anything else is a supplement
+INSTRUCTION_BUCKETS = {
+    'silica': 'silica',
+    'calmag': 'calmag',
+    'micro': 'base',
+    'grow': 'base',
+    'bloom': 'base'
+}
+
+# Constant parts of the saved-recipe instructions, built once at import.
+# Lists are kept as tuples; _fill gives every recipe its own lists and dicts.
+_PREPARATION_STEP = {
+    'step': 1,
+    'title': 'Preparation',
+    'description': "Prepare your mixing environment and equipment",
+    'tips': (
+        'Clean all mixing equipment thoroughly',
+        'Calibrate pH and EC meters',
+        'Prepare measuring syringes/cups',
+        'Have paper towels ready for spills',
+        'Wear protective gloves if needed'
+    ),
+    'equipment_needed': (
+        'Clean mixing container',
+        'Measuring syringes/cups',
+        'Stirring tool',
+        'pH meter',
+        'EC/PPM meter',
+        'Thermometer'
+    )
+}
+
+_WATER_STEP = {
+    'step': 2,
+    'title': 'Water Preparation',
+    'tips': (
+        'Use RO or filtered water if possible',
+        'Check water temperature (65-75°F ideal)',
+        'Measure initial EC/PPM of water',
+        'Record initial pH reading',
+        'Let chlorinated water sit for 24h or use dechlorinator'
+    ),
+    'measurements': {
+        'Target Temperature': '68-72°F',
+        'Starting EC': '<0.1 for RO, <0.5 for tap',
+        'Starting pH': 'Record initial reading'
+    }
+}
+
+_PH_STEP = {
+    'step': 3,
+    'title': 'Initial pH Adjustment',
+    'description': "Adjust water pH if needed before adding nutrients",
+    'tips': (
+        'Target pH: 5.5-6.0 for initial mix',
+        'Add pH adjusters slowly (1ml at a time)',
+        'Mix thoroughly between additions',
+        'Wait 30 seconds before retesting',
+        'Consider water source (RO vs Tap)'
+    ),
+    'measurements': {
+        'Target pH': '5.5-6.0',
+        'Wait Time': '30 seconds between adjustments'
+    }
+}
+
+_SILICA_STEP = {
+    'step': 4,
+    'title': 'Add Silica',
+    'description': "Add silica supplement first and mix thoroughly",
+    'tips': (
+        'Add silica FIRST before other nutrients',
+        'Mix thoroughly for 2 minutes',
+        'Wait 15 minutes before next addition',
+        'Check pH after mixing (silica raises pH)',
+        'Do not mix directly with concentrated nutrients'
+    ),
+    'wait_time': '15 minutes',
+    'ph_impact': 'Increases pH significantly'
+}
+
+_CALMAG_STEP = {
+    'step': 5,
+    'title': 'Add CalMag',
+    'description': "Add calcium/magnesium supplements",
+    'tips': (
+        'Add CalMag before base nutrients',
+        'Mix thoroughly for 1 minute',
+        'Wait 5 minutes before next addition',
+        'Check for any precipitation',
+        'Monitor solution clarity'
+    ),
+    'wait_time': '5 minutes',
+    'ph_impact': 'May slightly affect pH'
+}
+
+_BASE_STEP = {
+    'step': 6,
+    'title': 'Add Base Nutrients',
+    'description': "Add base nutrients in specific order",
+    'tips': (
+        'Always add in order: Micro → Grow → Bloom',
+        'Mix thoroughly between each addition',
+        'Wait 60 seconds between each nutrient',
+        'Check EC after each addition',
+        'Watch for any reactions or precipitation'
+    ),
+    'sequence': (
+        {'nutrient': 'Micro', 'wait': '60 seconds', 'mix_time': '30 seconds'},
+        {'nutrient': 'Grow', 'wait': '60 seconds', 'mix_time': '30 seconds'},
+        {'nutrient': 'Bloom', 'wait': '60 seconds', 'mix_time': '30 seconds'}
+    )
+}
+
+_SUPPLEMENT_STEP = {
+    'step': 7,
+    'title': 'Add Supplements',
+    'description': "Add remaining supplements in optimal order",
+    'tips': (
+        'Add one supplement at a time',
+        'Mix thoroughly between additions',
+        'Monitor EC changes closely',
+        'Watch for any reactions',
+        'Check pH after each addition'
+    ),
+    'recommended_order': (
+        'Root enhancers',
+        'Humic/Fulvic acids',
+        'PK boosters',
+        'Enzymes',
+        'Beneficial bacteria'
+    ),
+    'wait_time': '60 seconds between each'
+}
+
+_FINAL_STEP = {
+    'step': 8,
+    'title': 'Final Adjustments',
+    'description': "Make final pH and EC adjustments",
+    'tips': (
+        'Adjust pH to target range',
+        'Verify final EC/PPM',
+        'Let solution sit for 15 minutes',
+        'Take final readings',
+        'Document all measurements'
+    ),
+    'verification_steps': (
+        'Check solution clarity',
+        'Verify no precipitation',
+        'Confirm all nutrients dissolved',
+        'Record final measurements'
+    )
+}
+
+
+def _copy(value):
+    """Deep copy of a template value, with tuples turned back into lists"""
+    if isinstance(value, dict):
+        return {key: _copy(item) for key, item in value.items()}
+    if isinstance(value, tuple):
+        return [_copy(item) for item in value]
+    return value
+
+
+def _fill(template: Dict, **fields) -> Dict:
+    """Copy a step template and add the recipe-specific fields
+
+    The copy shares nothing with the template, so changing a generated
+    recipe never changes later ones, and list sections are lists as before.
+    """
+    step = _copy(template)
+    step.update(fields)
+    return step
+
+
+def generate_mixing_instructions(recipe_data: Dict) -> List[Dict]:
+    """Generate comprehensive mixing instructions for a saved recipe
+
+    Constant sections come from the prebuilt step templates; nutrients are
+    sorted into sections in a single pass (in scheduled mixing order) and
+    only amounts, size and targets are filled in per recipe.
+    """
+    try:
+        amounts = {'silica': {}, 'calmag': {}, 'base': {}, 'supplement': {}}
+        for name, details in sort_by_mixing_order(recipe_data.get('nutrients', {})).items():
+            bucket = INSTRUCTION_BUCKETS.get(details.get('type'), 'supplement')
+            amounts[bucket][name] = f"{details['amount']} {details.get('unit', 'ml')}"
+        target_ec = recipe_data.get('target_ec', 'See feeding chart')
+
+        instructions = [
+            _fill(_PREPARATION_STEP),
+            _fill(
+                _WATER_STEP,
+                description=f"Fill container with {recipe_data.get('size', 0)} gallons of water at room temperature"
+            ),
+            _fill(_PH_STEP)
+        ]
+        if amounts['silica']:
+            instructions.append(_fill(_SILICA_STEP, amounts=amounts['silica']))
+        if amounts['calmag']:
+            instructions.append(_fill(_CALMAG_STEP, amounts=amounts['calmag']))
+        if amounts['base']:
+            instructions.append(_fill(_BASE_STEP, amounts=amounts['base'], target_ec=target_ec))
+        if amounts['supplement']:
+            instructions.append(_fill(_SUPPLEMENT_STEP, amounts=amounts['supplement']))
+        instructions.append(_fill(
+            _FINAL_STEP,
+            target_measurements={
+                'Final pH': recipe_data.get('target_ph', '5.8-6.2'),
+                'Final EC': target_ec,
+                'Solution Temp': '65-75°F'
+            }
+        ))
+        return instructions
+
+    except Exception as e:
+        logger.error(f"Failed to generate mixing instructions: {str(e)}")
+        return []
@@ -0,0 +1,255 @@
+"""Append-only NDJSON journal of saved recipes
+
+Every save appends one JSON line to the journal; nothing is rewritten. An
+in-memory index maps each recipe name to the offset and length of its
+latest line, so loading a recipe reads just that line, and lines appended by
+other processes are picked up by reading only the new tail of the file.
+
+Appends are written immediately (other sessions see them at once) but
+fsync'd in batches by a background thread, at most every fsync_interval
+seconds. Once superseded lines make up most of the file, a background
+compaction rewrites it with only the latest line per name. Appenders hold a
+shared lock and compaction an exclusive one, so no process appends to a file
+that is being replaced.
+
+    journal = RecipeJournal('saved_recipes.ndjson')
+    journal.append({'name': 'Week 3 veg', ...})
+    journal.get('Week 3 veg')
+"""
+import json
+import logging
+import os
+import threading
+import time
+from contextlib import contextmanager
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
+
+try:
+    import fcntl
+except ImportError:  # Windows: compaction is not coordinated with other processes
+    fcntl = None
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_JOURNAL_PATH = 'saved_recipes.ndjson'
+
+# The JSON array written by earlier versions; imported once into an empty journal
+LEGACY_PATH = 'saved_recipes.json'
+
+# Seconds between batched fsyncs
+FSYNC_INTERVAL = 0.5
+
+# Compact once the file is at least this large and this fraction of it is superseded
+COMPACT_MIN_BYTES = 1 << 20
+COMPACT_DEAD_RATIO = 0.5
+
+_READ_SIZE = 1 << 20
+
+
+class RecipeJournal:
+    """Recipes by name in an append-only NDJSON file with an offset index"""
+
+    def __init__(self, path=DEFAULT_JOURNAL_PATH, legacy_path=None, fsync_interval: float = FSYNC_INTERVAL,
+                 auto_compact: bool = True):
+        self.path = str(path)
+        self.fsync_interval = fsync_interval
+        self.auto_compact = auto_compact
+        self._lock = threading.RLock()
+        self._lock_fd = os.open(self.path + '.lock', os.O_RDWR | os.O_CREAT, 0o644)
+        self._fd = None
+        self._dirty = threading.Event()
+        self._closed = False
+        self._flusher = None
+        self._compactor = None
+        with self._lock:
+            self._open()
+            self._refresh()
+            if legacy_path and not self._index and os.path.exists(legacy_path):
+                self._import_legacy(legacy_path)
+
+    def _open(self):
+        """(Re)open the journal file and reset the index"""
+        if self._fd is not None:
+            os.close(self._fd)
+        self._fd = os.open(self.path, os.O_RDWR | os.O_APPEND | os.O_CREAT, 0o644)
+        self._inode = os.fstat(self._fd).st_ino
+        self._index: Dict[str, Tuple[int, int]] = {}
+        self._scanned = 0     # bytes of the file indexed so far
+        self._live_bytes = 0  # bytes of lines that are still the latest for their name
+
+    @contextmanager
+    def _file_lock(self, exclusive: bool = False):
+        """Cross-process lock: shared for appends, exclusive for compaction"""
+        if fcntl is None:
+            yield
+            return
+        fcntl.flock(self._lock_fd, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+        try:
+            yield
+        finally:
+            fcntl.flock(self._lock_fd, fcntl.LOCK_UN)
+
+    def _refresh(self):
+        """Index lines appended since the last scan, reopening if the file was compacted"""
+        try:
+            if os.stat(self.path).st_ino != self._inode:
+                self._open()
+        except FileNotFoundError:
+            self._open()
+
+        while True:
+            chunk = os.pread(self._fd, _READ_SIZE, self._scanned)
+            end = chunk.rfind(b'\n') + 1
+            if not end:
+                if len(chunk) == _READ_SIZE:
+                    raise ValueError(f"Journal line at offset {self._scanned} exceeds {_READ_SIZE} bytes")
+                return  # nothing new, or a line still being written
+            offset = self._scanned
+            for line in chunk[:end].splitlines(keepends=True):
+                self._index_line(line, offset)
+                offset += len(line)
+            self._scanned = offset
+
+    def _index_line(self, line: bytes, offset: int):
+        """Point the index at one journal line"""
+        try:
+            name = json.loads(line)['name']
+        except (ValueError, KeyError, TypeError):
+            logger.warning(f"Skipping unreadable journal line at offset {offset} in {self.path}")
+            return
+        previous = self._index.get(name)
+        if previous is not None:
+            self._live_bytes -= previous[1]
+        self._index[name] = (offset, len(line))  # a name keeps its first position
+        self._live_bytes += len(line)
+
+    def _import_legacy(self, legacy_path):
+        """Append the recipes of a legacy JSON array file in one write"""
+        try:
+            with open(legacy_path) as f:
+                recipes = json.load(f)
+            recipes = [recipe for recipe in recipes if isinstance(recipe, dict) and recipe.get('name')]
+            self._write(recipes)
+            self.sync()
+            logger.info(f"Imported {len(recipes)} recipes from {legacy_path} into {self.path}")
+        except Exception as e:
+            logger.error(f"Failed to import legacy recipes from {legacy_path}: {str(e)}")
+
+    def _write(self, records: List[Dict]):
+        """Append records as one write, so lines from concurrent appenders never interleave"""
+        data = b''.join(
+            json.dumps(record, separators=(',', ':'), default=str).encode() + b'\n' for record in records
+        )
+        if not data:
+            return
+        with self._lock, self._file_lock():
+            self._refresh()
+            os.write(self._fd, data)
+            self._refresh()
+        self._dirty.set()
+        self._start_background()
+
+    def append(self, recipe: Dict, sync: bool = False):
+        """Append a recipe (it must have a 'name'); sync=True waits until it is on disk"""
+        if not recipe.get('name'):
+            raise ValueError("Recipe name is required")
+        self._write([recipe])
+        if sync:
+            self.sync()
+
+    def get(self, name: str) -> Optional[Dict]:
+        """Latest recipe saved under name, reading only its line"""
+        with self._lock:
+            self._refresh()
+            location = self._index.get(name)
+            if location is None:
+                return None
+            offset, length = location
+            return json.loads(os.pread(self._fd, length, offset))
+
+    def names(self) -> List[str]:
+        """Recipe names in the order they were first saved"""
+        with self._lock:
+            self._refresh()
+            return list(self._index)
+
+    def __len__(self) -> int:
+        with self._lock:
+            self._refresh()
+            return len(self._index)
+
+    def __contains__(self, name) -> bool:
+        with self._lock:
+            self._refresh()
+            return name in self._index
+
+    def sync(self):
+        """fsync everything appended so far"""
+        with self._lock:
+            if self._closed:
+                return
+            self._dirty.clear()
+            os.fsync(self._fd)
+
+    def _start_background(self):
+        """Start the fsync thread, and a compaction if enough of the file is superseded"""
+        if self._flusher is None:
+            self._flusher = threading.Thread(target=self._flush_loop, name='recipe-journal-fsync', daemon=True)
+            self._flusher.start()
+        if self.auto_compact and self.needs_compaction() and not (self._compactor and self._compactor.is_alive()):
+            self._compactor = threading.Thread(target=self.compact, name='recipe-journal-compact', daemon=True)
+            self._compactor.start()
+
+    def _flush_loop(self):
+        """Background thread: batch fsyncs of recent appends"""
+        while True:
+            self._dirty.wait()
+            time.sleep(self.fsync_interval)  # let more appends join this batch
+            if self._closed:
+                return
+            try:
+                self.sync()
+            except OSError as e:
+                logger.error(f"Failed to sync recipe journal: {str(e)}")
+
+    def needs_compaction(self) -> bool:
+        """Whether superseded lines make up enough of the file to rewrite it"""
+        dead = self._scanned - self._live_bytes
+        return self._scanned >= COMPACT_MIN_BYTES and dead > self._scanned * COMPACT_DEAD_RATIO
+
+    def compact(self):
+        """Rewrite the journal with only the latest line per name"""
+        try:
+            with self._lock, self._file_lock(exclusive=True):
+                self._refresh()
+                temp_path = self.path + '.compact'
+                with open(temp_path, 'wb') as out:
+                    for offset, length in self._index.values():
+                        out.write(os.pread(self._fd, length, offset))
+                    out.flush()
+                    os.fsync(out.fileno())
+                before = self._scanned
+                os.replace(temp_path, self.path)
+                self._open()
+                self._refresh()
+            logger.info(f"Compacted {self.path} from {before} to {self._scanned} bytes")
+        except Exception as e:
+            logger.error(f"Failed to compact recipe journal: {str(e)}")
+
+    def close(self):
+        """Sync and close the journal"""
+        with self._lock:
+            if self._closed:
+                return
+            self.sync()
+            self._closed = True
+            self._dirty.set()  # wake the fsync thread so it exits
+            os.close(self._fd)
+            os.close(self._lock_fd)
+
+
+@lru_cache(maxsize=None)
+def get_recipe_journal(path: str = DEFAULT_JOURNAL_PATH, legacy_path: Optional[str] = LEGACY_PATH) -> RecipeJournal:
+    """The process-wide journal at path, importing legacy_path once if the journal is empty"""
+    return RecipeJournal(path, legacy_path)
@@ -0,0 +1,55 @@
+"""Deferred imports for heavy optional dependencies (pandas, plotly, requests)
+
+    pd = lazy_import('pandas')
+    go = lazy_import('plotly.graph_objects')
+
+The module is imported on first attribute access, so code paths that never
+build a DataFrame or chart never pay for the import.
+"""
+import importlib
+import sys
+import threading
+from types import ModuleType
+
+
+class LazyModule:
+    """Stand-in for a module that imports it on first attribute access"""
+
+    __slots__ = ('_name', '_module', '_lock')
+
+    def __init__(self, name: str):
+        object.__setattr__(self, '_name', name)
+        object.__setattr__(self, '_module', None)
+        object.__setattr__(self, '_lock', threading.Lock())
+
+    def _load(self) -> ModuleType:
+        """Import the real module (once) and return it"""
+        if self._module is None:
+            with self._lock:
+                if self._module is None:
+                    object.__setattr__(self, '_module', importlib.import_module(self._name))
+        return self._module
+
+    @property
+    def is_loaded(self) -> bool:
+        """Whether the real module has been imported yet"""
+        return self._module is not None
+
+    def __getattr__(self, attr):
+        return getattr(self._load(), attr)
+
+    def __setattr__(self, attr, value):
+        setattr(self._load(), attr, value)
+
+    def __dir__(self):
+        return dir(self._load())
+
+    def __repr__(self):
+        state = 'loaded' if self.is_loaded else 'not loaded'
+        return f"<lazy module '{self._name}' ({state})>"
+
+
+def lazy_import(name: str):
+    """Return the module if it is already imported, otherwise a LazyModule for it"""
+    module = sys.modules.get(name)
+    return module if module is not None else LazyModule(name)
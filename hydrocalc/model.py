@@ -0,0 +1,218 @@
+"""Compact, immutable recipe types
+
+Recipes otherwise travel as nested dicts that repeat the same keys
+('amount', 'unit', 'type', 'per_unit', ...) in every dose and carry
+pre-formatted strings such as "2.5 ml/gal". These frozen, slotted types
+store the numbers once and format only in to_dict(). Repeated strings are
+interned, and mixing steps are pooled, so recipes built from the same
+templates share one MixingStep per distinct step. Nothing can be changed in
+place, so instances are shared between sessions, caches and histories
+without copying.
+
+Every type converts to and from the existing dict/JSON shape:
+Recipe.from_dict(d).to_dict() == d for calculator recipes, including key
+order. Tuples come back as lists, as they would from JSON.
+"""
+import sys
+from dataclasses import dataclass
+from functools import lru_cache
+from typing import Any, Dict, Optional, Tuple
+
+# Keys every dose dict carries, in calculator order; anything else is kept in extras
+DOSE_KEYS = ('amount', 'unit', 'type', 'per_unit', 'notes', 'npk', 'when_to_use')
+
+# Recipe keys stored as attributes rather than in extras
+RECIPE_KEYS = ('nutrients', 'mixing_instructions', 'strain', 'growth_phase', 'growth_stage',
+               'size', 'strength', 'created_at', 'recipe_id', 'tags')
+
+PER_UNIT_LABEL = 'ml/gal'
+
+
+class FrozenDict(tuple):
+    """A dict frozen as a tuple of (key, value) pairs, so it can be hashed and shared"""
+
+    __slots__ = ()
+
+
+def freeze(value):
+    """Deep-freeze JSON-like data: dicts become FrozenDicts, lists tuples, strings are interned"""
+    if isinstance(value, str):
+        return sys.intern(value)
+    if isinstance(value, dict):
+        return FrozenDict((sys.intern(key) if isinstance(key, str) else key, freeze(item))
+                          for key, item in value.items())
+    if isinstance(value, (list, tuple)):
+        return tuple(freeze(item) for item in value)
+    return value
+
+
+def thaw(value):
+    """Inverse of freeze(): fresh dicts and lists the caller may modify"""
+    if isinstance(value, FrozenDict):
+        return {key: thaw(item) for key, item in value}
+    if isinstance(value, tuple):
+        return [thaw(item) for item in value]
+    return value
+
+
+@lru_cache(maxsize=None)
+def _key_order(keys: Tuple[str, ...]) -> Tuple[str, ...]:
+    """One shared tuple per distinct key order"""
+    return tuple(sys.intern(key) for key in keys)
+
+
+def _parse_per_unit(text) -> Optional[float]:
+    """The number in a "2.5 ml/gal" string, or None if it is not in that form"""
+    if not isinstance(text, str):
+        return None
+    number, _, label = text.partition(' ')
+    if label != PER_UNIT_LABEL:
+        return None
+    try:
+        return float(number)
+    except ValueError:
+        return None
+
+
+@dataclass(frozen=True, slots=True)
+class Dose:
+    """One product's amount in a recipe"""
+
+    name: str
+    amount: float
+    per_unit: Optional[float] = None  # ml per gallon
+    unit: str = 'ml'
+    type: Optional[str] = None
+    notes: Optional[str] = None
+    npk: Optional[str] = None
+    when_to_use: Optional[str] = None
+    keys: Tuple[str, ...] = DOSE_KEYS[:5]  # keys of the dict form, in order
+    extras: FrozenDict = FrozenDict()
+
+    @classmethod
+    def from_dict(cls, name: str, entry: Dict) -> 'Dose':
+        extras = {key: value for key, value in entry.items() if key not in DOSE_KEYS}
+        per_unit = _parse_per_unit(entry.get('per_unit'))
+        if per_unit is None and entry.get('per_unit') is not None:
+            extras['per_unit'] = entry['per_unit']  # not "<number> ml/gal"; keep it verbatim
+        return cls(
+            name=sys.intern(name),
+            amount=entry.get('amount'),
+            per_unit=per_unit,
+            unit=freeze(entry.get('unit')),
+            type=freeze(entry.get('type')),
+            notes=freeze(entry.get('notes')),
+            npk=freeze(entry.get('npk')),
+            when_to_use=freeze(entry.get('when_to_use')),
+            keys=_key_order(tuple(entry)),
+            extras=freeze(extras)
+        )
+
+    def to_dict(self) -> Dict:
+        extras = dict(self.extras)
+        entry = {}
+        for key in self.keys:
+            if key in extras:
+                entry[key] = thaw(extras[key])
+            elif key == 'per_unit':
+                entry[key] = None if self.per_unit is None else f"{self.per_unit} {PER_UNIT_LABEL}"
+            else:
+                entry[key] = getattr(self, key)
+        return entry
+
+
+@dataclass(frozen=True, slots=True)
+class MixingStep:
+    """One step of a recipe's mixing instructions"""
+
+    step: int
+    title: str
+    description: Optional[str] = None
+    tips: Tuple[str, ...] = ()
+    keys: Tuple[str, ...] = ('step', 'title', 'description', 'tips')
+    extras: FrozenDict = FrozenDict()  # measurements, amounts, wait times, ...
+
+    @classmethod
+    def from_dict(cls, step: Dict) -> 'MixingStep':
+        extras = {key: value for key, value in step.items() if key not in ('step', 'title', 'description', 'tips')}
+        return _pooled_step(
+            step.get('step'),
+            freeze(step.get('title')),
+            freeze(step.get('description')),
+            freeze(step.get('tips', ())),
+            _key_order(tuple(step)),
+            freeze(extras)
+        )
+
+    def to_dict(self) -> Dict:
+        extras = dict(self.extras)
+        return {key: thaw(extras[key] if key in extras else getattr(self, key)) for key in self.keys}
+
+
+# Identical steps (most of every recipe's instructions) resolve to one shared instance
+_pooled_step = lru_cache(maxsize=4096)(MixingStep)
+
+
+@dataclass(frozen=True, slots=True)
+class Recipe:
+    """A saved recipe: doses, mixing steps and metadata"""
+
+    nutrients: Tuple[Dose, ...] = ()
+    mixing_instructions: Tuple[MixingStep, ...] = ()
+    strain: Optional[str] = None
+    growth_phase: Optional[str] = None
+    growth_stage: Optional[str] = None
+    size: Optional[float] = None
+    strength: Optional[float] = None
+    created_at: Optional[str] = None
+    recipe_id: Optional[int] = None
+    tags: Optional[Tuple[str, ...]] = None
+    keys: Tuple[str, ...] = ('nutrients',)
+    extras: FrozenDict = FrozenDict()
+
+    @classmethod
+    def from_dict(cls, recipe: Dict) -> 'Recipe':
+        """Build from a recipe dict, or from a bare {product: dose} calculator result"""
+        if recipe and all(isinstance(entry, dict) and 'amount' in entry for entry in recipe.values()):
+            return cls(nutrients=tuple(Dose.from_dict(name, entry) for name, entry in recipe.items()), keys=())
+
+        extras = {key: value for key, value in recipe.items() if key not in RECIPE_KEYS}
+        return cls(
+            nutrients=tuple(Dose.from_dict(name, entry) for name, entry in (recipe.get('nutrients') or {}).items()),
+            mixing_instructions=tuple(MixingStep.from_dict(step) for step in recipe.get('mixing_instructions') or ()),
+            strain=freeze(recipe.get('strain')),
+            growth_phase=freeze(recipe.get('growth_phase')),
+            growth_stage=freeze(recipe.get('growth_stage')),
+            size=recipe.get('size'),
+            strength=recipe.get('strength'),
+            created_at=freeze(recipe.get('created_at')),
+            recipe_id=recipe.get('recipe_id'),
+            tags=freeze(recipe.get('tags')),
+            keys=_key_order(tuple(recipe)),
+            extras=freeze(extras)
+        )
+
+    def doses(self) -> Dict[str, Dose]:
+        """Doses by product name"""
+        return {dose.name: dose for dose in self.nutrients}
+
+    def get(self, key: str, default=None) -> Any:
+        """Value of one key in dict form, like dict.get"""
+        if key not in self.keys and self.keys:
+            return default
+        for extra_key, value in self.extras:
+            if extra_key == key:
+                return thaw(value)
+        if key == 'nutrients':
+            return {dose.name: dose.to_dict() for dose in self.nutrients}
+        if key == 'mixing_instructions':
+            return [step.to_dict() for step in self.mixing_instructions]
+        if key in RECIPE_KEYS:
+            return thaw(getattr(self, key))
+        return default
+
+    def to_dict(self) -> Dict:
+        """The recipe as the dict the rest of the app uses (a fresh copy)"""
+        if not self.keys:
+            return {dose.name: dose.to_dict() for dose in self.nutrients}
+        return {key: self.get(key) for key in self.keys}
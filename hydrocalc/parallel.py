@@ -0,0 +1,98 @@
+"""Process-pool execution of batch dose calculations
+
+Each worker receives the compiled catalog once, through the pool
+initializer, and builds its own CalculationCore from it. Tasks then carry
+only their slice of the inputs. Shards are contiguous and reassembled in
+submission order, and each row is computed by the same elementwise
+operations as single-process mode, so results are identical.
+"""
+import logging
+from concurrent.futures import ProcessPoolExecutor
+from typing import List, Optional
+
+import numpy as np
+
+from hydrocalc.catalog import NutrientCatalog
+from hydrocalc.core import CalculationCore
+from hydrocalc.engine import DoseTable, as_column
+
+logger = logging.getLogger(__name__)
+
+# Shards per worker; a few per worker keeps the pool busy when shards finish unevenly
+SHARDS_PER_WORKER = 4
+
+# Below this many rows per worker the pool costs more than it saves
+MIN_ROWS_PER_WORKER = 10_000
+
+_worker_core: Optional[CalculationCore] = None
+
+
+def _init_worker(catalog: NutrientCatalog):
+    """Pool initializer: build this worker's core from the shipped catalog"""
+    global _worker_core
+    _worker_core = CalculationCore(catalog)
+
+
+def _calculate_shard(sizes, strengths, growth_stages, unit_systems, selected_nutrients):
+    """Worker task: calculate one contiguous shard"""
+    doses = _worker_core.calculate_nutrients_batch(sizes, strengths, growth_stages, selected_nutrients, unit_systems)
+    return doses.per_unit, doses.amounts
+
+
+class BatchPool:
+    """A reusable worker pool for repeated batch calculations (sweeps, chunked files)
+
+    Use as a context manager so the workers are shut down afterwards.
+    """
+
+    def __init__(self, core: CalculationCore, workers: int):
+        if workers < 1:
+            raise ValueError(f"workers must be at least 1, got {workers}")
+        self.core = core
+        self.workers = workers
+        self.executor = ProcessPoolExecutor(max_workers=workers, initializer=_init_worker, initargs=(core.catalog,))
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+
+    def close(self):
+        self.executor.shutdown()
+
+    def calculate_nutrients_batch(self, sizes, strengths, growth_stages, selected_nutrients: List[str],
+                                  unit_systems='US') -> DoseTable:
+        """Same result as CalculationCore.calculate_nutrients_batch, computed across the pool"""
+        sizes = np.atleast_1d(np.asarray(sizes, dtype=float))
+        n = sizes.shape[0]
+        if n < MIN_ROWS_PER_WORKER * 2:
+            return self.core.calculate_nutrients_batch(sizes, strengths, growth_stages, selected_nutrients, unit_systems)
+
+        strengths = as_column(strengths, n, float)
+        growth_stages = as_column(growth_stages, n, str)
+        unit_systems = as_column(unit_systems, n, str)
+        shards = np.array_split(np.arange(n), min(self.workers * SHARDS_PER_WORKER, n // MIN_ROWS_PER_WORKER))
+
+        futures = [
+            self.executor.submit(
+                _calculate_shard,
+                sizes[shard], strengths[shard], growth_stages[shard], unit_systems[shard], selected_nutrients
+            )
+            for shard in shards
+        ]
+        results = [future.result() for future in futures]  # submission order == input order
+
+        product_ids = self.core.recipe_products(selected_nutrients)
+        return DoseTable(
+            products=[self.core.catalog.names[product_id] for product_id in product_ids],
+            per_unit=np.concatenate([per_unit for per_unit, _ in results]),
+            amounts=np.concatenate([amounts for _, amounts in results])
+        )
+
+
+def calculate_nutrients_parallel(core: CalculationCore, sizes, strengths, growth_stages,
+                                 selected_nutrients: List[str], unit_systems='US', workers: int = 2) -> DoseTable:
+    """Run one batch calculation on a temporary pool of workers"""
+    with BatchPool(core, workers) as pool:
+        return pool.calculate_nutrients_batch(sizes, strengths, growth_stages, selected_nutrients, unit_systems)
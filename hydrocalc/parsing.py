@@ -0,0 +1,83 @@
+"""Load-time parsing of the string fields in catalog and strain data"""
+import logging
+import re
+from typing import Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+# "16-21%", "0.6-1.0", "7-8 weeks", "5.8 to 6.3" or a single value like "1.2"
+_RANGE_PATTERN = re.compile(
+    r'^\s*(\d+(?:\.\d+)?)\s*(?:(?:-|–|to)\s*(\d+(?:\.\d+)?))?\s*(?:%|weeks?)?\s*$',
+    re.IGNORECASE
+)
+
+# Strain fields holding numeric ranges, keyed by the name they are parsed to
+STRAIN_RANGE_FIELDS = {
+    'thc': 'thc_range',
+    'cbd': 'cbd_range',
+    'flowering_weeks': 'flowering_time',
+    'ph': 'optimal_ph'
+}
+
+
+def parse_npk(npk: str) -> Tuple[float, float, float]:
+    """Parse an 'N-P-K' guaranteed analysis string such as '15.5-0-0'"""
+    parts = npk.split('-')
+    if len(parts) != 3:
+        raise ValueError(f"expected N-P-K, got {npk!r}")
+    n, p, k = (float(part) for part in parts)
+    return n, p, k
+
+
+def parse_range(value) -> Tuple[float, float]:
+    """Parse a range such as '16-21%' or [1.2, 1.6] into (low, high)"""
+    if isinstance(value, (list, tuple)) and len(value) == 2:
+        low, high = float(value[0]), float(value[1])
+    elif isinstance(value, (int, float)):
+        low = high = float(value)
+    else:
+        match = _RANGE_PATTERN.match(str(value))
+        if not match:
+            raise ValueError(f"expected a range like '1.0-1.4', got {value!r}")
+        low = float(match.group(1))
+        high = float(match.group(2)) if match.group(2) else low
+    if low > high:
+        raise ValueError(f"range {value!r} is reversed")
+    return low, high
+
+
+def parse_strain(strain: Dict) -> Tuple[Dict[str, Optional[Tuple[float, float]]], List[str]]:
+    """Parse a strain's range fields, returning (ranges, problems)
+
+    ranges maps 'thc', 'cbd', 'flowering_weeks', 'ph' and 'ec.<stage>' to
+    (low, high) tuples, or None when the field is missing or malformed.
+    """
+    ranges: Dict[str, Optional[Tuple[float, float]]] = {}
+    problems: List[str] = []
+
+    fields = [(key, field, strain.get(field)) for key, field in STRAIN_RANGE_FIELDS.items()]
+    fields.extend(
+        (f'ec.{stage}', f'optimal_ec.{stage}', value)
+        for stage, value in (strain.get('optimal_ec') or {}).items()
+    )
+    for key, field, value in fields:
+        if value is None:
+            ranges[key] = None
+            problems.append(f"{field} is missing")
+            continue
+        try:
+            ranges[key] = parse_range(value)
+        except ValueError as e:
+            ranges[key] = None
+            problems.append(f"{field}: {e}")
+    return ranges, problems
+
+
+def parse_strain_library(strains: Dict[str, Dict]) -> Dict[str, Dict[str, Optional[Tuple[float, float]]]]:
+    """Parse every strain once at load time, logging any bad entries"""
+    parsed = {}
+    for name, strain in strains.items():
+        parsed[name], problems = parse_strain(strain)
+        for problem in problems:
+            logger.warning(f"Strain '{name}': {problem}")
+    return parsed
@@ -0,0 +1,146 @@
+"""Full-season feeding plans computed in a single vectorized pass"""
+import functools
+from typing import Dict, List, Mapping, Sequence, Tuple, Union
+
+import numpy as np
+
+from hydrocalc.catalog import get_catalog
+from hydrocalc.data import FEEDING_SCHEDULES
+from hydrocalc.engine import FEEDING_MULTIPLIERS, STAGE_MULTIPLIERS, as_column, round_like_python, to_gallons
+
+# Growth stages in the order a season runs through them
+STAGE_ORDER = tuple(STAGE_MULTIPLIERS)
+
+StageWeeks = Mapping[str, int]
+
+
+@functools.lru_cache(maxsize=None)
+def schedule_matrix(nutrient_line: str) -> Tuple[Tuple[str, ...], np.ndarray]:
+    """Return (products, stages x products dose matrix) for a line's base schedule
+
+    Products appear in first-use order across the season; a product missing
+    from a stage doses 0 there. The matrix is built once per line and shared.
+    """
+    if nutrient_line not in FEEDING_SCHEDULES:
+        raise ValueError(f"No feeding schedule for nutrient line: {nutrient_line}")
+    schedule = FEEDING_SCHEDULES[nutrient_line]
+
+    products = tuple(dict.fromkeys(
+        product for stage in STAGE_ORDER for product in schedule.get(stage, {})
+    ))
+    matrix = np.array([
+        [schedule.get(stage, {}).get(product, 0.0) for product in products]
+        for stage in STAGE_ORDER
+    ], dtype=float)
+    matrix.setflags(write=False)
+    return products, matrix
+
+
+def _week_counts(stage_weeks: Union[StageWeeks, Sequence[StageWeeks]], n: int) -> np.ndarray:
+    """Convert per-stage week counts into a (plans, stages) integer matrix"""
+    if isinstance(stage_weeks, Mapping):
+        stage_weeks = [stage_weeks] * n
+    if len(stage_weeks) != n:
+        raise ValueError(f"Expected {n} stage week tables, got {len(stage_weeks)}")
+
+    weeks = np.zeros((n, len(STAGE_ORDER)), dtype=np.int32)
+    for row, table in enumerate(stage_weeks):
+        for stage, count in table.items():
+            if stage not in STAGE_MULTIPLIERS:
+                raise ValueError(f"Unknown growth stage: {stage}")
+            if count < 0:
+                raise ValueError(f"Negative week count for {stage}: {count}")
+            weeks[row, STAGE_ORDER.index(stage)] = int(count)
+    return weeks
+
+
+class FeedingPlan:
+    """Week-by-week doses for one reservoir over a whole season"""
+
+    def __init__(self, nutrient_line: str, feeding_type: str, products: Tuple[str, ...], units: Tuple[str, ...],
+                 weeks: np.ndarray, per_unit: np.ndarray, amounts: np.ndarray, totals: np.ndarray):
+        self.nutrient_line = nutrient_line
+        self.feeding_type = feeding_type
+        self.stages = STAGE_ORDER
+        self.products = products
+        self.units = units          # 'ml' or 'g' for each product
+        self.weeks = weeks          # weeks spent in each stage
+        self.per_unit = per_unit    # (stages, products) per gallon, rounded to 2 decimals
+        self.amounts = amounts      # (stages, weeks, products) per week, 0 past a stage's last week
+        self.totals = totals        # (products,) consumed over the season
+
+    @property
+    def season_weeks(self) -> int:
+        """Total length of the season in weeks"""
+        return int(self.weeks.sum())
+
+    def week_rows(self):
+        """Yield (season_week, stage, stage_week, amounts) in season order"""
+        season_week = 0
+        for stage_index, stage in enumerate(self.stages):
+            for stage_week in range(self.weeks[stage_index]):
+                season_week += 1
+                yield season_week, stage, stage_week + 1, self.amounts[stage_index, stage_week]
+
+    def total_consumption(self) -> Dict[str, Dict]:
+        """Season totals per product, e.g. {'Flora Micro': {'amount': 812.4, 'unit': 'ml'}}"""
+        return {
+            product: {'amount': float(total), 'unit': unit}
+            for product, unit, total in zip(self.products, self.units, self.totals)
+        }
+
+    def to_frame(self):
+        """Return the plan as a long DataFrame with one row per week and product"""
+        import pandas as pd
+
+        rows = [
+            (season_week, stage, stage_week, product, unit, float(amount))
+            for season_week, stage, stage_week, amounts in self.week_rows()
+            for product, unit, amount in zip(self.products, self.units, amounts)
+        ]
+        return pd.DataFrame(rows, columns=['week', 'stage', 'stage_week', 'product', 'unit', 'amount'])
+
+
+def plan_seasons(nutrient_line: str, feeding_types, reservoir_sizes, stage_weeks,
+                 unit_systems='US', changes_per_week: float = 1.0) -> List[FeedingPlan]:
+    """Plan full seasons for many reservoirs with one array computation
+
+    feeding_types, reservoir_sizes and unit_systems are scalars or one value
+    per reservoir; stage_weeks is one {stage: weeks} table for every
+    reservoir or a list with one table each. Per-gallon doses are the line's
+    base schedule scaled by the feeding type (rounded like
+    get_feeding_schedule); weekly amounts assume changes_per_week full
+    reservoir changes and are rounded to 1 decimal.
+    """
+    products, base = schedule_matrix(nutrient_line)
+    catalog = get_catalog()
+    units = tuple(
+        catalog.units[product_id] if product_id is not None else 'ml'
+        for product_id in (catalog.product_id(product, nutrient_line) for product in products)
+    )
+
+    sizes = np.atleast_1d(np.asarray(reservoir_sizes, dtype=float))
+    n = sizes.shape[0]
+    feeding = as_column(feeding_types, n, str)
+    weeks = _week_counts(stage_weeks, n)
+
+    multiplier = np.array([FEEDING_MULTIPLIERS.get(f, 1.0) for f in feeding])
+    per_unit = round_like_python(base[np.newaxis] * multiplier[:, np.newaxis, np.newaxis], 2)
+    gallons = to_gallons(sizes, unit_systems) * changes_per_week
+    weekly = round_like_python(per_unit * gallons[:, np.newaxis, np.newaxis], 1)
+
+    # (plans, stages, weeks) mask of the weeks each stage actually runs
+    active = np.arange(max(int(weeks.max()), 1))[np.newaxis, np.newaxis, :] < weeks[:, :, np.newaxis]
+    amounts = weekly[:, :, np.newaxis, :] * active[..., np.newaxis]
+    totals = (weekly * weeks[:, :, np.newaxis]).sum(axis=1)
+
+    return [
+        FeedingPlan(nutrient_line, str(feeding[i]), products, units, weeks[i], per_unit[i], amounts[i], totals[i])
+        for i in range(n)
+    ]
+
+
+def plan_season(nutrient_line: str, feeding_type: str, reservoir_size: float, stage_weeks: StageWeeks,
+                unit_system: str = 'US', changes_per_week: float = 1.0) -> FeedingPlan:
+    """Plan a full season for a single reservoir"""
+    return plan_seasons(nutrient_line, feeding_type, reservoir_size, stage_weeks, unit_system, changes_per_week)[0]
@@ -0,0 +1,231 @@
+"""Incrementally maintained indexes over an in-memory recipes dict
+
+Every recipe name gets a small integer id, never reused. Strain, growth
+phase and tag values each map to a bitmap of ids (a Python int used as a
+bitset), so filters combine with &, | and ~ over a few machine words per
+64 recipes. A list kept sorted by (created_at, insertion order) gives the
+newest-first history order without sorting per query; a page is read off
+it, stopping as soon as the page is full. Selective filters instead sort
+just their few matches.
+"""
+from bisect import bisect_left, insort
+from typing import Dict, Hashable, Iterable, List, Mapping, Optional, Tuple
+
+import numpy as np
+
+
+class RecipePage:
+    """One page of a recipe query: the total match count and (name, recipe) pairs
+
+    The recipes are the stored objects, not copies; treat them as read-only.
+    """
+
+    def __init__(self, total: int, items: List[Tuple[str, Dict]], offset: int = 0, limit: Optional[int] = None):
+        self.total = total
+        self.items = items
+        self.offset = offset
+        self.limit = limit
+
+    def __iter__(self):
+        return iter(self.items)
+
+    def __len__(self):
+        return len(self.items)
+
+    def names(self) -> List[str]:
+        return [name for name, _ in self.items]
+
+
+def _hashable(value) -> bool:
+    """Whether value can key an index"""
+    try:
+        hash(value)
+    except TypeError:
+        return False
+    return True
+
+
+def _bitmap(ids: List[int]) -> int:
+    """Bitmap with the given ids set, built in one pass"""
+    buffer = bytearray((max(ids) >> 3) + 1)
+    for recipe_id in ids:
+        buffer[recipe_id >> 3] |= 1 << (recipe_id & 7)
+    return int.from_bytes(buffer, 'little')
+
+
+def _bit_ids(mask: int) -> List[int]:
+    """Ids set in a bitmap, ascending"""
+    bits = np.frombuffer(mask.to_bytes((mask.bit_length() + 7) // 8, 'little'), dtype=np.uint8)
+    return np.flatnonzero(np.unpackbits(bits, bitorder='little')).tolist()
+
+
+def _created_key(recipe: Dict) -> str:
+    """The value history is ordered by, as get_recipe_history always sorted it"""
+    created_at = recipe.get('created_at', '')
+    return created_at if isinstance(created_at, str) else str(created_at)
+
+
+class RecipeIndex:
+    """Strain, growth phase, tag and created_at indexes for a recipes mapping"""
+
+    def __init__(self, recipes: Optional[Mapping[str, Dict]] = None):
+        self.recipes = recipes if recipes is not None else {}
+        self.ids: Dict[str, int] = {}
+        self.names: List[Optional[str]] = []         # id -> name (None once deleted)
+        self.keys: List[Optional[Tuple]] = []        # id -> its entry in order
+        self.fields: List[Optional[Tuple]] = []      # id -> (strain, growth_phase, tags) as indexed
+        self.live = 0                                # bitmap of ids still present
+        self.by_strain: Dict[Hashable, int] = {}
+        self.by_phase: Dict[Hashable, int] = {}
+        self.by_tag: Dict[Hashable, int] = {}
+        self.order: List[Tuple[str, int, int]] = []  # (created_at, -id, id), ascending
+        self._build()
+
+    def _build(self):
+        """Index every recipe at once; OR-ing bits in one by one would be quadratic"""
+        members: Dict[str, Dict[Hashable, List[int]]] = {'strain': {}, 'phase': {}, 'tag': {}}
+        for recipe_id, (name, recipe) in enumerate(self.recipes.items()):
+            tags = tuple(tag for tag in recipe.get('tags') or () if _hashable(tag))
+            fields = (recipe.get('strain'), recipe.get('growth_phase'), tags)
+            for kind, values in (('strain', fields[:1]), ('phase', fields[1:2]), ('tag', tags)):
+                for value in values:
+                    if value is not None and _hashable(value):
+                        members[kind].setdefault(value, []).append(recipe_id)
+            self.ids[name] = recipe_id
+            self.names.append(name)
+            self.keys.append((_created_key(recipe), -recipe_id, recipe_id))
+            self.fields.append(fields)
+
+        self.by_strain = {value: _bitmap(ids) for value, ids in members['strain'].items()}
+        self.by_phase = {value: _bitmap(ids) for value, ids in members['phase'].items()}
+        self.by_tag = {value: _bitmap(ids) for value, ids in members['tag'].items()}
+        self.order = sorted(self.keys)
+        self.live = (1 << len(self.names)) - 1
+
+    @staticmethod
+    def _add(bitmaps: Dict[Hashable, int], value, bit: int):
+        if value is not None and _hashable(value):
+            bitmaps[value] = bitmaps.get(value, 0) | bit
+
+    @staticmethod
+    def _discard(bitmaps: Dict[Hashable, int], value, bit: int):
+        if value is not None and _hashable(value) and value in bitmaps:
+            remaining = bitmaps[value] & ~bit
+            if remaining:
+                bitmaps[value] = remaining
+            else:
+                del bitmaps[value]
+
+    def _unindex(self, recipe_id: int):
+        """Drop one id from every index"""
+        bit = 1 << recipe_id
+        strain, phase, tags = self.fields[recipe_id]
+        self._discard(self.by_strain, strain, bit)
+        self._discard(self.by_phase, phase, bit)
+        for tag in tags:
+            self._discard(self.by_tag, tag, bit)
+        del self.order[bisect_left(self.order, self.keys[recipe_id])]
+        self.live &= ~bit
+
+    def update(self, name: str):
+        """(Re)index the recipe currently stored under name, or drop it if it is gone"""
+        recipe_id = self.ids.get(name)
+        if recipe_id is not None and self.fields[recipe_id] is not None:
+            self._unindex(recipe_id)
+
+        recipe = self.recipes.get(name)
+        if recipe is None:
+            if recipe_id is not None:
+                del self.ids[name]
+                self.names[recipe_id] = self.keys[recipe_id] = self.fields[recipe_id] = None
+            return
+
+        if recipe_id is None:
+            # A new name goes last, like a new dict key; an updated one keeps its place
+            recipe_id = len(self.names)
+            self.ids[name] = recipe_id
+            self.names.append(name)
+            self.keys.append(None)
+            self.fields.append(None)
+
+        bit = 1 << recipe_id
+        tags = tuple(tag for tag in recipe.get('tags') or () if _hashable(tag))
+        fields = (recipe.get('strain'), recipe.get('growth_phase'), tags)
+        self._add(self.by_strain, fields[0], bit)
+        self._add(self.by_phase, fields[1], bit)
+        for tag in tags:
+            self._add(self.by_tag, tag, bit)
+        key = (_created_key(recipe), -recipe_id, recipe_id)
+        insort(self.order, key)
+        self.keys[recipe_id] = key
+        self.fields[recipe_id] = fields
+        self.live |= bit
+
+    def strains(self) -> List[str]:
+        """Distinct strains, sorted"""
+        return sorted(strain for strain in self.by_strain if isinstance(strain, str))
+
+    def tags(self) -> List:
+        """Distinct tags, sorted"""
+        return sorted(self.by_tag)
+
+    def match(self, strain=None, growth_phase=None, tags: Optional[Iterable] = None,
+              any_tags: Optional[Iterable] = None, exclude_tags: Optional[Iterable] = None) -> int:
+        """Bitmap of recipes with the strain and phase, all of tags, one of any_tags and none of exclude_tags"""
+        mask = self.live
+        if strain:
+            mask &= self.by_strain.get(strain, 0) if _hashable(strain) else 0
+        if growth_phase:
+            mask &= self.by_phase.get(growth_phase, 0) if _hashable(growth_phase) else 0
+        for tag in tags or ():
+            mask &= self.by_tag.get(tag, 0)
+        if any_tags:
+            either = 0
+            for tag in any_tags:
+                either |= self.by_tag.get(tag, 0)
+            mask &= either
+        for tag in exclude_tags or ():
+            mask &= ~self.by_tag.get(tag, 0)
+        return mask
+
+    def page(self, mask: int, offset: int = 0, limit: Optional[int] = None,
+             fields: Optional[Iterable[str]] = None) -> RecipePage:
+        """The matches of mask, newest first, from offset up to limit
+
+        With fields, each recipe is projected onto just those keys.
+        """
+        total = mask.bit_count()
+        end = total if limit is None else min(total, offset + limit)
+        items = []
+        if offset < end:
+            if mask == self.live:
+                # Unfiltered: the page is a slice of the order
+                n = len(self.order)
+                for _, _, recipe_id in reversed(self.order[n - end:n - offset]):
+                    name = self.names[recipe_id]
+                    items.append((name, self.recipes[name]))
+            elif total * total < end * len(self.order):
+                # Few matches: sorting them beats scanning the order until the page fills
+                keys = sorted((self.keys[recipe_id] for recipe_id in _bit_ids(mask)), reverse=True)
+                for _, _, recipe_id in keys[offset:end]:
+                    name = self.names[recipe_id]
+                    items.append((name, self.recipes[name]))
+            else:
+                bits = mask.to_bytes((mask.bit_length() + 7) // 8, 'little')
+                seen = 0
+                for _, _, recipe_id in reversed(self.order):
+                    if recipe_id >> 3 < len(bits) and bits[recipe_id >> 3] >> (recipe_id & 7) & 1:
+                        if seen >= offset:
+                            name = self.names[recipe_id]
+                            items.append((name, self.recipes[name]))
+                            if len(items) == end - offset:
+                                break
+                        seen += 1
+        if fields is not None:
+            items = [(name, {field: recipe.get(field) for field in fields}) for name, recipe in items]
+        return RecipePage(total, items, offset, limit)
+
+    def query(self, strain=None, growth_phase=None, tags=None, any_tags=None, exclude_tags=None,
+              offset: int = 0, limit: Optional[int] = None, fields: Optional[Iterable[str]] = None) -> RecipePage:
+        """Filter and page in one call"""
+        return self.page(self.match(strain, growth_phase, tags, any_tags, exclude_tags), offset, limit, fields)
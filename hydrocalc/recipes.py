@@ -0,0 +1,281 @@
+"""Recipe storage and history, independent of any UI"""
+import json
+import logging
+from datetime import datetime
+from typing import Dict, Optional
+
+from hydrocalc.core import CalculationCore, get_core
+from hydrocalc.instructions import generate_mixing_instructions
+from hydrocalc.model import Recipe
+from hydrocalc.recipe_index import RecipeIndex, RecipePage
+from hydrocalc.store import RecipeStore
+
+logger = logging.getLogger(__name__)
+
+
+class RecipeBook:
+    """Saved recipes with metadata, results and filtered history
+
+    Recipes live in the recipes dict passed in (or a new one), or in a
+    RecipeStore, which persists them and answers the history, strain and
+    tag queries from its indexes. A dict is indexed in memory by a
+    RecipeIndex that the methods here keep up to date; change recipes
+    through them, or call reindex() afterwards. With compact=True the dict
+    holds immutable hydrocalc.model.Recipe objects instead of nested dicts,
+    which take a fraction of the memory; get_recipe still returns a dict.
+    Subclasses that need to persist a plain dict elsewhere, such as the
+    Streamlit session, override _persist(), which runs after every change.
+    """
+
+    def __init__(self, recipes: Optional[Dict] = None, recipe_count: int = 0,
+                 core: Optional[CalculationCore] = None, store: Optional[RecipeStore] = None,
+                 compact: bool = False):
+        self.store = store
+        self.compact = compact and store is None
+        if store is not None:
+            self.recipes = store
+            self.recipe_count = store.counter()
+        else:
+            self.recipes = recipes if recipes is not None else {}
+            self.recipe_count = recipe_count
+            if self.compact:
+                for name, recipe in self.recipes.items():
+                    if not isinstance(recipe, Recipe):
+                        self.recipes[name] = Recipe.from_dict(recipe)
+        self.index = RecipeIndex(self.recipes) if store is None else None
+        self.load_default_nutrient_lines(core)
+
+    def reindex(self, name: Optional[str] = None):
+        """Bring the in-memory index up to date after changing self.recipes directly"""
+        if self.index is None:
+            return
+        if name is None:
+            self.index = RecipeIndex(self.recipes)
+        else:
+            self.index.update(name)
+
+    def _changed(self, name: str):
+        """Index and persist a change to one recipe"""
+        self.reindex(name)
+        self._persist()
+
+    def _persist(self):
+        """Called after every change; recipes are only kept in memory here"""
+
+    def _get(self, name) -> Optional[Dict]:
+        """A recipe in dict form (a copy when stored compactly or in a store)"""
+        recipe = self.recipes.get(name)
+        return recipe.to_dict() if isinstance(recipe, Recipe) else recipe
+
+    def _put(self, name, recipe_data: Dict):
+        """Store a recipe given in dict form"""
+        self.recipes[name] = Recipe.from_dict(recipe_data) if self.compact else recipe_data
+
+    def _next_recipe_id(self) -> int:
+        """Id for the next saved recipe; a store hands out ids unique across sessions"""
+        if self.store is not None:
+            return self.store.next_id()
+        return self.recipe_count + 1
+
+    def load_default_nutrient_lines(self, core: Optional[CalculationCore] = None):
+        """Load nutrient lines including generic options"""
+        # The calculation core and its catalog are built once per process and shared read-only
+        self.core = core or get_core()
+        self.catalog = self.core.catalog
+        self.nutrient_lines = self.catalog.nutrient_lines
+
+    def save_recipe(self, name, recipe_data):
+        """Save a new recipe with validation and mixing instructions"""
+        try:
+            if not name or not recipe_data:
+                raise ValueError("Recipe name and data are required")
+                
+            # Add mixing instructions and metadata
+            recipe_data.update({
+                'created_at': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+                'mixing_instructions': self.generate_mixing_instructions(recipe_data),
+                'recipe_id': self._next_recipe_id()
+            })
+            
+            self._put(name, recipe_data)
+            self.recipe_count = recipe_data['recipe_id']
+            self._changed(name)
+            
+            logger.info(f"Recipe saved successfully: {name}")
+            return True
+        except Exception as e:
+            logger.error(f"Failed to save recipe: {str(e)}")
+            return False
+
+    def generate_mixing_instructions(self, recipe_data):
+        """Generate comprehensive mixing instructions"""
+        return generate_mixing_instructions(recipe_data)
+
+    def get_recipe(self, name):
+        """Get a specific recipe"""
+        return self._get(name)
+
+    def list_recipes(self):
+        """List all saved recipes"""
+        return list(self.recipes.keys())
+
+    def delete_recipe(self, name):
+        """Delete a recipe"""
+        if name in self.recipes:
+            del self.recipes[name]
+            self._changed(name)
+            return True
+        return False
+
+    def get_all_strains(self):
+        """Get list of all strains used in recipes"""
+        try:
+            if self.store is not None:
+                return self.store.strains()
+            return self.index.strains()
+        except Exception as e:
+            logger.error(f"Failed to get strains: {str(e)}")
+            return []
+
+    def get_all_tags(self):
+        """Get list of all tags used in recipes"""
+        try:
+            if self.store is not None:
+                return self.store.tags()
+            return self.index.tags()
+        except Exception as e:
+            logger.error(f"Failed to get tags: {str(e)}")
+            return []
+
+    def find_recipes(self, strain=None, growth_phase=None, tags=None, any_tags=None, exclude_tags=None,
+                     offset=0, limit=None, fields=None) -> RecipePage:
+        """One page of matching recipes, newest first, with the total match count
+
+        Recipes match the strain and phase, all of tags, at least one of
+        any_tags and none of exclude_tags. Items are (name, recipe) pairs;
+        recipes of an in-memory book are not copied, so treat them as read-only
+        (a compact book hands out its immutable Recipe objects).
+        With fields, each recipe is cut down to just those keys.
+        """
+        if self.store is not None:
+            return self.store.page(strain, growth_phase, tags, any_tags, exclude_tags, offset, limit, fields)
+        return self.index.query(strain, growth_phase, tags, any_tags, exclude_tags, offset, limit, fields)
+
+    def get_recipe_history(self, strain=None, growth_phase=None, tags=None, any_tags=None, exclude_tags=None,
+                           offset=0, limit=None):
+        """Get filtered recipe history"""
+        try:
+            if self.store is not None:
+                return self.store.history(strain, growth_phase, tags, any_tags, exclude_tags, offset, limit)
+            history = []
+            for name, recipe in self.index.query(strain, growth_phase, tags, any_tags, exclude_tags, offset, limit):
+                # Add recipe to filtered list with name
+                recipe_copy = recipe.to_dict() if isinstance(recipe, Recipe) else recipe.copy()
+                recipe_copy['name'] = name
+                history.append(recipe_copy)
+            return history
+        except Exception as e:
+            logger.error(f"Failed to get recipe history: {str(e)}")
+            return []
+
+    def save_recipe_with_metadata(self, name, recipe_data, strain=None, tags=None):
+        """Save recipe with additional metadata"""
+        try:
+            if not name or not recipe_data:
+                raise ValueError("Recipe name and data are required")
+            
+            # Add metadata
+            recipe_data.update({
+                'created_at': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+                'recipe_id': self._next_recipe_id(),
+                'strain': strain,
+                'tags': tags or [],
+                'mixing_instructions': self.generate_mixing_instructions(recipe_data),
+                'last_modified': datetime.now().strftime('%Y-%m-%d %H:%M:%S'),
+                'version': 1,
+                'results': []
+            })
+            
+            self._put(name, recipe_data)
+            self.recipe_count = recipe_data['recipe_id']
+            self._changed(name)
+            
+            logger.info(f"Recipe saved successfully: {name}")
+            return True
+        except Exception as e:
+            logger.error(f"Failed to save recipe: {str(e)}")
+            return False
+
+    def add_recipe_result(self, name, result_data):
+        """Add result data to existing recipe"""
+        try:
+            recipe = self._get(name)
+            if recipe is None:
+                raise ValueError(f"Recipe '{name}' not found")
+            
+            result_data['date'] = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+            recipe.setdefault('results', []).append(result_data)
+            self._put(name, recipe)  # a store or compact book hands out copies; write the change back
+            self._changed(name)
+            
+            logger.info(f"Result added to recipe: {name}")
+            return True
+        except Exception as e:
+            logger.error(f"Failed to add recipe result: {str(e)}")
+            return False
+
+    def export_recipe(self, name):
+        """Export recipe as JSON"""
+        try:
+            if name not in self.recipes:
+                raise ValueError(f"Recipe '{name}' not found")
+            
+            recipe_data = self._get(name).copy()
+            recipe_data['exported_at'] = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+            
+            return json.dumps(recipe_data, indent=2)
+        except Exception as e:
+            logger.error(f"Failed to export recipe: {str(e)}")
+            return None
+
+    def import_recipe(self, name, recipe_json):
+        """Import recipe from JSON"""
+        try:
+            recipe_data = json.loads(recipe_json)
+            recipe_data['imported_at'] = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+            recipe_data['version'] = recipe_data.get('version', 1)
+            
+            return self.save_recipe(name, recipe_data)
+        except Exception as e:
+            logger.error(f"Failed to import recipe: {str(e)}")
+            return False
+
+    def duplicate_recipe(self, name, new_name):
+        """Duplicate an existing recipe"""
+        try:
+            if name not in self.recipes:
+                raise ValueError(f"Recipe '{name}' not found")
+            
+            recipe_data = self._get(name).copy()
+            recipe_data['duplicated_from'] = name
+            recipe_data['created_at'] = datetime.now().strftime('%Y-%m-%d %H:%M:%S')
+            recipe_data['version'] = 1
+            recipe_data['results'] = []  # Don't copy results
+            
+            return self.save_recipe(new_name, recipe_data)
+        except Exception as e:
+            logger.error(f"Failed to duplicate recipe: {str(e)}")
+            return False
+
+    def calculate_nutrients(self, size: float, strength: float, selected_nutrients: list, growth_stage: str, strain_info: dict, unit_system: str = 'US'):
+        """Calculate nutrient amounts based on parameters"""
+        return self.core.calculate_nutrients(size, strength, selected_nutrients, growth_stage, unit_system)
+
+    def calculate_nutrients_batch(self, sizes, strengths, growth_stages, selected_nutrients: list, unit_systems='US',
+                                  workers: Optional[int] = None):
+        """Calculate nutrient amounts for many reservoirs at once (see CalculationCore)"""
+        return self.core.calculate_nutrients_batch(sizes, strengths, growth_stages, selected_nutrients, unit_systems, workers)
+
+    def recipes_from_batch(self, doses, selected_nutrients: list):
+        """Expand a DoseTable into calculate_nutrients-style recipe dicts"""
+        return self.core.recipes_from_batch(doses, selected_nutrients)
@@ -0,0 +1,221 @@
+"""Constraint-driven mixing order and multi-station mixing schedules
+
+Products become tasks in a dependency graph built from MIXING_CONSTRAINTS.
+Each task occupies its tank (and a mixing station) for its mix time, and its
+dependents must also wait out its settle time. Tasks are list-scheduled in
+critical-path order: the next task is the ready one that can start
+earliest, ties going to the longest remaining path. The result is always a
+topological order, and settle times are overlapped with work on other
+products or tanks whenever the constraints allow.
+"""
+from typing import Dict, Hashable, List, Mapping, Optional, Sequence, Tuple
+
+# Types that count as base nutrients in constraints ('bases')
+BASE_TYPES = ('micro', 'grow', 'bloom', 'base', 'base_a', 'base_b')
+
+# Types with a fixed place in the order; anything else is one of the 'supplements'
+ORDERED_TYPES = ('silica', 'calmag', 'enzyme') + BASE_TYPES
+
+# (before, after) pairs over types, 'bases', 'supplements' or '*' (any other type)
+MIXING_CONSTRAINTS = (
+    ('silica', '*'),             # silica first
+    ('calmag', 'bases'),         # CalMag before any base
+    ('micro', 'grow'),           # micro -> grow -> bloom
+    ('grow', 'bloom'),
+    ('micro', 'bloom'),
+    ('base_a', 'base_b'),
+    ('bases', 'supplements'),
+    ('*', 'enzyme'),             # enzymes last
+)
+
+# (mix seconds, settle seconds before a dependent addition) per type
+MIX_TIMES = {
+    'silica': (120, 900),
+    'calmag': (60, 300),
+    'micro': (30, 60),
+    'grow': (30, 60),
+    'bloom': (30, 60),
+    'base': (30, 60),
+    'base_a': (30, 300),
+    'base_b': (30, 60),
+    'enzyme': (30, 0)
+}
+DEFAULT_MIX_TIME = (30, 60)
+
+
+def _matches(selector: str, nutrient_type: str, other_type: str) -> bool:
+    """Whether a constraint selector covers a nutrient type"""
+    if selector == '*':
+        return nutrient_type != other_type
+    if selector == 'bases':
+        return nutrient_type in BASE_TYPES
+    if selector == 'supplements':
+        return nutrient_type not in ORDERED_TYPES
+    return nutrient_type == selector
+
+
+def build_graph(types: Sequence[str], constraints=MIXING_CONSTRAINTS) -> List[List[int]]:
+    """Return successor lists for products of the given types
+
+    Raises ValueError when the constraints form a cycle for these products.
+    """
+    successors: List[List[int]] = [[] for _ in types]
+    for i, before in enumerate(types):
+        for j, after in enumerate(types):
+            if i != j and any(
+                _matches(first, before, after) and _matches(second, after, before)
+                for first, second in constraints
+            ):
+                successors[i].append(j)
+
+    # Kahn's algorithm, only to detect cycles
+    indegree = [0] * len(types)
+    for succ in successors:
+        for j in succ:
+            indegree[j] += 1
+    ready = [i for i, degree in enumerate(indegree) if degree == 0]
+    seen = 0
+    while ready:
+        i = ready.pop()
+        seen += 1
+        for j in successors[i]:
+            indegree[j] -= 1
+            if indegree[j] == 0:
+                ready.append(j)
+    if seen != len(types):
+        raise ValueError(f"Mixing constraints form a cycle for types: {sorted(set(types))}")
+    return successors
+
+
+class ScheduledStep:
+    """One product addition placed on a tank and a mixing station"""
+
+    __slots__ = ('product', 'nutrient_type', 'tank', 'station', 'start', 'end', 'ready')
+
+    def __init__(self, product: str, nutrient_type: str, tank: Hashable, station: int,
+                 start: float, end: float, ready: float):
+        self.product = product
+        self.nutrient_type = nutrient_type
+        self.tank = tank
+        self.station = station
+        self.start = start  # seconds from the start of the shift
+        self.end = end      # mixing finished
+        self.ready = ready  # settle time over; dependents may start
+
+    def __repr__(self):
+        return f"ScheduledStep({self.product!r}, tank={self.tank!r}, station={self.station}, {self.start:g}-{self.end:g}s)"
+
+
+class MixSchedule:
+    """Mixing schedule for one or more tanks"""
+
+    def __init__(self, steps: List[ScheduledStep], makespan: float, critical_path: float, stations: int):
+        self.steps = steps                  # in start order
+        self.makespan = makespan            # seconds until the last addition is mixed
+        self.critical_path = critical_path  # lower bound with unlimited stations
+        self.stations = stations
+
+    def order(self, tank: Hashable = 0) -> List[str]:
+        """Products of one tank in the order they are added"""
+        return [step.product for step in self.steps if step.tank == tank]
+
+    def tank_finish(self) -> Dict[Hashable, float]:
+        """Seconds until each tank's last addition is mixed"""
+        finish: Dict[Hashable, float] = {}
+        for step in self.steps:
+            finish[step.tank] = max(finish.get(step.tank, 0.0), step.end)
+        return finish
+
+
+def schedule_mixing(tanks: Mapping[Hashable, Sequence[Tuple[str, str]]], stations: int = 1,
+                    constraints=MIXING_CONSTRAINTS, mix_times: Optional[Mapping] = None) -> MixSchedule:
+    """Schedule every product of every tank across a number of mixing stations
+
+    tanks maps a tank id to its (product, type) pairs. A station mixes one
+    product at a time, a tank takes one addition at a time, and a product
+    waits for its predecessors' mix and settle times.
+    """
+    if stations < 1:
+        raise ValueError(f"stations must be at least 1, got {stations}")
+    mix_times = MIX_TIMES if mix_times is None else mix_times
+
+    # Flatten every tank's graph into one task list
+    names: List[str] = []
+    types: List[str] = []
+    tank_of: List[Hashable] = []
+    successors: List[List[int]] = []
+    for tank, products in tanks.items():
+        offset = len(names)
+        tank_types = [nutrient_type for _, nutrient_type in products]
+        successors.extend([offset + j for j in succ] for succ in build_graph(tank_types, constraints))
+        names.extend(name for name, _ in products)
+        types.extend(tank_types)
+        tank_of.extend([tank] * len(products))
+
+    n = len(names)
+    mix = [float(mix_times.get(t, DEFAULT_MIX_TIME)[0]) for t in types]
+    wait = [float(mix_times.get(t, DEFAULT_MIX_TIME)[1]) for t in types]
+    predecessors: List[List[int]] = [[] for _ in range(n)]
+    for i, succ in enumerate(successors):
+        for j in succ:
+            predecessors[j].append(i)
+
+    # Longest path from each task's start to the end of its tank (its priority)
+    tail = [0.0] * n
+    for i in reversed(_topological(successors, predecessors)):
+        tail[i] = mix[i] + max((wait[i] + tail[j] for j in successors[i]), default=0.0)
+    critical_path = max(tail, default=0.0)
+
+    station_free = [0.0] * stations
+    tank_free: Dict[Hashable, float] = {}
+    ready_at = [0.0] * n
+    remaining = [len(preds) for preds in predecessors]
+    ready = {i for i in range(n) if not remaining[i]}
+    steps: List[ScheduledStep] = []
+
+    while ready:
+        station = min(range(stations), key=station_free.__getitem__)
+        best = min(
+            ready,
+            key=lambda i: (max(ready_at[i], tank_free.get(tank_of[i], 0.0), station_free[station]), -tail[i], i)
+        )
+        start = max(ready_at[best], tank_free.get(tank_of[best], 0.0), station_free[station])
+        end = start + mix[best]
+        station_free[station] = end
+        tank_free[tank_of[best]] = end
+        steps.append(ScheduledStep(names[best], types[best], tank_of[best], station, start, end, end + wait[best]))
+
+        ready.discard(best)
+        for j in successors[best]:
+            ready_at[j] = max(ready_at[j], end + wait[best])
+            remaining[j] -= 1
+            if not remaining[j]:
+                ready.add(j)
+
+    makespan = max((step.end for step in steps), default=0.0)
+    return MixSchedule(steps, makespan, critical_path, stations)
+
+
+def _topological(successors: List[List[int]], predecessors: List[List[int]]) -> List[int]:
+    """Any topological order of the task graph"""
+    remaining = [len(preds) for preds in predecessors]
+    stack = [i for i, count in enumerate(remaining) if not count]
+    order = []
+    while stack:
+        i = stack.pop()
+        order.append(i)
+        for j in successors[i]:
+            remaining[j] -= 1
+            if not remaining[j]:
+                stack.append(j)
+    return order
+
+
+def mixing_sequence(products: Sequence[Tuple[str, str]], constraints=MIXING_CONSTRAINTS) -> List[str]:
+    """Order one tank's (product, type) pairs for a short mixing time
+
+    The order comes from schedule_mixing's critical-path list scheduling, a
+    greedy heuristic: it respects every constraint but is not guaranteed to
+    give the minimum total time.
+    """
+    return schedule_mixing({0: products}, constraints=constraints).order(0)
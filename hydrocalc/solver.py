@@ -0,0 +1,118 @@
+"""Inverse solver: find the nutrient strength that hits a target EC"""
+from typing import Optional, Sequence
+
+import numpy as np
+
+from hydrocalc.catalog import NutrientCatalog
+from hydrocalc.engine import FEEDING_MULTIPLIERS, DoseTable, as_column, calculate_doses, stage_multipliers
+
+# Highest strength the calculator UI offers (percent)
+MAX_STRENGTH_PCT = 150.0
+
+
+def _nnls(A: np.ndarray, b: np.ndarray, tol: float = 1e-10) -> np.ndarray:
+    """Non-negative least squares (Lawson-Hanson) for small systems"""
+    n = A.shape[1]
+    passive = np.zeros(n, dtype=bool)
+    x = np.zeros(n)
+    gradient = A.T @ (b - A @ x)
+
+    for _ in range(3 * n):
+        if passive.all() or not (gradient[~passive] > tol).any():
+            break
+        passive[np.argmax(np.where(passive, -np.inf, gradient))] = True
+
+        while True:
+            z = np.zeros(n)
+            z[passive] = np.linalg.lstsq(A[:, passive], b, rcond=None)[0]
+            if (z[passive] > tol).all():
+                break
+            # Step back to the boundary and drop variables that hit zero
+            blocking = passive & (z <= tol)
+            alpha = np.min(x[blocking] / (x[blocking] - z[blocking]))
+            x = x + alpha * (z - x)
+            passive &= x > tol
+            x[~passive] = 0.0
+        x = z
+        gradient = A.T @ (b - A @ x)
+    return x
+
+
+def ratio_multipliers(catalog: NutrientCatalog, product_ids: np.ndarray,
+                      npk_ratio: Sequence[float]) -> np.ndarray:
+    """Per-product dose multipliers whose combined N-P-K best matches npk_ratio
+
+    Products that carry an N-P-K analysis are weighted by non-negative least
+    squares; products without one keep a multiplier of 1. The largest
+    multiplier is normalized to 1 so strength still means "percent of the
+    strongest product's maximum dose".
+    """
+    ratio = np.asarray(npk_ratio, dtype=float)
+    if ratio.shape != (3,) or (ratio < 0).any() or ratio.sum() == 0:
+        raise ValueError(f"Invalid N-P-K ratio: {npk_ratio}")
+
+    multipliers = np.ones(len(product_ids))
+    with_npk = catalog.has_npk[product_ids]
+    contribution = (catalog.npk[product_ids] * catalog.max_strength[product_ids][:, np.newaxis])[with_npk].T
+    weights = _nnls(contribution / contribution.sum(), ratio / ratio.sum())
+    if not weights.any():
+        raise ValueError(f"N-P-K ratio {npk_ratio} cannot be matched by these products")
+    multipliers[with_npk] = weights / weights.max()
+    return multipliers
+
+
+class ECSolution:
+    """Solved strengths and doses for a batch of reservoirs"""
+
+    def __init__(self, strengths: np.ndarray, achieved_ec: np.ndarray, reachable: np.ndarray,
+                 multipliers: np.ndarray, doses: DoseTable):
+        self.strengths = strengths      # percent, as entered on the strength slider
+        self.achieved_ec = achieved_ec  # mS/cm predicted for the solved strength
+        self.reachable = reachable      # False when the cap or the stage prevents hitting the target
+        self.multipliers = multipliers  # per-product dose multipliers (1.0 without a ratio)
+        self.doses = doses
+
+
+def solve_for_ec(catalog: NutrientCatalog, line: str, target_ec, growth_stages, volumes,
+                 unit_systems='US', feeding_types='Medium Feeders', npk_ratio: Optional[Sequence[float]] = None,
+                 base_ec=0.0, max_strength_pct: float = MAX_STRENGTH_PCT) -> ECSolution:
+    """Solve the strength that reaches target_ec for every reservoir at once
+
+    The solution EC is modelled as the source water EC plus the sum of each
+    product's EC coefficient times its ml/gal dose, which is linear in
+    strength, so each reservoir is solved in closed form. Targets that need
+    more than max_strength_pct are clamped and flagged as unreachable.
+    """
+    volumes = np.atleast_1d(np.asarray(volumes, dtype=float))
+    n = volumes.shape[0]
+    product_ids = catalog.recipe_ids(line)
+
+    multipliers = np.ones(len(product_ids))
+    if npk_ratio is not None:
+        multipliers = ratio_multipliers(catalog, product_ids, npk_ratio)
+    max_strength = catalog.max_strength[product_ids] * multipliers
+
+    feeding = as_column(feeding_types, n, str)
+    feeding_multiplier = np.array([FEEDING_MULTIPLIERS.get(f, 1.0) for f in feeding])
+    stage_multiplier = stage_multipliers(growth_stages, n)
+
+    # EC added per unit of strength (fraction) for each reservoir
+    ec_per_strength = (catalog.ec_coefficient[product_ids] @ max_strength) * stage_multiplier * feeding_multiplier
+    needed_ec = np.maximum(as_column(target_ec, n, float) - as_column(base_ec, n, float), 0.0)
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        strength = np.where(ec_per_strength > 0, needed_ec / ec_per_strength, np.inf) * 100
+    reachable = strength <= max_strength_pct
+    strength = np.where(needed_ec == 0, 0.0, np.minimum(strength, max_strength_pct))
+    reachable |= needed_ec == 0
+    achieved = as_column(base_ec, n, float) + strength / 100 * ec_per_strength
+
+    doses = calculate_doses(
+        max_strength=max_strength,
+        products=[catalog.names[product_id] for product_id in product_ids],
+        volumes=volumes,
+        strengths=strength * feeding_multiplier,
+        stages=growth_stages,
+        unit_systems=unit_systems
+    )
+    return ECSolution(strength, achieved, reachable, multipliers, doses)
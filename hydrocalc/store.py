@@ -0,0 +1,283 @@
+"""SQLite-backed recipe storage shared across sessions and processes
+
+Recipes are kept as JSON documents keyed by name, with the fields the
+history view filters on (strain, growth phase, creation time, tags) copied
+into indexed columns. The database runs in WAL mode, so readers never block
+the single writer, and writers take the write lock up front (BEGIN
+IMMEDIATE) and wait for each other instead of failing. Each thread gets its
+own connection.
+
+    store = RecipeStore('data/recipes.db')
+    book = RecipeBook(store=store)
+"""
+import json
+import logging
+import os
+import sqlite3
+import threading
+from collections.abc import MutableMapping
+from contextlib import contextmanager
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+
+from hydrocalc.recipe_index import RecipePage
+
+logger = logging.getLogger(__name__)
+
+# Where the app keeps its recipes unless HYDROCALC_RECIPE_DB says otherwise
+DEFAULT_DB_PATH = os.path.join('data', 'recipes.db')
+
+# Seconds a writer waits for another writer's transaction before giving up
+BUSY_TIMEOUT = 30.0
+
+# Refresh the query planner's statistics after writing this many recipes at once
+ANALYZE_ROWS = 10_000
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS recipes (
+    name TEXT PRIMARY KEY,
+    strain TEXT,
+    growth_phase TEXT,
+    created_at TEXT NOT NULL DEFAULT '',
+    data TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS recipe_tags (
+    tag TEXT NOT NULL,
+    name TEXT NOT NULL,
+    PRIMARY KEY (tag, name)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS counters (
+    name TEXT PRIMARY KEY,
+    value INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_recipes_strain ON recipes (strain, created_at);
+CREATE INDEX IF NOT EXISTS idx_recipes_growth_phase ON recipes (growth_phase, created_at);
+CREATE INDEX IF NOT EXISTS idx_recipes_created_at ON recipes (created_at);
+CREATE INDEX IF NOT EXISTS idx_recipe_tags_name ON recipe_tags (name);
+"""
+
+
+def _columns(recipe: Dict) -> Tuple[Optional[str], Optional[str], str]:
+    """The indexed (strain, growth_phase, created_at) values of a recipe"""
+    strain = recipe.get('strain')
+    growth_phase = recipe.get('growth_phase')
+    return (
+        strain if isinstance(strain, str) else None,
+        growth_phase if isinstance(growth_phase, str) else None,
+        str(recipe.get('created_at') or '')
+    )
+
+
+def _tags(recipe: Dict) -> List[str]:
+    """The distinct string tags of a recipe"""
+    return sorted({tag for tag in recipe.get('tags') or [] if isinstance(tag, str)})
+
+
+class RecipeStore(MutableMapping):
+    """Recipes by name in a SQLite database, usable wherever a recipes dict is
+
+    Values are decoded copies: changing a returned recipe does not change
+    the store until it is assigned back.
+    """
+
+    def __init__(self, path=DEFAULT_DB_PATH):
+        self.path = str(path)
+        if self.path != ':memory:':
+            Path(self.path).parent.mkdir(parents=True, exist_ok=True)
+        self._local = threading.local()
+        conn = self._connection()
+        conn.executescript(SCHEMA)
+        # Without statistics the planner may pick the growth_phase index over the far more selective strain one
+        has_stats = conn.execute("SELECT 1 FROM sqlite_master WHERE name = 'sqlite_stat1'").fetchone()
+        if not has_stats and len(self) >= ANALYZE_ROWS:
+            self.analyze()
+
+    def _connection(self) -> sqlite3.Connection:
+        """This thread's connection, opened on first use"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=BUSY_TIMEOUT, isolation_level=None)
+            conn.execute('PRAGMA journal_mode=WAL')
+            conn.execute('PRAGMA synchronous=NORMAL')
+            self._local.conn = conn
+        return conn
+
+    @contextmanager
+    def _write(self):
+        """A write transaction that holds the write lock from the start"""
+        conn = self._connection()
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            yield conn
+        except BaseException:
+            conn.execute('ROLLBACK')
+            raise
+        conn.execute('COMMIT')
+
+    def analyze(self):
+        """Refresh the statistics the query planner uses to choose an index"""
+        self._connection().execute('ANALYZE')
+
+    def close(self):
+        """Close this thread's connection"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is not None:
+            conn.execute('PRAGMA optimize')
+            conn.close()
+            self._local.conn = None
+
+    # Mapping interface
+
+    def __getitem__(self, name: str) -> Dict:
+        row = self._connection().execute('SELECT data FROM recipes WHERE name = ?', (name,)).fetchone()
+        if row is None:
+            raise KeyError(name)
+        return json.loads(row[0])
+
+    def __setitem__(self, name: str, recipe: Dict):
+        self.save_many([(name, recipe)])
+
+    def __delitem__(self, name: str):
+        with self._write() as conn:
+            if conn.execute('DELETE FROM recipes WHERE name = ?', (name,)).rowcount == 0:
+                raise KeyError(name)
+            conn.execute('DELETE FROM recipe_tags WHERE name = ?', (name,))
+
+    def __contains__(self, name) -> bool:
+        return self._connection().execute('SELECT 1 FROM recipes WHERE name = ?', (name,)).fetchone() is not None
+
+    def __iter__(self) -> Iterator[str]:
+        # Saving over an existing name keeps its row, so this is dict insertion order
+        return iter([name for name, in self._connection().execute('SELECT name FROM recipes ORDER BY rowid')])
+
+    def __len__(self) -> int:
+        return self._connection().execute('SELECT COUNT(*) FROM recipes').fetchone()[0]
+
+    # Bulk writes and counters
+
+    def save_many(self, items: Iterable[Tuple[str, Dict]]) -> int:
+        """Insert or replace many recipes in one transaction, returning how many were written"""
+        rows = [(name, json.dumps(recipe), _columns(recipe), _tags(recipe)) for name, recipe in items]
+        with self._write() as conn:
+            for name, data, (strain, growth_phase, created_at), tags in rows:
+                conn.execute(
+                    'INSERT INTO recipes (name, strain, growth_phase, created_at, data) VALUES (?, ?, ?, ?, ?) '
+                    'ON CONFLICT (name) DO UPDATE SET strain = excluded.strain, '
+                    'growth_phase = excluded.growth_phase, created_at = excluded.created_at, data = excluded.data',
+                    (name, strain, growth_phase, created_at, data)
+                )
+                conn.execute('DELETE FROM recipe_tags WHERE name = ?', (name,))
+                conn.executemany('INSERT INTO recipe_tags (tag, name) VALUES (?, ?)', [(tag, name) for tag in tags])
+        if len(rows) >= ANALYZE_ROWS:
+            self.analyze()
+        return len(rows)
+
+    def next_id(self, counter: str = 'recipe_id') -> int:
+        """Atomically increment and return a named counter, unique across processes"""
+        with self._write() as conn:
+            conn.execute(
+                'INSERT INTO counters (name, value) VALUES (?, 1) '
+                'ON CONFLICT (name) DO UPDATE SET value = value + 1',
+                (counter,)
+            )
+            return conn.execute('SELECT value FROM counters WHERE name = ?', (counter,)).fetchone()[0]
+
+    def counter(self, counter: str = 'recipe_id') -> int:
+        """Current value of a named counter (0 if never incremented)"""
+        row = self._connection().execute('SELECT value FROM counters WHERE name = ?', (counter,)).fetchone()
+        return row[0] if row else 0
+
+    # Indexed queries
+
+    def strains(self) -> List[str]:
+        """Distinct strains of all recipes, sorted"""
+        return [strain for strain, in self._connection().execute(
+            'SELECT DISTINCT strain FROM recipes WHERE strain IS NOT NULL ORDER BY strain'
+        )]
+
+    def tags(self) -> List[str]:
+        """Distinct tags of all recipes, sorted"""
+        return [tag for tag, in self._connection().execute('SELECT DISTINCT tag FROM recipe_tags ORDER BY tag')]
+
+    @staticmethod
+    def _filters(strain=None, growth_phase=None, tags=None, any_tags=None, exclude_tags=None) -> Tuple[str, List]:
+        """WHERE clause and parameters for a history query"""
+        where = []
+        params: List = []
+        if strain:
+            where.append('strain = ?')
+            params.append(strain)
+        if growth_phase:
+            where.append('growth_phase = ?')
+            params.append(growth_phase)
+        # One primary-key probe per tag, so the strain or created_at index still drives the scan
+        has_tag = 'EXISTS (SELECT 1 FROM recipe_tags WHERE tag = ? AND recipe_tags.name = recipes.name)'
+        for tag in sorted(set(tags or ())):
+            where.append(has_tag)
+            params.append(tag)
+        any_tags = sorted(set(any_tags or ()))
+        if any_tags:
+            where.append('(' + ' OR '.join([has_tag] * len(any_tags)) + ')')
+            params.extend(any_tags)
+        for tag in sorted(set(exclude_tags or ())):
+            where.append('NOT ' + has_tag)
+            params.append(tag)
+        return (' WHERE ' + ' AND '.join(where)) if where else '', params
+
+    def page(self, strain: Optional[str] = None, growth_phase: Optional[str] = None,
+             tags: Optional[Iterable[str]] = None, any_tags: Optional[Iterable[str]] = None,
+             exclude_tags: Optional[Iterable[str]] = None, offset: int = 0,
+             limit: Optional[int] = None, fields: Optional[Iterable[str]] = None) -> RecipePage:
+        """Recipes with the strain and phase, all of tags, one of any_tags and none of exclude_tags
+
+        Newest first, from offset up to limit, with the total number of
+        matches. Empty filters are ignored. With fields, only those keys are
+        extracted from each stored document (in SQLite) and returned.
+        """
+        where, params = self._filters(strain, growth_phase, tags, any_tags, exclude_tags)
+        conn = self._connection()
+        total = conn.execute('SELECT COUNT(*) FROM recipes' + where, params).fetchone()[0]
+        fields = None if fields is None else list(fields)
+        if fields is None:
+            paths = []
+            column = 'data'
+        else:
+            # json_extract with two or more paths returns a JSON array of the values
+            # (null where a key is missing), parsing each document once; unlike the
+            # -> operator (SQLite 3.38+) it works on any build with JSON1
+            paths = [f'$."{field}"' for field in fields]
+            paths += ['$.name'] * (2 - len(paths))
+            column = f"json_extract(data, {', '.join(['?'] * len(paths))})"
+        rows = conn.execute(
+            f'SELECT name, {column} FROM recipes' + where + ' ORDER BY created_at DESC, rowid LIMIT ? OFFSET ?',
+            paths + params + [-1 if limit is None else limit, offset]
+        )
+        if fields is None:
+            items = [(name, json.loads(data)) for name, data in rows]
+        else:
+            items = [(name, dict(zip(fields, json.loads(values)))) for name, values in rows]
+        return RecipePage(total, items, offset, limit)
+
+    def history(self, strain: Optional[str] = None, growth_phase: Optional[str] = None,
+                tags: Optional[Iterable[str]] = None, any_tags: Optional[Iterable[str]] = None,
+                exclude_tags: Optional[Iterable[str]] = None, offset: int = 0,
+                limit: Optional[int] = None) -> List[Dict]:
+        """Matching recipes as in page(), each with its 'name' added"""
+        where, params = self._filters(strain, growth_phase, tags, any_tags, exclude_tags)
+        rows = self._connection().execute(
+            'SELECT name, data FROM recipes' + where + ' ORDER BY created_at DESC, rowid LIMIT ? OFFSET ?',
+            params + [-1 if limit is None else limit, offset]
+        )
+        history = []
+        for name, data in rows:
+            recipe = json.loads(data)
+            recipe['name'] = name
+            history.append(recipe)
+        return history
+
+
+@lru_cache(maxsize=None)
+def get_recipe_store(path: Optional[str] = None) -> RecipeStore:
+    """The process-wide store at path (default: $HYDROCALC_RECIPE_DB or data/recipes.db)"""
+    return RecipeStore(path or os.environ.get('HYDROCALC_RECIPE_DB', DEFAULT_DB_PATH))
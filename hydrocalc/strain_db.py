@@ -0,0 +1,353 @@
+"""Memory-mapped binary strain database, shared read-only between processes
+
+The library is written once to a single file and opened with mmap, so every
+worker maps the same pages from the OS page cache instead of holding its own
+copy of the strains as Python dicts. The file holds:
+
+- a header (magic, version and a JSON table of contents),
+- an interned string table (offsets + UTF-8 data) for names and attribute values,
+- fixed-width columns: name string ids, ids sorted by name, attribute value
+  numbers with the ids of each value, low/high float64 columns per range,
+  and the name search index (normalized names, sorted keys, trigram postings),
+- an offset index into the records, each the strain's compact JSON.
+
+Numeric columns are used in place as numpy arrays over the mapping. A record
+becomes a dict only when it is looked up, e.g. for display_strain_info, so
+memory per worker does not grow with the library.
+
+    write_strain_db(load_strain_directory('chunks/strains'), 'data/strains.hcdb')
+    library = StrainLibrary(StrainDB('data/strains.hcdb'))
+"""
+import json
+import logging
+import mmap
+import os
+import struct
+from bisect import bisect_left
+from collections.abc import Mapping, Sequence
+from functools import lru_cache
+from typing import Dict, Iterator, List, Optional, Tuple
+
+import numpy as np
+
+from hydrocalc.parsing import parse_strain_library
+from hydrocalc.strain_index import StrainAttributeIndex, StrainRangeIndex
+from hydrocalc.strain_search import StrainSearchIndex
+
+logger = logging.getLogger(__name__)
+
+# Where the app looks for a strain database unless HYDROCALC_STRAIN_DB says otherwise
+DEFAULT_STRAIN_DB_PATH = os.path.join('data', 'strains.hcdb')
+
+MAGIC = b'HCSTRDB\0'
+FORMAT_VERSION = 1
+
+_ALIGN = 8
+
+
+def _aligned(size: int) -> int:
+    return -(-size // _ALIGN) * _ALIGN
+
+
+class _Strings:
+    """Interned string table being built: each distinct string is stored once"""
+
+    def __init__(self):
+        self.ids: Dict[str, int] = {}
+
+    def add(self, text: str) -> int:
+        return self.ids.setdefault(text, len(self.ids))
+
+    def sections(self) -> Dict[str, np.ndarray]:
+        data = [text.encode('utf-8') for text in self.ids]
+        offsets = np.zeros(len(data) + 1, dtype='<u8')
+        np.cumsum([len(item) for item in data], out=offsets[1:])
+        return {'string_offsets': offsets, 'string_data': np.frombuffer(b''.join(data), dtype=np.uint8)}
+
+
+def write_strain_db(strains: Mapping, path) -> int:
+    """Write strains (name -> strain dict) to a database file, returning how many were written
+
+    The file is replaced in one step, so open readers keep their old mapping.
+    """
+    names = list(strains)
+    records = [strains[name] for name in names]
+    parsed = parse_strain_library(dict(zip(names, records)))
+    ranges = StrainRangeIndex([parsed[name] for name in names])
+    attributes = StrainAttributeIndex(records)
+    strings = _Strings()
+
+    sections: Dict[str, np.ndarray] = {
+        'name': np.array([strings.add(str(name)) for name in names], dtype='<u4'),
+        'by_name': np.array(sorted(range(len(names)), key=lambda i: str(names[i])), dtype='<u4')
+    }
+    attribute_values = {}
+    for attribute, by_value in attributes.ids.items():
+        attribute_values[attribute] = [strings.add(str(value)) for value in by_value]
+        sections[f'code.{attribute}'] = attributes.codes[attribute].astype('<i4')
+        ids = list(by_value.values())
+        sections[f'ids.{attribute}'] = (np.concatenate(ids) if ids else np.empty(0)).astype('<i8')
+    for key in ranges.keys():
+        sections[f'low.{key}'] = ranges.low[key].astype('<f8')
+        sections[f'high.{key}'] = ranges.high[key].astype('<f8')
+
+    search = StrainSearchIndex(str(name) for name in names)
+    sections['search.normalized'] = np.array([strings.add(text) for text in search.normalized], dtype='<u4')
+    for column, array in search.columns().items():
+        sections[f'search.{column}'] = array.astype('<i4')
+    postings = search.postings()
+    grams = sorted(postings)
+    gram_offsets = np.zeros(len(grams) + 1, dtype='<u8')
+    np.cumsum([len(postings[gram]) for gram in grams], out=gram_offsets[1:])
+    sections['gram_strings'] = np.array([strings.add(gram) for gram in grams], dtype='<u4')
+    sections['gram_offsets'] = gram_offsets
+    sections['gram_ids'] = (np.concatenate([postings[gram] for gram in grams]) if grams else np.empty(0)).astype('<i4')
+
+    encoded = [json.dumps(record, separators=(',', ':')).encode('utf-8') for record in records]
+    record_offsets = np.zeros(len(encoded) + 1, dtype='<u8')
+    np.cumsum([len(item) for item in encoded], out=record_offsets[1:])
+    sections['record_offsets'] = record_offsets
+    sections['records'] = np.frombuffer(b''.join(encoded), dtype=np.uint8)
+    sections.update(strings.sections())
+
+    # Table of contents: section -> (offset from the end of the header, dtype, item count)
+    contents = {}
+    position = 0
+    for name, array in sections.items():
+        contents[name] = (position, array.dtype.str, len(array))
+        position = _aligned(position + array.nbytes)
+    header = json.dumps({
+        'version': FORMAT_VERSION,
+        'count': len(names),
+        'range_keys': ranges.keys(),
+        'attributes': attribute_values,
+        'sections': contents
+    }).encode('utf-8')
+
+    path = str(path)
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    temp_path = f'{path}.{os.getpid()}.tmp'
+    with open(temp_path, 'wb') as f:
+        preamble = MAGIC + struct.pack('<I', len(header)) + header
+        f.write(preamble + b'\0' * (_aligned(len(preamble)) - len(preamble)))
+        for name, array in sections.items():
+            f.write(array.tobytes())
+            f.write(b'\0' * (_aligned(array.nbytes) - array.nbytes))
+    os.replace(temp_path, path)
+    return len(names)
+
+
+class StrainDB(Mapping):
+    """A strain database file mapped read-only: strain dicts by name, decoded on access"""
+
+    def __init__(self, path=DEFAULT_STRAIN_DB_PATH):
+        self.path = str(path)
+        with open(self.path, 'rb') as f:
+            self._mmap = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        if self._mmap[:len(MAGIC)] != MAGIC:
+            raise ValueError(f"{self.path} is not a strain database")
+        (header_size,) = struct.unpack_from('<I', self._mmap, len(MAGIC))
+        start = len(MAGIC) + 4
+        header = json.loads(self._mmap[start:start + header_size])
+        if header.get('version') != FORMAT_VERSION:
+            raise ValueError(f"{self.path} has strain database version {header.get('version')}, "
+                             f"expected {FORMAT_VERSION}")
+        data_start = _aligned(start + header_size)
+        self._columns = {
+            name: np.frombuffer(self._mmap, dtype=np.dtype(dtype), count=count, offset=data_start + offset)
+            for name, (offset, dtype, count) in header['sections'].items()
+        }
+        self._starts = {name: data_start + offset for name, (offset, _, _) in header['sections'].items()}
+        self.count = header['count']
+        self.range_keys: List[str] = header['range_keys']
+        self._attribute_values: Dict[str, List[int]] = header['attributes']
+
+    def close(self):
+        """Drop the column views and unmap the file"""
+        self._columns = {}
+        try:
+            self._mmap.close()
+        except BufferError:
+            pass  # arrays handed out are still alive; the mapping closes when they are collected
+
+    def _bytes(self, data: str, offsets: str, index: int) -> bytes:
+        """Item index of a variable-length section, sliced straight from the mapping"""
+        bounds = self._columns[offsets]
+        start = self._starts[data]
+        return self._mmap[start + int(bounds[index]):start + int(bounds[index + 1])]
+
+    def string(self, string_id: int) -> str:
+        """One entry of the string table"""
+        return self._bytes('string_data', 'string_offsets', string_id).decode('utf-8')
+
+    def name(self, strain_id: int) -> str:
+        return self.string(self._columns['name'][strain_id])
+
+    def names(self) -> List[str]:
+        """Every strain name, in id order"""
+        return [self.string(string_id) for string_id in self._columns['name'].tolist()]
+
+    def find(self, name: str) -> Optional[int]:
+        """Id of the strain called name (binary search over the name order), or None"""
+        by_name = self._columns['by_name']
+        low, high = 0, len(by_name)
+        while low < high:
+            middle = (low + high) // 2
+            if self.name(by_name[middle]) < name:
+                low = middle + 1
+            else:
+                high = middle
+        if low < len(by_name) and self.name(by_name[low]) == name:
+            return int(by_name[low])
+        return None
+
+    def record(self, strain_id: int) -> Dict:
+        """One strain as a fresh dict"""
+        if not 0 <= strain_id < self.count:
+            raise IndexError(strain_id)
+        return json.loads(self._bytes('records', 'record_offsets', strain_id))
+
+    def records(self) -> 'StrainRecords':
+        """Every strain as a sequence in id order, decoded item by item"""
+        return StrainRecords(self)
+
+    # Mapping interface
+
+    def __getitem__(self, name: str) -> Dict:
+        strain_id = self.find(name) if isinstance(name, str) else None
+        if strain_id is None:
+            raise KeyError(name)
+        return self.record(strain_id)
+
+    def __contains__(self, name) -> bool:
+        return isinstance(name, str) and self.find(name) is not None
+
+    def __iter__(self) -> Iterator[str]:
+        return (self.name(strain_id) for strain_id in range(self.count))
+
+    def __len__(self) -> int:
+        return self.count
+
+    # Indexes over the mapped columns
+
+    def attribute_index(self) -> StrainAttributeIndex:
+        """Attribute index whose arrays are views of the file"""
+        codes = {}
+        ids = {}
+        for attribute, value_ids in self._attribute_values.items():
+            codes[attribute] = self._columns[f'code.{attribute}']
+            grouped = self._columns[f'ids.{attribute}']
+            bounds = np.searchsorted(codes[attribute][grouped], np.arange(len(value_ids) + 1)).tolist()
+            ids[attribute] = {
+                self.string(string_id): grouped[bounds[number]:bounds[number + 1]]
+                for number, string_id in enumerate(value_ids)
+            }
+        return StrainAttributeIndex.from_columns(codes, ids)
+
+    def range_index(self) -> StrainRangeIndex:
+        """Range index whose columns are views of the file"""
+        return StrainRangeIndex.from_columns(
+            {key: self._columns[f'low.{key}'] for key in self.range_keys},
+            {key: self._columns[f'high.{key}'] for key in self.range_keys}
+        )
+
+    def search_index(self) -> StrainSearchIndex:
+        """Name search index whose keys and postings are read from the file"""
+        columns = {
+            column: self._columns[f'search.{column}']
+            for column in ('name_ids', 'word_ids', 'word_starts', 'rank', 'gram_counts')
+        }
+        normalized = _StringColumn(self, self._columns['search.normalized'])
+        return StrainSearchIndex.from_columns(normalized, _Postings(self), columns)
+
+    def strain_ranges(self) -> 'StrainRanges':
+        """Parsed ranges by strain name, read from the range columns on access"""
+        return StrainRanges(self, self.range_index())
+
+
+class StrainRecords(Sequence):
+    """The strains of a StrainDB by id; indexing decodes just the requested records"""
+
+    def __init__(self, db: StrainDB):
+        self.db = db
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self.db.record(strain_id) for strain_id in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        return self.db.record(index)
+
+    def __len__(self) -> int:
+        return self.db.count
+
+
+class _StringColumn(Sequence):
+    """A column of string ids read as the strings"""
+
+    def __init__(self, db: StrainDB, string_ids: np.ndarray):
+        self.db = db
+        self.string_ids = string_ids
+
+    def __getitem__(self, index: int) -> str:
+        return self.db.string(self.string_ids[index])
+
+    def __len__(self) -> int:
+        return len(self.string_ids)
+
+
+class _Postings(Mapping):
+    """Trigram -> ids of the names holding it, found by binary search over the sorted trigrams"""
+
+    def __init__(self, db: StrainDB):
+        self.db = db
+        self.grams = _StringColumn(db, db._columns['gram_strings'])
+        self.offsets = db._columns['gram_offsets']
+        self.ids = db._columns['gram_ids']
+
+    def __getitem__(self, gram: str) -> np.ndarray:
+        position = bisect_left(self.grams, gram)
+        if position == len(self.grams) or self.grams[position] != gram:
+            raise KeyError(gram)
+        return self.ids[int(self.offsets[position]):int(self.offsets[position + 1])]
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.grams)
+
+    def __len__(self) -> int:
+        return len(self.grams)
+
+
+class StrainRanges(Mapping):
+    """Strain name -> ranges in parse_strain's form, read from range columns"""
+
+    def __init__(self, db: StrainDB, ranges: StrainRangeIndex):
+        self.db = db
+        self.ranges = ranges
+
+    def __getitem__(self, name: str) -> Dict[str, Optional[Tuple[float, float]]]:
+        strain_id = self.db.find(name) if isinstance(name, str) else None
+        if strain_id is None:
+            raise KeyError(name)
+        return self.ranges.row(strain_id)
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.db)
+
+    def __len__(self) -> int:
+        return len(self.db)
+
+
+@lru_cache(maxsize=None)
+def get_strain_db(path: Optional[str] = None) -> Optional[StrainDB]:
+    """The process-wide strain database ($HYDROCALC_STRAIN_DB or data/strains.hcdb), or None if not built"""
+    path = path or os.environ.get('HYDROCALC_STRAIN_DB', DEFAULT_STRAIN_DB_PATH)
+    if not os.path.exists(path):
+        return None
+    try:
+        return StrainDB(path)
+    except (OSError, ValueError) as e:
+        logger.error(f"Failed to open strain database {path}: {str(e)}")
+        return None
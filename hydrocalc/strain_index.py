@@ -0,0 +1,245 @@
+"""Attribute indexes over a strain library, built once at load
+
+Each indexed attribute maps its values to a sorted array of strain ids
+(positions in the library's strain list). Picking a random strain of a
+category is one array lookup and one random index. Each attribute also has
+a column of value numbers per strain, so a filter takes the ids of its most
+selective value and checks them against the other columns: the cost depends
+on the number of matches rather than on the size of the library.
+
+Numeric ranges (THC, CBD, flowering weeks, pH and EC per stage) are kept as
+pairs of float columns, low and high, so a range query is a few vectorized
+comparisons over the whole library:
+
+    ranges.match(('thc', '>=', 20), ('flowering_weeks', '<=', 9),
+                 ('ec.mid_flower', 'overlaps', (1.6, 1.8)))
+"""
+import random
+from typing import Dict, Hashable, Iterable, List, Mapping, Optional, Sequence, Tuple
+
+import numpy as np
+
+# Indexed attribute -> dotted path of the strain field it is read from
+ATTRIBUTE_FIELDS = {
+    'category': 'category',
+    'difficulty': 'difficulty',
+    'nutrient_sensitivity': 'nutrient_sensitivity',
+    'feeding_veg': 'feeding_schedule.veg',
+    'feeding_flower': 'feeding_schedule.flower'
+}
+
+# Random draws checked against the other filters before falling back to listing every match
+RANDOM_TRIES = 32
+
+_NO_IDS = np.empty(0, dtype=np.int64)
+
+
+def _field(strain: Dict, path: Sequence[str]):
+    """A strain field by path, e.g. ('feeding_schedule', 'veg'), or None when any part is missing"""
+    value = strain
+    for part in path:
+        if not isinstance(value, dict):
+            return None
+        value = value.get(part)
+    return value
+
+
+class StrainAttributeIndex:
+    """Strain ids by category, difficulty, nutrient sensitivity and feeding level"""
+
+    def __init__(self, strains: Sequence[Dict], fields: Optional[Dict[str, str]] = None):
+        self.fields = dict(ATTRIBUTE_FIELDS if fields is None else fields)
+        self.size = len(strains)
+        members: Dict[str, Dict[Hashable, List[int]]] = {attribute: {} for attribute in self.fields}
+        paths = [(attribute, tuple(path.split('.'))) for attribute, path in self.fields.items()]
+        for strain_id, strain in enumerate(strains):
+            for attribute, path in paths:
+                value = _field(strain, path)
+                if value is not None and isinstance(value, Hashable):
+                    members[attribute].setdefault(value, []).append(strain_id)
+        self.ids: Dict[str, Dict[Hashable, np.ndarray]] = {}
+        self.codes: Dict[str, np.ndarray] = {}  # attribute -> value number per strain (-1: none)
+        self._numbers: Dict[str, Dict[Hashable, int]] = {}
+        for attribute, values in members.items():
+            self.ids[attribute] = {value: np.array(ids, dtype=np.int64) for value, ids in values.items()}
+            self._numbers[attribute] = {value: number for number, value in enumerate(values)}
+            codes = np.full(self.size, -1, dtype=np.int32)
+            for number, ids in enumerate(self.ids[attribute].values()):
+                codes[ids] = number
+            self.codes[attribute] = codes
+
+    @classmethod
+    def from_columns(cls, codes: Dict[str, np.ndarray], ids: Dict[str, Dict[Hashable, np.ndarray]]) -> 'StrainAttributeIndex':
+        """An index over prebuilt columns, e.g. arrays mapped from a strain database file
+
+        codes maps each attribute to its value number per strain (-1: none)
+        and ids maps it to the sorted ids per value, values in number order.
+        """
+        index = cls.__new__(cls)
+        index.fields = {attribute: attribute for attribute in codes}
+        index.size = len(next(iter(codes.values()))) if codes else 0
+        index.codes = dict(codes)
+        index.ids = {attribute: dict(by_value) for attribute, by_value in ids.items()}
+        index._numbers = {attribute: {value: number for number, value in enumerate(by_value)}
+                          for attribute, by_value in ids.items()}
+        return index
+
+    def values(self, attribute: str) -> List:
+        """Distinct values of an attribute, sorted"""
+        return sorted(self.ids[attribute], key=str)
+
+    def counts(self, attribute: str) -> Dict:
+        """Number of strains per value of an attribute"""
+        return {value: len(ids) for value, ids in self.ids[attribute].items()}
+
+    @staticmethod
+    def _wanted(wanted) -> list:
+        """A filter value as a list: a list, tuple or set means any of its values"""
+        return list(wanted) if isinstance(wanted, (list, tuple, set, frozenset)) else [wanted]
+
+    def _ids_for(self, attribute: str, wanted) -> np.ndarray:
+        """Sorted ids with any of the wanted values"""
+        by_value = self.ids[attribute]
+        arrays = [by_value[value] for value in wanted if value in by_value]
+        if not arrays:
+            return _NO_IDS
+        return arrays[0] if len(arrays) == 1 else np.unique(np.concatenate(arrays))
+
+    def _filters(self, attributes: Dict) -> List:
+        """(attribute, wanted values, value numbers) per filter, fewest matching strains first"""
+        filters = []
+        for attribute, wanted in attributes.items():
+            if attribute not in self.ids:
+                raise ValueError(f"Unknown strain attribute: {attribute!r}")
+            wanted = self._wanted(wanted)
+            numbers = [self._numbers[attribute][value] for value in wanted if value in self._numbers[attribute]]
+            count = sum(len(self.ids[attribute][value]) for value in wanted if value in self.ids[attribute])
+            filters.append((count, attribute, wanted, numbers))
+        filters.sort(key=lambda entry: entry[0])
+        return [entry[1:] for entry in filters]
+
+    def _accepts(self, ids: np.ndarray, attribute: str, numbers: List[int]) -> np.ndarray:
+        """Mask of the ids whose value of attribute is one of numbers"""
+        codes = self.codes[attribute][ids]
+        return codes == numbers[0] if len(numbers) == 1 else np.isin(codes, numbers)
+
+    def match(self, **attributes) -> np.ndarray:
+        """Sorted ids of the strains with every given attribute value
+
+        match(category='Hybrid', difficulty=['Easy', 'Moderate'])
+
+        The most selective filter's ids are checked against the others'
+        value columns, so the cost follows that filter's match count.
+        """
+        if not attributes:
+            return np.arange(self.size, dtype=np.int64)
+        (attribute, wanted, _), *others = self._filters(attributes)
+        ids = self._ids_for(attribute, wanted)
+        for attribute, _, numbers in others:
+            if not len(ids):
+                break
+            ids = ids[self._accepts(ids, attribute, numbers)] if numbers else _NO_IDS
+        return ids
+
+    def random_id(self, rng: Optional[random.Random] = None, **attributes) -> Optional[int]:
+        """A random strain id with the given attribute values, or None if there is none
+
+        With a single value this is one array lookup. With more filters,
+        candidates are drawn from the most selective one and checked
+        against the rest, falling back to match() only when few qualify.
+        """
+        rng = rng or random
+        if not attributes:
+            return rng.randrange(self.size) if self.size else None
+        (attribute, wanted, _), *others = self._filters(attributes)
+        candidates = self._ids_for(attribute, wanted)
+        if not len(candidates):
+            return None
+        for _ in range(RANDOM_TRIES):
+            strain_id = int(candidates[rng.randrange(len(candidates))])
+            if all(self.codes[other][strain_id] in numbers for other, _, numbers in others):
+                return strain_id
+        ids = self.match(**attributes)
+        return int(ids[rng.randrange(len(ids))]) if len(ids) else None
+
+
+# Range operators: a strain's (low, high) range against a number or an (a, b) interval
+RANGE_OPERATORS = {
+    '>=': lambda low, high, x: low >= x,                  # the whole range is at least x
+    '<=': lambda low, high, x: high <= x,                 # the whole range is at most x
+    'overlaps': lambda low, high, ab: (low <= ab[1]) & (high >= ab[0]),
+    'within': lambda low, high, ab: (low >= ab[0]) & (high <= ab[1]),
+    'contains': lambda low, high, ab: (low <= ab[0]) & (high >= ab[1])
+}
+
+
+class StrainRangeIndex:
+    """Parsed numeric ranges of every strain as low/high float columns
+
+    Columns are keyed like parse_strain's ranges: 'thc', 'cbd',
+    'flowering_weeks', 'ph' and 'ec.<stage>'. Missing or malformed ranges
+    are NaN and never match.
+    """
+
+    def __init__(self, ranges: Sequence[Mapping[str, Optional[Tuple[float, float]]]]):
+        self.size = len(ranges)
+        keys = list(dict.fromkeys(key for strain_ranges in ranges for key in strain_ranges))
+        self.low: Dict[str, np.ndarray] = {key: np.full(self.size, np.nan) for key in keys}
+        self.high: Dict[str, np.ndarray] = {key: np.full(self.size, np.nan) for key in keys}
+        for strain_id, strain_ranges in enumerate(ranges):
+            for key, value in strain_ranges.items():
+                if value is not None:
+                    self.low[key][strain_id], self.high[key][strain_id] = value
+
+    @classmethod
+    def from_columns(cls, low: Dict[str, np.ndarray], high: Dict[str, np.ndarray]) -> 'StrainRangeIndex':
+        """An index over prebuilt low/high columns, e.g. arrays mapped from a strain database file"""
+        index = cls.__new__(cls)
+        index.low = dict(low)
+        index.high = dict(high)
+        index.size = len(next(iter(low.values()))) if low else 0
+        return index
+
+    def keys(self) -> List[str]:
+        """Range keys that can be queried"""
+        return list(self.low)
+
+    def row(self, strain_id: int) -> Dict[str, Optional[Tuple[float, float]]]:
+        """One strain's ranges in parse_strain's form"""
+        ranges = {}
+        for key in self.low:
+            low, high = self.low[key][strain_id], self.high[key][strain_id]
+            ranges[key] = None if np.isnan(low) else (float(low), float(high))
+        return ranges
+
+    def condition(self, key: str, operator: str, value) -> np.ndarray:
+        """Boolean mask of the strains whose key range satisfies operator against value
+
+        '>=' and '<=' take a number and test the whole range; 'overlaps',
+        'within' and 'contains' take a (low, high) interval.
+        """
+        if key not in self.low:
+            raise ValueError(f"Unknown strain range {key!r}; expected one of {self.keys()}")
+        test = RANGE_OPERATORS.get(operator)
+        if test is None:
+            raise ValueError(f"Unknown range operator {operator!r}; expected one of {list(RANGE_OPERATORS)}")
+        if operator in ('>=', '<='):
+            value = float(value)
+        else:
+            value = tuple(float(bound) for bound in value)
+            if len(value) != 2 or value[0] > value[1]:
+                raise ValueError(f"{operator} needs a (low, high) interval, got {value!r}")
+        return test(self.low[key], self.high[key], value)
+
+    def mask(self, conditions: Iterable[Tuple[str, str, object]]) -> np.ndarray:
+        """Boolean mask of the strains meeting every (key, operator, value) condition"""
+        mask = np.ones(self.size, dtype=bool)
+        for key, operator, value in conditions:
+            mask &= self.condition(key, operator, value)
+        return mask
+
+    def match(self, *conditions: Tuple[str, str, object], ids: Optional[np.ndarray] = None) -> np.ndarray:
+        """Sorted ids of the strains meeting every condition, optionally only among ids"""
+        if ids is None:
+            return np.flatnonzero(self.mask(conditions))
+        return ids[self.mask(conditions)[ids]]
@@ -0,0 +1,147 @@
+"""Load a directory of per-strain JSON files through a consolidated pack file
+
+Reading tens of thousands of small files one by one dominates startup, so
+the parsed strains are also written to a single pack file, versioned and
+keyed by source file with its size, mtime and SHA-1. On later starts a
+directory listing is compared with the pack: files whose size and mtime
+match are taken from the pack, files that only look changed are re-hashed
+and kept if their contents are the same, and only new or edited files are
+read and parsed, on a thread pool. The pack is rewritten (atomically) only
+when something changed.
+
+    strains = load_strain_directory('chunks/strains', 'data/strains_db.json')
+    library = StrainLibrary(strains)
+"""
+import hashlib
+import json
+import logging
+import os
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from typing import Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_STRAIN_DIR = os.path.join('chunks', 'strains')
+
+# The Dockerfile creates this path; an empty or outdated pack is simply rebuilt
+DEFAULT_PACK_PATH = os.path.join('data', 'strains_db.json')
+
+# Bump when the pack layout or the way strains are read changes
+PACK_VERSION = 1
+
+
+def _scan(directory: str) -> Dict[str, Tuple[int, int]]:
+    """(size, mtime_ns) of every .json file in directory, by file name"""
+    files = {}
+    with os.scandir(directory) as entries:
+        for entry in entries:
+            if entry.name.endswith('.json') and entry.is_file():
+                stat = entry.stat()
+                files[entry.name] = (stat.st_size, stat.st_mtime_ns)
+    return files
+
+
+def _read_pack(pack_path: str) -> Dict[str, Dict]:
+    """Entries of an existing pack by file name, or {} when it is missing, empty or outdated"""
+    try:
+        with open(pack_path, 'rb') as f:
+            data = f.read()
+        if not data:
+            return {}
+        pack = json.loads(data)
+        if pack.get('version') != PACK_VERSION:
+            logger.info(f"Ignoring strain pack {pack_path} with version {pack.get('version')}")
+            return {}
+        return pack['files']
+    except FileNotFoundError:
+        return {}
+    except Exception as e:
+        logger.warning(f"Ignoring unreadable strain pack {pack_path}: {str(e)}")
+        return {}
+
+
+def _write_pack(pack_path: str, entries: Dict[str, Dict]):
+    """Replace the pack in one step, so readers never see a partial file"""
+    directory = os.path.dirname(pack_path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    temp_path = f'{pack_path}.{os.getpid()}.tmp'
+    # dumps() runs the C encoder; dump() to a file would encode in Python, piece by piece
+    data = json.dumps({'version': PACK_VERSION, 'files': entries}, separators=(',', ':'))
+    with open(temp_path, 'w') as f:
+        f.write(data)
+    os.replace(temp_path, pack_path)
+
+
+def _load_file(directory: str, name: str, stat: Tuple[int, int], cached: Optional[Dict]) -> Dict:
+    """Pack entry for one strain file, reusing cached when its contents are unchanged
+
+    An unreadable file gets an entry without a strain, so it is skipped
+    without being re-read until it changes.
+    """
+    size, mtime_ns = stat
+    try:
+        with open(os.path.join(directory, name), 'rb') as f:
+            data = f.read()
+    except OSError as e:
+        logger.warning(f"Skipping strain file {name}: {str(e)}")
+        return {'size': size, 'mtime_ns': mtime_ns, 'sha1': None, 'strain': None}
+    digest = hashlib.sha1(data).hexdigest()
+    if cached is not None and cached.get('sha1') == digest:
+        return dict(cached, size=size, mtime_ns=mtime_ns)
+    try:
+        strain = json.loads(data)
+        if not isinstance(strain, dict):
+            raise ValueError("expected a JSON object")
+    except ValueError as e:
+        logger.warning(f"Skipping strain file {name}: {str(e)}")
+        strain = None
+    return {'size': size, 'mtime_ns': mtime_ns, 'sha1': digest, 'strain': strain}
+
+
+def load_strain_directory(directory=DEFAULT_STRAIN_DIR, pack_path=DEFAULT_PACK_PATH,
+                          workers: Optional[int] = None) -> Dict[str, Dict]:
+    """Strains by name from every .json file in directory, in file name order
+
+    Unchanged files come from the pack at pack_path (None disables the
+    pack); the rest are read on a pool of workers threads. A strain
+    without a 'name' is keyed by its file name without .json.
+    """
+    directory = str(directory)
+    files = _scan(directory)
+    cached = _read_pack(str(pack_path)) if pack_path else {}
+
+    entries: Dict[str, Dict] = {}
+    stale: List[str] = []
+    for name, stat in files.items():
+        entry = cached.get(name)
+        if entry is not None and (entry.get('size'), entry.get('mtime_ns')) == stat:
+            entries[name] = entry
+        else:
+            stale.append(name)
+
+    if stale:
+        with ThreadPoolExecutor(max_workers=workers, thread_name_prefix='strain-loader') as executor:
+            loaded = executor.map(lambda name: _load_file(directory, name, files[name], cached.get(name)), stale)
+            entries.update(zip(stale, loaded))
+
+    if pack_path and (stale or len(entries) != len(cached)):
+        try:
+            _write_pack(str(pack_path), {name: entries[name] for name in sorted(entries)})
+            logger.info(f"Wrote strain pack {pack_path}: {len(entries)} files, {len(stale)} re-read")
+        except OSError as e:
+            logger.warning(f"Failed to write strain pack {pack_path}: {str(e)}")
+
+    strains = {}
+    for name in sorted(entries):
+        strain = entries[name]['strain']
+        if strain is not None:
+            strains[strain.get('name') or name[:-len('.json')]] = strain
+    return strains
+
+
+@lru_cache(maxsize=None)
+def get_strain_directory(directory: str = DEFAULT_STRAIN_DIR, pack_path: Optional[str] = DEFAULT_PACK_PATH) -> Dict[str, Dict]:
+    """The strains of directory, loaded once per process"""
+    return load_strain_directory(directory, pack_path)
@@ -0,0 +1,219 @@
+"""Name search over a strain library, indexed once at load
+
+Names are normalized (accents, case and punctuation dropped) and kept in two
+sorted key arrays: whole names, and the tail of each name from every later
+word. A bisect into a sorted array finds every key with a given prefix, as
+walking a trie would, in a contiguous run of already ordered results. A
+trigram index maps each three-character run to the ids of the names holding
+it; substring matches are verified against the rarest trigrams' postings,
+and typo-tolerant matches are ranked by trigram similarity.
+
+Results are ranked: exact name, name prefix, word prefix, substring, then
+similar names, alphabetical within each rank. Queries shorter than a trigram
+(the first keystrokes of an autocomplete) match name and word prefixes only,
+since a substring search would have nothing to narrow it.
+
+    index = StrainSearchIndex(['Blue Dream', 'Northern Lights'])
+    index.search('dream')  # -> [0]
+"""
+import re
+import unicodedata
+from bisect import bisect_left
+from collections.abc import Mapping, Sequence
+from typing import Dict, Iterable, Iterator, List, Optional, Set
+
+import numpy as np
+
+# Minimum trigram (Jaccard) similarity for a typo-tolerant match
+FUZZY_THRESHOLD = 0.3
+
+# Shortest query matched inside words; shorter ones only match prefixes
+MIN_SUBSTRING_LENGTH = 3
+
+_SEPARATORS = re.compile(r'[\W_]+')
+
+
+def normalize_name(name: str) -> str:
+    """Lowercase, unaccented words separated by single spaces: 'Green Crack #2' -> 'green crack 2'"""
+    name = str(name)
+    if not name.isascii():
+        decomposed = unicodedata.normalize('NFKD', name)
+        name = ''.join(char for char in decomposed if not unicodedata.combining(char))
+    return _SEPARATORS.sub(' ', name.casefold()).strip()
+
+
+def _trigrams(text: str) -> Set[str]:
+    return {text[i:i + 3] for i in range(len(text) - 2)}
+
+
+def _padded_trigrams(normalized: str) -> Set[str]:
+    """Trigrams of a name padded at both ends, so word starts and ends weigh in"""
+    return _trigrams(f' {normalized} ')
+
+
+def _prefix_range(keys: List[str], prefix: str) -> range:
+    """Positions of the keys starting with prefix"""
+    return range(bisect_left(keys, prefix), bisect_left(keys, prefix + '\U0010ffff'))
+
+
+class _Suffixes(Sequence):
+    """texts[ids[k]][starts[k]:] (or all of texts[ids[k]]) for each k, computed on access"""
+
+    def __init__(self, texts: Sequence[str], ids, starts=None):
+        self.texts = texts
+        self.ids = ids
+        self.starts = starts
+
+    def __getitem__(self, k):
+        text = self.texts[int(self.ids[k])]
+        return text if self.starts is None else text[int(self.starts[k]):]
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+
+class StrainSearchIndex:
+    """Prefix, substring and typo-tolerant search over a fixed list of names
+
+    search() returns positions in the list the index was built from.
+    """
+
+    def __init__(self, names: Iterable[str]):
+        self.normalized: Sequence[str] = [normalize_name(name) for name in names]
+        n = len(self.normalized)
+
+        # Whole names, sorted; rank[i] is name i's place in that order
+        order = sorted(range(n), key=self.normalized.__getitem__)
+        self._name_keys: Sequence[str] = [self.normalized[i] for i in order]
+        self._name_ids = order
+        self.rank = np.empty(n, dtype=np.int64)
+        self.rank[order] = np.arange(n)
+
+        # Each name from its second, third, ... word on
+        words = sorted(
+            (text[match.end():], i, match.end())
+            for i, text in enumerate(self.normalized)
+            for match in re.finditer(r' (?=\S)', text)
+        )
+        self._word_keys: Sequence[str] = [key for key, _, _ in words]
+        self._word_ids = [i for _, i, _ in words]
+        self._word_starts = [start for _, _, start in words]
+
+        postings: Dict[str, List[int]] = {}
+        gram_counts = np.zeros(n, dtype=np.int64)
+        for i, text in enumerate(self.normalized):
+            grams = _padded_trigrams(text)
+            gram_counts[i] = len(grams)
+            for gram in grams:
+                postings.setdefault(gram, []).append(i)
+        self._postings: Mapping[str, np.ndarray] = {
+            gram: np.array(ids, dtype=np.int64) for gram, ids in postings.items()
+        }
+        self._gram_counts = gram_counts
+
+    def columns(self) -> Dict[str, np.ndarray]:
+        """The index as flat arrays, for from_columns (postings are returned by postings())"""
+        return {
+            'name_ids': np.asarray(self._name_ids, dtype=np.int64),
+            'word_ids': np.asarray(self._word_ids, dtype=np.int64),
+            'word_starts': np.asarray(self._word_starts, dtype=np.int64),
+            'rank': self.rank,
+            'gram_counts': self._gram_counts
+        }
+
+    def postings(self) -> Mapping[str, np.ndarray]:
+        """Ids of the names holding each padded trigram"""
+        return self._postings
+
+    @classmethod
+    def from_columns(cls, normalized: Sequence[str], postings: Mapping[str, np.ndarray],
+                     columns: Mapping[str, np.ndarray]) -> 'StrainSearchIndex':
+        """An index over prebuilt columns, e.g. sequences and arrays mapped from a strain database file
+
+        normalized holds each name's normalize_name() form by id, and
+        postings maps each trigram to its sorted ids (only get() is used).
+        """
+        index = cls.__new__(cls)
+        index.normalized = normalized
+        index._name_ids = columns['name_ids']
+        index._name_keys = _Suffixes(normalized, columns['name_ids'])
+        index._word_ids = columns['word_ids']
+        index._word_starts = columns['word_starts']
+        index._word_keys = _Suffixes(normalized, columns['word_ids'], columns['word_starts'])
+        index.rank = columns['rank']
+        index._gram_counts = columns['gram_counts']
+        index._postings = postings
+        return index
+
+    def __len__(self) -> int:
+        return len(self.normalized)
+
+    def _substring_ids(self, query: str) -> Iterator[int]:
+        """Names containing query anywhere, alphabetical; lazy, so a full page ends the scan
+
+        Queries shorter than MIN_SUBSTRING_LENGTH have no trigram to narrow
+        the candidates by and match nothing here.
+        """
+        if len(query) < MIN_SUBSTRING_LENGTH:
+            return
+        postings = sorted((self._postings.get(gram) for gram in _trigrams(query)),
+                          key=lambda ids: -1 if ids is None else len(ids))
+        if postings[0] is None:
+            return
+        candidates = postings[0]
+        if len(postings) > 1:
+            candidates = np.intersect1d(candidates, postings[1], assume_unique=True)
+        candidates = candidates[np.argsort(self.rank[candidates], kind='stable')]
+        for i in candidates.tolist():
+            if query in self.normalized[i]:
+                yield i
+
+    def similar(self, query: str, threshold: float = FUZZY_THRESHOLD) -> List[int]:
+        """Names sharing enough trigrams with query, most similar first"""
+        query = normalize_name(query)
+        grams = [ids for ids in map(self._postings.get, _padded_trigrams(query)) if ids is not None]
+        if not grams:
+            return []
+        shared = np.bincount(np.concatenate(grams), minlength=len(self.normalized))
+        query_count = len(_padded_trigrams(query))
+        # shared / union >= threshold, rearranged so most names are ruled out before dividing
+        ids = np.flatnonzero(shared * (1 + threshold) >= threshold * (query_count + self._gram_counts))
+        similarity = shared[ids] / (query_count + self._gram_counts[ids] - shared[ids])
+        return ids[np.lexsort((self.rank[ids], -similarity))].tolist()
+
+    def search(self, query: str, limit: Optional[int] = None, fuzzy: bool = True) -> List[int]:
+        """Ids of the names matching query, best first
+
+        Exact, prefix, word-prefix and substring matches (for queries of at
+        least MIN_SUBSTRING_LENGTH characters) come first. With fuzzy,
+        similar names fill the remaining places up to limit, or are
+        returned on their own when nothing matches directly and there is no
+        limit. Ranks that cannot add to a full page are never computed.
+        """
+        query = normalize_name(query)
+        if not query or limit == 0:
+            return []
+        results: List[int] = []
+        seen: Set[int] = set()
+
+        def take(ids) -> bool:
+            """Append unseen ids; True once the page is full"""
+            for i in ids:
+                if i not in seen:
+                    seen.add(i)
+                    results.append(int(i))
+                    if limit is not None and len(results) >= limit:
+                        return True
+            return False
+
+        span = _prefix_range(self._name_keys, query)
+        if take(self._name_ids[position] for position in span):
+            return results
+        span = _prefix_range(self._word_keys, query)
+        if take(self._word_ids[position] for position in span):
+            return results
+        if take(self._substring_ids(query)):
+            return results
+        if fuzzy and (results == [] or limit is not None):
+            take(self.similar(query))
+        return results
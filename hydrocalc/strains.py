@@ -0,0 +1,213 @@
+"""Strain library lookups and recommendations, independent of any UI"""
+import functools
+from typing import Dict, List, Optional, Union
+
+from hydrocalc.parsing import parse_strain_library
+from hydrocalc.strain_db import StrainDB, get_strain_db
+from hydrocalc.strain_index import StrainAttributeIndex, StrainRangeIndex
+from hydrocalc.strain_search import StrainSearchIndex
+
+# Growth stage -> key of the strain's optimal_ec table
+EC_STAGE_MAP = {
+    "Seedling": "early_veg",
+    "Early Veg": "early_veg",
+    "Late Veg": "late_veg",
+    "Pre-Flower": "early_flower",
+    "Early Flower": "early_flower",
+    "Mid Flower": "mid_flower",
+    "Late Flower": "late_flower",
+    "Flush": "late_flower"
+}
+
+# Local strain database
+LOCAL_STRAINS = {
+    "Northern Lights": {
+        "name": "Northern Lights",
+        "category": "Indica Dominant",
+        "thc_range": "16-21%",
+        "cbd_range": "0.1-0.3%",
+        "flowering_time": "7-8 weeks",
+        "difficulty": "Easy",
+        "feeding_schedule": {
+            "veg": "Light",
+            "flower": "Medium",
+            "notes": "Hardy and forgiving"
+        },
+        "nutrient_sensitivity": "Low",
+        "optimal_ec": {
+            "early_veg": "0.6-1.0",
+            "late_veg": "1.0-1.4",
+            "early_flower": "1.2-1.6",
+            "mid_flower": "1.4-1.8",
+            "late_flower": "1.0-1.4"
+        },
+        "optimal_ph": "5.8-6.3"
+    },
+    "Gorilla Glue #4": {
+        "name": "Gorilla Glue #4",
+        "category": "Hybrid",
+        "thc_range": "25-30%",
+        # ... other strain details ...
+    }
+}
+
+# Built-in default strains
+DEFAULT_STRAINS = {
+    "OG Kush": {
+        "name": "OG Kush",
+        "category": "Hybrid",
+        "thc_range": "20-25%",
+        "cbd_range": "0.1-0.3%",
+        "flowering_time": "8-9 weeks",
+        "difficulty": "Moderate",
+        "feeding_schedule": {
+            "veg": "Medium",
+            "flower": "Heavy",
+            "notes": "Cal-Mag sensitive"
+        },
+        "nutrient_sensitivity": "Medium-High",
+        "optimal_ec": {
+            "early_veg": "0.8-1.2",
+            "late_veg": "1.2-1.6",
+            "early_flower": "1.4-1.8",
+            "mid_flower": "1.6-2.0",
+            "late_flower": "1.2-1.6"
+        },
+        "optimal_ph": "6.0-6.3"
+    },
+    "Blue Dream": {
+        "name": "Blue Dream",
+        "category": "Hybrid",
+        "thc_range": "17-24%",
+        "cbd_range": "0.1-0.2%",
+        "flowering_time": "9-10 weeks",
+        "difficulty": "Easy",
+        "feeding_schedule": {
+            "veg": "Medium",
+            "flower": "Medium",
+            "notes": "Well-balanced feeder"
+        },
+        "nutrient_sensitivity": "Low",
+        "optimal_ec": {
+            "early_veg": "0.6-1.0",
+            "late_veg": "1.0-1.4",
+            "early_flower": "1.2-1.6",
+            "mid_flower": "1.4-1.8",
+            "late_flower": "1.0-1.4"
+        },
+        "optimal_ph": "5.8-6.2"
+    },
+    "Girl Scout Cookies": {
+        "name": "Girl Scout Cookies",
+        "category": "Hybrid",
+        "thc_range": "25-28%",
+        "cbd_range": "0.1-0.2%",
+        "flowering_time": "9-10 weeks",
+        "difficulty": "Moderate",
+        "feeding_schedule": {
+            "veg": "Light",
+            "flower": "Medium-Heavy",
+            "notes": "Sensitive to nitrogen"
+        },
+        "nutrient_sensitivity": "High",
+        "optimal_ec": {
+            "early_veg": "0.6-1.0",
+            "late_veg": "1.0-1.4",
+            "early_flower": "1.2-1.6",
+            "mid_flower": "1.4-1.8",
+            "late_flower": "1.0-1.4"
+        },
+        "optimal_ph": "6.0-6.5"
+    }
+}
+
+
+class StrainLibrary:
+    """Searchable strain database with ranges parsed once at load"""
+
+    def __init__(self, strains: Optional[Union[Dict[str, Dict], StrainDB]] = None):
+        if isinstance(strains, StrainDB):
+            # Records, columns and the search index all stay in the mapped file
+            self.strains_db = strains
+            self.strain_ranges = strains.strain_ranges()
+            self._strains = strains.records()
+            self.search_index = strains.search_index()
+            self.attributes = strains.attribute_index()
+            self.ranges = strains.range_index()
+        else:
+            self.strains_db = dict(LOCAL_STRAINS if strains is None else strains)
+            # Numeric ranges parsed once here; malformed entries are logged at startup
+            self.strain_ranges = parse_strain_library(self.strains_db)
+            self._strains = list(self.strains_db.values())
+            self.search_index = StrainSearchIndex(strain['name'] for strain in self._strains)
+            self.attributes = StrainAttributeIndex(self._strains)
+            self.ranges = StrainRangeIndex([self.strain_ranges[name] for name in self.strains_db])
+        self.categories = self.attributes.values('category')
+
+    def search_strains(self, query: str, limit: Optional[int] = None) -> List[Dict]:
+        """Search strains by name, best matches first
+
+        Exact and prefix matches rank above substring matches; misspelt
+        names are matched by similarity. An empty query returns every strain.
+        """
+        if not query:
+            return self._strains[:limit]
+        return [self._strains[i] for i in self.search_index.search(query, limit)]
+
+    def get_categories(self) -> List[str]:
+        """Categories of the strains in the library, sorted"""
+        return self.categories
+
+    def filter_strains(self, **attributes) -> List[Dict]:
+        """Strains with every given attribute value, e.g. filter_strains(difficulty='Easy')
+
+        Attributes are category, difficulty, nutrient_sensitivity,
+        feeding_veg and feeding_flower; a list matches any of its values.
+        """
+        return [self._strains[i] for i in self.attributes.match(**attributes).tolist()]
+
+    def query_strains(self, *conditions, **attributes) -> List[Dict]:
+        """Strains meeting numeric range conditions and attribute filters
+
+        query_strains(('thc', '>=', 20), ('flowering_weeks', '<=', 9),
+                      ('ec.mid_flower', 'overlaps', (1.6, 1.8)), difficulty='Easy')
+
+        See StrainRangeIndex.condition for the operators.
+        """
+        ids = self.attributes.match(**attributes) if attributes else None
+        return [self._strains[i] for i in self.ranges.match(*conditions, ids=ids).tolist()]
+
+    def generate_local_strain(self, category: str, **attributes) -> Optional[Dict]:
+        """Pick a random strain from the category, optionally narrowed by other attributes"""
+        strain_id = self.attributes.random_id(category=category, **attributes)
+        return None if strain_id is None else self._strains[strain_id]
+
+    def get_strain_details(self, strain_name: str) -> Optional[Dict]:
+        """Get detailed information about a specific strain"""
+        return self.strains_db.get(strain_name)
+
+    def get_nutrient_recommendations(self, strain_name: str, growth_stage: str) -> Dict:
+        """Get nutrient recommendations for a specific strain and growth stage"""
+        strain = self.strains_db.get(strain_name)
+        if not strain:
+            return {}
+
+        # Map growth stage to EC ranges
+        mapped_stage = EC_STAGE_MAP.get(growth_stage, "mid_flower")
+        ec_range = strain['optimal_ec'][mapped_stage]
+        ranges = self.strain_ranges.get(strain_name, {})
+
+        return {
+            "ec_range": ec_range,
+            "ec_range_values": ranges.get(f"ec.{mapped_stage}"),
+            "ph_range": strain['optimal_ph'],
+            "ph_range_values": ranges.get("ph"),
+            "feeding_level": strain['feeding_schedule']['flower' if 'Flower' in growth_stage else 'veg'],
+            "sensitivity": strain['nutrient_sensitivity']
+        }
+
+
+@functools.lru_cache(maxsize=None)
+def get_strain_library() -> StrainLibrary:
+    """Return the process-wide library: the memory-mapped strain database if one is built, else the local strains"""
+    return StrainLibrary(get_strain_db())
@@ -0,0 +1,210 @@
+"""Chunked readers and writers for batch calculations over large reservoir files
+
+Only the standard library and numpy are needed for CSV; Parquet support
+imports pyarrow when a .parquet path is used.
+"""
+import csv
+import logging
+from itertools import islice
+from pathlib import Path
+from typing import TYPE_CHECKING, Dict, Iterator, List, Optional
+
+import numpy as np
+
+from hydrocalc.core import RECIPE_LINE, CalculationCore, get_core
+from hydrocalc.facility import DEFAULT_STRENGTH
+
+if TYPE_CHECKING:
+    from hydrocalc.parallel import BatchPool
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CHUNK_SIZE = 50_000
+
+# Input columns every row must provide
+REQUIRED_COLUMNS = ('volume', 'strength', 'stage')
+
+Columns = Dict[str, List]
+
+
+def _is_parquet(path) -> bool:
+    """Whether a path names a Parquet file"""
+    return Path(path).suffix.lower() in ('.parquet', '.pq')
+
+
+def _pyarrow():
+    """Import pyarrow, explaining how to get it when missing"""
+    try:
+        import pyarrow
+        import pyarrow.parquet
+    except ImportError as e:
+        raise ValueError("Parquet files require pyarrow (pip install pyarrow)") from e
+    return pyarrow
+
+
+def read_chunks(path, chunk_size: int = DEFAULT_CHUNK_SIZE) -> Iterator[Columns]:
+    """Yield the input file as column dicts of at most chunk_size rows
+
+    A file with columns but no rows yields one empty chunk, so the output
+    still gets its header. Blank CSV lines are skipped.
+    """
+    if _is_parquet(path):
+        pa = _pyarrow()
+        parquet_file = pa.parquet.ParquetFile(path)
+        empty = True
+        for batch in parquet_file.iter_batches(batch_size=chunk_size):
+            empty = False
+            yield batch.to_pydict()
+        if empty:
+            yield {name: [] for name in parquet_file.schema_arrow.names}
+        return
+
+    with open(path, newline='') as f:
+        rows_left = (row for row in csv.reader(f) if row)
+        header = next(rows_left, None)
+        if header is None:
+            return
+        empty = True
+        while True:
+            rows = list(islice(rows_left, chunk_size))
+            if not rows:
+                break
+            empty = False
+            yield {name: list(values) for name, values in zip(header, zip(*rows))}
+        if empty:
+            yield {name: [] for name in header}
+
+
+class CSVChunkWriter:
+    """Append column chunks to a CSV file"""
+
+    def __init__(self, path):
+        self.file = open(path, 'w', newline='')
+        self.writer = csv.writer(self.file)
+        self.header_written = False
+
+    def write(self, columns: Columns):
+        if not self.header_written:
+            self.writer.writerow(columns)
+            self.header_written = True
+        self.writer.writerows(zip(*columns.values()))
+
+    def close(self):
+        self.file.close()
+
+
+class ParquetChunkWriter:
+    """Append column chunks to a Parquet file, one row group per chunk"""
+
+    def __init__(self, path):
+        self.pa = _pyarrow()
+        self.path = path
+        self.writer = None
+
+    def write(self, columns: Columns):
+        table = self.pa.Table.from_pydict(columns)
+        if self.writer is None:
+            self.writer = self.pa.parquet.ParquetWriter(self.path, table.schema)
+        self.writer.write_table(table)
+
+    def close(self):
+        if self.writer is not None:
+            self.writer.close()
+
+
+def open_writer(path):
+    """Return a chunk writer for the output path's format"""
+    return ParquetChunkWriter(path) if _is_parquet(path) else CSVChunkWriter(path)
+
+
+def _float_column(values, name: str, first_row: int, default: Optional[float] = None) -> np.ndarray:
+    """A column as floats; blank cells take default, or fail naming their rows
+
+    first_row is the 1-based data row number of the chunk's first value.
+    """
+    try:
+        column = np.asarray(values, dtype=float)
+    except (TypeError, ValueError):
+        column = np.empty(len(values))
+        for index, value in enumerate(values):
+            if value is None or (isinstance(value, str) and not value.strip()):
+                column[index] = np.nan
+                continue
+            try:
+                column[index] = float(value)
+            except (TypeError, ValueError):
+                raise ValueError(f"row {first_row + index}: invalid {name} {value!r}") from None
+
+    blank = np.isnan(column)
+    if blank.any():
+        if default is None:
+            rows = ', '.join(str(first_row + index) for index in np.flatnonzero(blank)[:10])
+            raise ValueError(f"Missing {name} in row(s) {rows}")
+        column[blank] = default
+    return column
+
+
+def calculate_chunk(columns: Columns, selected_nutrients: List[str], unit_system: str = 'US',
+                    core: Optional[CalculationCore] = None, pool: Optional['BatchPool'] = None,
+                    first_row: int = 1) -> Columns:
+    """Calculate one chunk, returning the input columns plus amount and per-gallon columns per product
+
+    A blank strength means DEFAULT_STRENGTH percent, as in the facility
+    planner; a blank or invalid volume fails, naming the data row
+    (counted from first_row).
+    """
+    core = core or get_core()
+    calculate = pool.calculate_nutrients_batch if pool else core.calculate_nutrients_batch
+    missing = [name for name in REQUIRED_COLUMNS if name not in columns]
+    if missing:
+        raise ValueError(f"Input is missing required columns: {', '.join(missing)}")
+
+    output = dict(columns)
+    output['volume'] = _float_column(columns['volume'], 'volume', first_row)
+    output['strength'] = _float_column(columns['strength'], 'strength', first_row, DEFAULT_STRENGTH)
+    output['stage'] = [str(stage) for stage in columns['stage']]
+    units = columns.get('unit_system', unit_system)
+
+    doses = calculate(
+        sizes=output['volume'],
+        strengths=output['strength'],
+        growth_stages=output['stage'],
+        selected_nutrients=selected_nutrients,
+        unit_systems=units
+    )
+    for col, product in enumerate(doses.products):
+        output[f'{product} (ml)'] = doses.amounts[:, col]
+        output[f'{product} (ml/gal)'] = doses.per_unit[:, col]
+    return output
+
+
+def run_batch(input_path, output_path, selected_nutrients: Optional[List[str]] = None,
+              unit_system: str = 'US', chunk_size: int = DEFAULT_CHUNK_SIZE, workers: Optional[int] = None) -> int:
+    """Stream input_path through the calculator into output_path, returning the row count
+
+    Only one chunk is held in memory at a time. selected_nutrients defaults
+    to every base nutrient of the recipe line. workers > 1 calculates each
+    chunk across one process pool kept for the whole run.
+    """
+    core = get_core()
+    if selected_nutrients is None:
+        catalog = core.catalog
+        selected_nutrients = [catalog.names[i] for i in catalog.ids_for_line(RECIPE_LINE, 'base_nutrients')]
+
+    pool = None
+    if workers and workers > 1:
+        # The process pool machinery is only imported when it is used
+        from hydrocalc.parallel import BatchPool
+        pool = BatchPool(core, workers)
+    writer = open_writer(output_path)
+    rows = 0
+    try:
+        for columns in read_chunks(input_path, chunk_size):
+            writer.write(calculate_chunk(columns, selected_nutrients, unit_system, core, pool, first_row=rows + 1))
+            rows += len(columns['volume'])
+            logger.debug(f"Processed {rows} rows")
+    finally:
+        writer.close()
+        if pool is not None:
+            pool.close()
+    return rows
@@ -0,0 +1,145 @@
+"""Fail when cold-importing the app or core modules exceeds its time budget
+
+Each module is imported in a fresh interpreter with `python -X importtime`;
+the best of several runs is compared with the budget. The check also fails
+when a module pulls in a heavy dependency (pandas, plotly, requests, ...)
+itself, rather than through streamlit's own imports, since those are meant
+to load lazily on first use. A module that fails to import fails the
+check; with --allow-missing, one whose import stops at a third-party
+package that is not installed (streamlit on a headless CI box) is skipped.
+
+    python scripts/check_import_budget.py
+    python scripts/check_import_budget.py --runs 5 --scale 1.5
+    python scripts/check_import_budget.py --allow-missing
+"""
+import argparse
+import os
+import re
+import subprocess
+import sys
+from pathlib import Path
+
+ROOT = Path(__file__).resolve().parent.parent
+
+HEADLESS_FORBIDDEN = ('streamlit', 'pandas', 'plotly', 'requests', 'pyarrow')
+
+# module -> (budget in ms, top-level packages it must not import itself)
+BUDGETS = {
+    # Pure-Python modules: importing one must not pull in numpy through the package
+    'hydrocalc.parsing': (50, HEADLESS_FORBIDDEN + ('numpy',)),
+    'hydrocalc.instructions': (50, HEADLESS_FORBIDDEN + ('numpy',)),
+    'hydrocalc.scheduler': (50, HEADLESS_FORBIDDEN + ('numpy',)),
+    # numpy itself takes about 100 ms of these
+    'hydrocalc.strain_search': (175, HEADLESS_FORBIDDEN),
+    'hydrocalc.core': (175, HEADLESS_FORBIDDEN),
+    'hydrocalc.recipes': (175, HEADLESS_FORBIDDEN),
+    'hydrocalc.strains': (175, HEADLESS_FORBIDDEN),
+    # argparse and logging add about 25 ms on top
+    'hydrocalc.cli': (200, HEADLESS_FORBIDDEN),
+    'nutrient_calculator': (2500, ('pandas', 'plotly', 'requests')),
+    'strain_api': (2500, ('pandas', 'plotly', 'requests')),
+    'recipe_instructions': (2500, ('pandas', 'plotly', 'requests')),
+    'app': (3000, ('pandas', 'plotly', 'requests')),
+}
+
+# Imports made by these packages are theirs, not ours
+THIRD_PARTY_ROOTS = ('streamlit',)
+
+_LINE = re.compile(r'^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)$')
+
+_MISSING = re.compile(r"^ModuleNotFoundError: No module named '([^']+)'$")
+
+
+class MissingDependency(RuntimeError):
+    """A module could not be imported because a third-party package is not installed"""
+
+
+def _is_local(package: str) -> bool:
+    """Whether a top-level package or module lives in this repository"""
+    return (ROOT / package).is_dir() or (ROOT / f'{package}.py').is_file()
+
+
+def parse_importtime(stderr: str):
+    """Return [(name, cumulative_us, ancestors)] from -X importtime output"""
+    entries = []
+    for line in stderr.splitlines():
+        match = _LINE.match(line)
+        if match:
+            entries.append((match.group(4), int(match.group(2)), len(match.group(3)) // 2))
+
+    # Output is post-order (children first); walk it backwards to know each import's ancestors
+    result = []
+    stack = []
+    for name, cumulative, level in reversed(entries):
+        while stack and stack[-1][1] >= level:
+            stack.pop()
+        result.append((name, cumulative, tuple(ancestor for ancestor, _ in stack)))
+        stack.append((name, level))
+    result.reverse()
+    return result
+
+
+def measure(module: str):
+    """Import module in a fresh interpreter; return (ms, imports made outside third-party roots)"""
+    env = dict(os.environ, PYTHONDONTWRITEBYTECODE='1')
+    proc = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', f'import {module}'],
+        cwd=ROOT, env=env, capture_output=True, text=True
+    )
+    if proc.returncode != 0:
+        last_line = proc.stderr.splitlines()[-1] if proc.stderr else ''
+        missing = _MISSING.match(last_line)
+        if missing and not _is_local(missing.group(1).split('.')[0]):
+            raise MissingDependency(f"import {module} needs {missing.group(1)}, which is not installed")
+        raise RuntimeError(f"import {module} failed: {last_line}")
+
+    entries = parse_importtime(proc.stderr)
+    total_us = next(cumulative for name, cumulative, ancestors in entries if name == module and not ancestors)
+    own_imports = {
+        name.split('.')[0]
+        for name, _, ancestors in entries
+        if not any(ancestor.split('.')[0] in THIRD_PARTY_ROOTS for ancestor in ancestors)
+    }
+    return total_us / 1000, own_imports
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('modules', nargs='*', help='Modules to check (default: all with a budget)')
+    parser.add_argument('--runs', type=int, default=3, help='Fresh imports per module; the fastest counts')
+    parser.add_argument('--scale', type=float, default=1.0, help='Multiply every budget (slow CI machines)')
+    parser.add_argument('--allow-missing', action='store_true',
+                        help='Skip modules whose third-party dependencies are not installed instead of failing')
+    args = parser.parse_args(argv)
+
+    failures = 0
+    for module in args.modules or BUDGETS:
+        budget, forbidden = BUDGETS.get(module, (float('inf'), ()))
+        budget *= args.scale
+        try:
+            runs = [measure(module) for _ in range(args.runs)]
+        except MissingDependency as e:
+            if args.allow_missing:
+                print(f"SKIP {module}: {e}")
+                continue
+            print(f"FAIL {module}: {e} (pass --allow-missing to skip)")
+            failures += 1
+            continue
+        except (RuntimeError, StopIteration) as e:
+            print(f"FAIL {module}: {e}")
+            failures += 1
+            continue
+
+        best_ms = min(ms for ms, _ in runs)
+        heavy = sorted(set(forbidden) & runs[0][1])
+        ok = best_ms <= budget and not heavy
+        failures += not ok
+        status = 'ok  ' if ok else 'FAIL'
+        detail = f" eagerly imports {', '.join(heavy)}" if heavy else ''
+        print(f"{status} {module:<24} {best_ms:8.1f} ms (budget {budget:.0f} ms){detail}")
+
+    return 1 if failures else 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,36 @@
+"""Tests for the facility planner"""
+import math
+
+import pytest
+
+from hydrocalc.core import get_core
+from hydrocalc.facility import FacilityPlanner
+
+LINES = ['Generic', 'General Hydroponics', 'Advanced Nutrients', 'Athena']
+
+
+def test_blank_strength_means_full_strength():
+    rows = [
+        {'id': 'R1', 'line': 'General Hydroponics', 'stage': 'Late Veg', 'volume': 50.0, 'strength': math.nan},
+        {'id': 'R2', 'line': 'General Hydroponics', 'stage': 'Late Veg', 'volume': 50.0, 'strength': 100},
+    ]
+    recipes = FacilityPlanner().plan(rows).recipes()
+    assert recipes['R1'] == recipes['R2']
+    assert recipes['R1']['Flora Micro']['amount'] == 150.0  # 4 ml/gal * 0.75 (Late Veg) * 50 gal
+    totals = FacilityPlanner().plan(rows).product_totals()
+    assert all(not math.isnan(total['amount']) for total in totals.values())
+
+
+def test_missing_volume_is_rejected():
+    rows = [{'id': 'R1', 'line': 'Athena', 'stage': 'Late Veg', 'volume': None, 'strength': 100}]
+    with pytest.raises(ValueError, match='row 0: missing volume'):
+        FacilityPlanner().plan(rows)
+
+
+@pytest.mark.parametrize('stage', ['Seedling', 'Late Veg', 'Early Flower'])
+@pytest.mark.parametrize('line', LINES)
+def test_plan_matches_single_reservoir_recipe(line, stage):
+    rows = [{'id': 'R1', 'line': line, 'stage': stage, 'volume': 37.5, 'strength': 80}]
+    planned = FacilityPlanner().plan(rows).recipes()['R1']
+    single = get_core().calculate_recipe(line, 37.5, stage, strength=0.8)
+    assert planned == single
@@ -0,0 +1,39 @@
+"""Tests for the saved-recipe mixing instructions"""
+from hydrocalc.instructions import generate_mixing_instructions
+from hydrocalc.recipes import RecipeBook
+from hydrocalc.store import RecipeStore
+
+RECIPE = {
+    'nutrients': {
+        'Armor Si': {'amount': 2.0, 'unit': 'ml', 'type': 'silica'},
+        'Flora Micro': {'amount': 4.0, 'unit': 'ml', 'type': 'micro'}
+    },
+    'size': 5,
+    'growth_stage': 'Late Veg'
+}
+
+
+def _step(instructions, title):
+    return next(step for step in instructions if step['title'] == title)
+
+
+def test_recipes_share_nothing_with_the_templates():
+    first = generate_mixing_instructions(RECIPE)
+    _step(first, 'Add Base Nutrients')['sequence'][0]['wait'] = 'changed'
+    _step(first, 'Preparation')['tips'].append('changed')
+
+    second = generate_mixing_instructions(RECIPE)
+    assert _step(second, 'Add Base Nutrients')['sequence'][0]['wait'] == '60 seconds'
+    assert 'changed' not in _step(second, 'Preparation')['tips']
+
+
+def test_saved_recipe_is_the_same_in_every_backend(tmp_path):
+    books = [RecipeBook(), RecipeBook(compact=True), RecipeBook(store=RecipeStore(tmp_path / 'recipes.db'))]
+    saved = []
+    for book in books:
+        assert book.save_recipe('Veg', dict(RECIPE))
+        recipe = book.get_recipe('Veg')
+        recipe.pop('created_at')
+        saved.append(recipe)
+    assert saved[0] == saved[1] == saved[2]
+    assert isinstance(_step(saved[0]['mixing_instructions'], 'Preparation')['tips'], list)
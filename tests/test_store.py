@@ -0,0 +1,14 @@
+"""Tests for the SQLite recipe store"""
+from hydrocalc.store import RecipeStore
+
+
+def test_page_extracts_only_the_requested_fields():
+    store = RecipeStore(':memory:')
+    store['Veg'] = {'strain': 'Blue Dream', 'growth_phase': 'Late Veg', 'size': 5.0, 'ready': True,
+                    'nutrients': {'Flora Micro': {'amount': 15.0}}}
+
+    page = store.page(fields=['strain', 'size', 'ready', 'nutrients', 'missing'])
+    assert page.items == [('Veg', {'strain': 'Blue Dream', 'size': 5.0, 'ready': True,
+                                   'nutrients': {'Flora Micro': {'amount': 15.0}}, 'missing': None})]
+    assert store.page(fields=['strain']).items == [('Veg', {'strain': 'Blue Dream'})]
+    assert store.page(fields=[]).items == [('Veg', {})]
@@ -0,0 +1,12 @@
+"""Tests for the strain name search index"""
+from hydrocalc.strain_search import StrainSearchIndex
+
+NAMES = ['Blue Dream', 'Northern Lights', 'Green Crack', 'Sour Diesel']
+
+
+def test_short_queries_match_prefixes_only():
+    index = StrainSearchIndex(NAMES)
+    assert index.search('gr', fuzzy=False) == [2]       # name prefix
+    assert index.search('dr', fuzzy=False) == [0]       # word prefix
+    assert index.search('re', fuzzy=False) == []        # inside words only
+    assert index.search('ree', fuzzy=False) == [2]      # substring from three letters
@@ -0,0 +1,55 @@
+"""Tests for the streaming batch reader and writer"""
+import csv
+
+import pytest
+
+from hydrocalc.streaming import read_chunks, run_batch
+
+
+def _read_csv(path):
+    with open(path, newline='') as f:
+        return list(csv.reader(f))
+
+
+def test_blank_lines_are_skipped(tmp_path):
+    source = tmp_path / 'blank.csv'
+    source.write_text('volume,strength,stage\n10,100,Late Veg\n\n20,50,Early Flower\n\n')
+    output = tmp_path / 'out.csv'
+
+    assert run_batch(source, output, chunk_size=1) == 2
+    rows = _read_csv(output)
+    assert rows[0][:3] == ['volume', 'strength', 'stage']
+    assert [row[:3] for row in rows[1:]] == [['10.0', '100.0', 'Late Veg'], ['20.0', '50.0', 'Early Flower']]
+    micro = rows[0].index('Flora Micro (ml)')
+    assert [row[micro] for row in rows[1:]] == ['30.0', '40.0']  # 4 ml/gal * stage * strength * volume
+
+
+def test_header_only_input_writes_header(tmp_path):
+    source = tmp_path / 'empty.csv'
+    source.write_text('volume,strength,stage\n')
+    output = tmp_path / 'out.csv'
+
+    assert list(read_chunks(source)) == [{'volume': [], 'strength': [], 'stage': []}]
+    assert run_batch(source, output) == 0
+    rows = _read_csv(output)
+    assert len(rows) == 1
+    assert rows[0][:3] == ['volume', 'strength', 'stage']
+    assert 'Flora Micro (ml)' in rows[0]
+
+
+def test_blank_strength_means_full_strength(tmp_path):
+    source = tmp_path / 'strength.csv'
+    source.write_text('volume,strength,stage\n10,,Late Veg\n10,100,Late Veg\n')
+    output = tmp_path / 'out.csv'
+
+    assert run_batch(source, output) == 2
+    rows = _read_csv(output)
+    assert rows[1][1:] == rows[2][1:]
+
+
+def test_blank_volume_names_the_row(tmp_path):
+    source = tmp_path / 'volume.csv'
+    source.write_text('volume,strength,stage\n10,100,Late Veg\n,100,Late Veg\n')
+
+    with pytest.raises(ValueError, match=r'Missing volume in row\(s\) 2'):
+        run_batch(source, tmp_path / 'out.csv', chunk_size=1)